@@ -0,0 +1,450 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from .authentication import aauthenticate_token
+from .caching import cached_contact_list, owner_contacts
+from .changes import CONTACTS, TASKS
+from .conditional import add_validators, not_modified_response
+from .events import broker
+from .filters import filter_tasks
+from .models import CollectionVersion, Contacts, TaskItem
+from .pagination import KeysetPagination
+from .serializers import ContactsSerializer, TaskItemSerializer, task_serializer_class
+from .streaming import astream_json_list, wants_stream
+from .views import login_payload
+
+LOGIN_HASH_WORKERS = getattr(settings, 'JOIN_LOGIN_HASH_WORKERS', 4)
+"""
+Number of threads that check login passwords concurrently.
+"""
+
+LOGIN_QUEUE_LIMIT = getattr(settings, 'JOIN_LOGIN_QUEUE_LIMIT', 64)
+"""
+Maximum number of logins running or waiting for a hashing thread before new logins
+are rejected with `503 Service Unavailable`.
+"""
+
+CHANGE_STREAM_HEARTBEAT = getattr(settings, 'JOIN_CHANGE_STREAM_HEARTBEAT', 15)
+"""
+Seconds without events after which the change stream sends a heartbeat comment, so
+that proxies and clients do not consider the connection dead.
+"""
+
+CHANGE_STREAM_RETRY = 3000
+"""
+Milliseconds the client should wait before reconnecting a dropped change stream.
+"""
+
+_login_executor = ThreadPoolExecutor(max_workers=LOGIN_HASH_WORKERS, thread_name_prefix='join-login')
+_login_slots = threading.BoundedSemaphore(LOGIN_QUEUE_LIMIT)
+
+
+def render_json(data, status=200):
+    """
+    Render `data` into a JSON response, byte for byte like DRF's `JSONRenderer`.
+
+    Parameters:
+    - `data`: The serialized data.
+    - `status`: The HTTP status code.
+
+    Returns:
+    - An `HttpResponse` with the JSON body.
+    """
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def parse_body(request):
+    """
+    Read the submitted data of a plain Django request (JSON or form encoded).
+
+    Parameters:
+    - `request`: The Django `HttpRequest`.
+
+    Returns:
+    - The submitted data as a dict.
+
+    Raises:
+    - `ValueError` if the body is not valid JSON.
+    """
+    if request.content_type == 'application/json':
+        return json.loads(request.body or b'{}')
+    return request.POST
+
+
+def check_credentials(serializer):
+    """
+    Validate login credentials in a hashing thread.
+
+    Runs the password check (the PBKDF2 hash) and closes the thread's database
+    connection afterwards, unless persistent connections are configured.
+
+    Returns:
+    - `True` if the credentials are valid.
+    """
+    try:
+        return serializer.is_valid()
+    finally:
+        close_old_connections()
+
+
+class AsyncAPIView(View):
+    """
+    Base class of the async views served under ASGI.
+
+    Like DRF's `APIView`, the views are exempt from CSRF checks since they are
+    authenticated by token (or, for login, by the submitted credentials).
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+
+class AsyncLoginView(AsyncAPIView):
+    """
+    Async view for user login and token generation, served under ASGI.
+
+    Same contract as `LoginView`, but the password check runs in a bounded pool of
+    `LOGIN_HASH_WORKERS` threads so the event loop (and the threads serving other
+    requests) stay free while passwords are hashed. At most `LOGIN_QUEUE_LIMIT`
+    logins may be in progress; further logins are answered with
+    `503 Service Unavailable` instead of queuing up behind them.
+
+    POST:
+    - Validates the user's credentials and returns a token along with user details.
+    - If the user does not have a token, it creates one.
+
+    Returns:
+    - JSON response with the token and user details, HTTP 400 for invalid
+      credentials or HTTP 503 if too many logins are in progress.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = parse_body(request)
+        except ValueError:
+            return render_json({'detail': 'JSON parse error.'}, status=400)
+        if not _login_slots.acquire(blocking=False):
+            response = render_json({'detail': 'Too many logins in progress, please retry.'}, status=503)
+            response['Retry-After'] = '1'
+            return response
+        try:
+            serializer = AuthTokenSerializer(data=data, context={'request': request})
+            loop = asyncio.get_running_loop()
+            valid = await loop.run_in_executor(_login_executor, check_credentials, serializer)
+        finally:
+            _login_slots.release()
+        if not valid:
+            return render_json(serializer.errors, status=400)
+        user = serializer.validated_data['user']
+        token, created = await Token.objects.aget_or_create(user=user)
+        return render_json(login_payload(user, token))
+
+
+class AsyncAuthenticatedView(AsyncAPIView):
+    """
+    Base class of the async views that require token authentication.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Authenticate the request by token before handling it.
+
+        Returns:
+        - HTTP 401 if the request carries no valid token, otherwise the handler's response.
+        """
+        user = await aauthenticate_token(request)
+        if user is None:
+            detail = 'Invalid token.' if 'Authorization' in request.headers else (
+                'Authentication credentials were not provided.'
+            )
+            response = render_json({'detail': detail}, status=401)
+            response['WWW-Authenticate'] = 'Token'
+            return response
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncCollectionView(AsyncAuthenticatedView):
+    """
+    Base class of the async-native collection endpoints served under ASGI.
+
+    Serves the same URLs, parameters and responses as the corresponding sync views
+    (`TaskView`, `ContactsView`), but authenticates and reads with the async ORM, so
+    a waiting request does not hold a thread. Creating and updating objects runs the
+    (synchronous) serializer validation and save in a single `sync_to_async` call.
+
+    Attributes:
+    - `model`: The model of the collection.
+    - `serializer_class`: The serializer of the collection.
+    - `collection`: The collection name used for versioning (see `join.changes`).
+    - `allow_retrieve`: Whether single objects can be retrieved by ID.
+    """
+    model = None
+    serializer_class = None
+    collection = None
+    allow_retrieve = True
+
+    def get_queryset(self):
+        """
+        Return the queryset of the collection (the objects the requesting user may
+        read and write).
+        """
+        return self.model.objects.all()
+
+    def get_save_kwargs(self, request):
+        """
+        Return the fields set on created objects in addition to the request data.
+        """
+        return {}
+
+    def get_serializer_class(self, request):
+        """
+        Return the serializer of the requested representation.
+
+        Raises:
+        - `ValidationError` if an unknown representation is requested.
+        """
+        return self.serializer_class
+
+    async def get(self, request, id=None):
+        """
+        Retrieve a single object or the (conditional, paginated or streamed) list.
+        """
+        try:
+            serializer_class = self.get_serializer_class(request)
+            fields = serializer_class.select_fields(request.GET)
+        except ValidationError as exc:
+            return render_json(exc.detail, status=400)
+        queryset = self.get_queryset()
+        if id is not None:
+            if not self.allow_retrieve:
+                return self.http_method_not_allowed(request)
+            instance = await self.prepare_queryset(queryset, serializer_class, fields).filter(id=id).afirst()
+            if instance is None:
+                return self.not_found()
+            return render_json(serializer_class(instance, fields=fields).data)
+
+        version = await CollectionVersion.acurrent(self.collection)
+        response = not_modified_response(request, version)
+        if response is not None:
+            return response
+        try:
+            queryset = self.filter_queryset(request, queryset)
+        except ValidationError as exc:
+            return render_json(exc.detail, status=400)
+        if not queryset.ordered:
+            queryset = queryset.order_by('id')
+        queryset = self.prepare_queryset(queryset, serializer_class, fields)
+        if wants_stream(request):
+            response = astream_json_list(queryset, serializer_class, fields=fields)
+        else:
+            response = await self.list_response(request, queryset, serializer_class, fields)
+        add_validators(response, version, request)
+        return response
+
+    def filter_queryset(self, request, queryset):
+        """
+        Filter and order the list by the query parameters of the request.
+
+        Raises:
+        - `ValidationError` if a parameter is malformed.
+        """
+        return queryset
+
+    def prepare_queryset(self, queryset, serializer_class, fields):
+        """
+        Restrict the (ordered) queryset to what the selected `fields` of `serializer_class` need.
+        """
+        return serializer_class.only_fields(queryset, fields)
+
+    async def list_response(self, request, queryset, serializer_class, fields):
+        """
+        Serialize the requested page of the list, or the whole list if no page was requested.
+        """
+        paginator = KeysetPagination()
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, Request(request), self)
+        if page is not None:
+            data = serializer_class(page, many=True, fields=fields).data
+            return render_json(paginator.get_paginated_response(data).data)
+        return render_json(await self.serialize_list(request, queryset, serializer_class, fields))
+
+    async def serialize_list(self, request, queryset, serializer_class, fields):
+        """
+        Serialize the whole list.
+        """
+        instances = [instance async for instance in queryset]
+        return serializer_class(instances, many=True, fields=fields).data
+
+    async def post(self, request):
+        """
+        Create a new object.
+        """
+        try:
+            data = parse_body(request)
+        except ValueError:
+            return render_json({'detail': 'JSON parse error.'}, status=400)
+        serializer = self.serializer_class(data=data)
+        return await sync_to_async(self.save)(serializer, status=201, **self.get_save_kwargs(request))
+
+    async def put(self, request, id=None):
+        """
+        Update the object with the given ID.
+        """
+        if id is None:
+            return self.http_method_not_allowed(request)
+        instance = await self.get_queryset().filter(id=id).afirst()
+        if instance is None:
+            return self.not_found()
+        try:
+            data = parse_body(request)
+        except ValueError:
+            return render_json({'detail': 'JSON parse error.'}, status=400)
+        return await sync_to_async(self.save)(self.serializer_class(instance, data=data), status=200)
+
+    async def delete(self, request, id=None):
+        """
+        Delete the object with the given ID.
+        """
+        if id is None:
+            return self.http_method_not_allowed(request)
+        instance = await self.get_queryset().filter(id=id).afirst()
+        if instance is None:
+            return self.not_found()
+        await instance.adelete()
+        return HttpResponse(status=204)
+
+    def save(self, serializer, status, **kwargs):
+        """
+        Validate and save `serializer` with the additional fields `kwargs` (runs in a
+        worker thread).
+
+        Returns:
+        - JSON response with the saved object, or HTTP 400 with the validation errors.
+        """
+        if serializer.is_valid():
+            serializer.save(**kwargs)
+            return render_json(serializer.data, status=status)
+        return render_json(serializer.errors, status=400)
+
+    def not_found(self):
+        """
+        Return the HTTP 404 response DRF sends for a missing object.
+        """
+        return render_json({'detail': f'No {self.model.__name__} matches the given query.'}, status=404)
+
+
+class AsyncTaskView(AsyncCollectionView):
+    """
+    Async-native variant of `TaskView` for the ASGI deployment.
+    """
+    model = TaskItem
+    serializer_class = TaskItemSerializer
+    collection = TASKS
+
+    def filter_queryset(self, request, queryset):
+        return filter_tasks(queryset, request.GET, request.user)
+
+    def get_serializer_class(self, request):
+        return task_serializer_class(request.GET)
+
+    def prepare_queryset(self, queryset, serializer_class, fields):
+        return serializer_class.setup_eager_loading(queryset, fields)
+
+
+class AsyncContactsView(AsyncCollectionView):
+    """
+    Async-native variant of `ContactsView` for the ASGI deployment.
+    """
+    model = Contacts
+    serializer_class = ContactsSerializer
+    collection = CONTACTS
+    allow_retrieve = False
+
+    def get_queryset(self):
+        return owner_contacts(self.request.user)
+
+    def get_save_kwargs(self, request):
+        return {'contactAssignedTo': request.user}
+
+    async def serialize_list(self, request, queryset, serializer_class, fields):
+        return await sync_to_async(cached_contact_list)(request.user, fields)
+
+
+def format_event(event):
+    """
+    Format a change event as a server-sent event.
+
+    Returns:
+    - The encoded event, e.g. `id: 7\nevent: tasks\ndata: {"action":"updated","ids":[3]}\n\n`.
+    """
+    data = json.dumps({'action': event['action'], 'ids': event['ids']}, separators=(',', ':'))
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n".encode()
+
+
+class ChangeStreamView(AsyncAuthenticatedView):
+    """
+    Async view that pushes changes of tasks, subtasks and contacts as server-sent events.
+
+    Instead of polling the collections, clients keep one connection open and receive
+    an event per write, carrying the collection as event type and the action and the
+    affected IDs as data. Clients then fetch just the changed objects (or use
+    `SyncView`). Reconnecting clients (`EventSource` does so automatically) send the
+    `Last-Event-ID` header and receive the events they missed. If these are no longer
+    available, or the ID is unknown (e.g. after a restart), a `reset` event tells the
+    client to reload the collections. Changes of contacts are only sent to their owner.
+
+    Events are published in-process (see `join.events`), so every client sees the
+    writes handled by the worker process it is connected to.
+
+    GET:
+    - Opens the event stream.
+
+    Returns:
+    - A `text/event-stream` response, or HTTP 401 if the request is not authenticated.
+    """
+
+    async def get(self, request):
+        try:
+            last_event_id = int(request.headers.get('Last-Event-ID', ''))
+        except ValueError:
+            last_event_id = None
+        response = StreamingHttpResponse(
+            self.stream(last_event_id, request.user.pk), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, last_event_id, user_id):
+        """
+        Subscribe to the broker for the user `user_id` and yield the encoded events
+        until the client disconnects.
+
+        The subscription is only made once the response is iterated, so it is always
+        released by the generator, also for responses that are never sent.
+        """
+        with broker.subscribe(last_event_id, user_id) as subscription:
+            yield f'retry: {CHANGE_STREAM_RETRY}\n\n'.encode()
+            while True:
+                if subscription.overflowed:
+                    subscription.overflowed = False
+                    yield b'event: reset\ndata: {}\n\n'
+                event = await subscription.get(CHANGE_STREAM_HEARTBEAT)
+                if event is None:
+                    yield b': heartbeat\n\n'
+                else:
+                    yield format_event(event)
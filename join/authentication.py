@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class TokenCache:
+    """
+    Thread-safe in-process cache of token lookups with TTL and LRU eviction.
+
+    Maps token keys to the `(user, token)` pair returned by token authentication.
+    Entries expire `ttl` seconds after they were stored, and the least recently used
+    entry is evicted once more than `max_size` entries are held.
+
+    The cache lives in the memory of each worker process. Entries are invalidated
+    explicitly when a token is deleted or its user changes (see `join.signals`); in
+    other worker processes such changes take effect at the latest after `ttl` seconds.
+
+    Attributes:
+    - `hits`: Number of lookups answered from the cache.
+    - `misses`: Number of lookups that had to go to the database.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached `(user, token)` pair for `key`, or `None` if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """
+        Store the `(user, token)` pair `value` for `key`, evicting the oldest entries if full.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Remove the entry of the token `key`.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_user(self, user_id):
+        """
+        Remove all entries of the user with the primary key `user_id`.
+        """
+        with self._lock:
+            for key in [key for key, (_, (user, _)) in self._entries.items() if user.pk == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Remove all entries and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns:
+        - Dict with `hits`, `misses`, `hit_ratio`, `size`, `max_size` and `ttl`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+            }
+
+
+token_cache = TokenCache(**{
+    name.lower(): value for name, value in getattr(settings, 'JOIN_TOKEN_CACHE', {}).items()
+})
+"""
+Process-wide token cache, configured by the `JOIN_TOKEN_CACHE` setting
+(`{'MAX_SIZE': ..., 'TTL': ...}`).
+"""
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that serves repeated lookups of a token from `token_cache`.
+
+    The first request with a token is authenticated against the database like with
+    DRF's `TokenAuthentication`; following requests with the same token skip the
+    token and user query until the entry expires or is invalidated.
+    """
+
+    def authenticate_credentials(self, key):
+        """
+        Return the `(user, token)` pair for the token `key`.
+
+        Raises:
+        - `AuthenticationFailed` if the token is invalid or its user is inactive.
+        """
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        credentials = super().authenticate_credentials(key)
+        token_cache.set(key, credentials)
+        return credentials
+
+
+async def aauthenticate_token(request):
+    """
+    Authenticate a plain Django request by its `Authorization: Token <key>` header.
+
+    Async counterpart of `CachedTokenAuthentication` for async views: the lookup is
+    served from `token_cache` or, on a miss, with the async ORM.
+
+    Parameters:
+    - `request`: The Django `HttpRequest`.
+
+    Returns:
+    - The authenticated, active user, or `None` if the header is missing or the
+      token is invalid.
+    """
+    header = request.headers.get('Authorization', '').split()
+    if len(header) != 2 or header[0].lower() != 'token':
+        return None
+    key = header[1]
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached[0]
+    try:
+        token = await Token.objects.select_related('user').aget(key=key)
+    except Token.DoesNotExist:
+        return None
+    if not token.user.is_active:
+        return None
+    token_cache.set(key, (token.user, token))
+    return token.user
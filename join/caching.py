@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from .models import Contacts
+from .serializers import ContactsSerializer
+
+CONTACT_LIST_CACHE_TIMEOUT = getattr(settings, 'JOIN_CONTACT_LIST_CACHE_TIMEOUT', 300)
+"""
+Seconds a serialized contact list is kept in the cache.
+"""
+
+
+def owner_contacts(user):
+    """
+    Return the contacts owned by `user` (their `contactAssignedTo`).
+    """
+    return Contacts.objects.filter(contactAssignedTo=user)
+
+
+def contact_list_key(user):
+    """
+    Build the cache key of the serialized contact list of `user`.
+
+    The key contains a fingerprint of the owner's contacts: their number and the
+    latest `updated_at`, read from the `(contactAssignedTo, updated_at)` index
+    without touching the contacts themselves. Creating or changing a contact moves
+    the latest `updated_at`, deleting one lowers the number, so any change of the
+    owner's contacts leads to a new key, while changes of other owners' contacts
+    leave it as is.
+
+    Returns:
+    - The cache key.
+    """
+    fingerprint = owner_contacts(user).aggregate(count=Count('id'), changed=Max('updated_at'))
+    changed = fingerprint['changed'].timestamp() if fingerprint['changed'] else 0
+    return f"join:contacts:{user.pk}:{fingerprint['count']}:{changed}"
+
+
+def cached_contact_list(user, fields=None):
+    """
+    Return the serialized contact list of `user`, serializing it only if it changed.
+
+    Parameters:
+    - `user`: The owner of the contacts.
+    - `fields` (optional): The fields to emit (see `SparseFieldsMixin`); they are
+      picked from the cached full representation.
+
+    Returns:
+    - The list of serialized contacts, ordered by ID.
+    """
+    key = contact_list_key(user)
+    data = cache.get(key)
+    if data is None:
+        data = list(ContactsSerializer(owner_contacts(user).order_by('id'), many=True).data)
+        cache.set(key, data, CONTACT_LIST_CACHE_TIMEOUT)
+    if fields is not None:
+        data = [{name: value for name, value in contact.items() if name in fields} for contact in data]
+    return data
+
@@ -0,0 +1,182 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from django.db import transaction
+from django.db.models import Max
+from .events import broker
+from .models import CollectionVersion, Contacts, TaskItem, Tombstone
+from .response_cache import invalidate
+from .search import reindex_on_commit
+
+TASKS = 'tasks'
+"""
+Collection name of `TaskItem` objects (including their subtasks).
+"""
+
+SUBTASKS = 'subtasks'
+"""
+Collection name of `Subtask` objects, used for tombstones and change events. Subtasks
+are versioned as part of `TASKS`.
+"""
+
+CONTACTS = 'contacts'
+"""
+Collection name of `Contacts` objects.
+"""
+
+COLLECTION_VERSIONS = {TASKS: TASKS, SUBTASKS: TASKS, CONTACTS: CONTACTS}
+"""
+The `CollectionVersion` whose sequence covers each collection: the lists that are
+served (tasks with their subtasks, contacts).
+"""
+
+SEQUENCED_MODELS = {TASKS: TaskItem, CONTACTS: Contacts}
+"""
+Models stamped with the sequence of their last change (their `sequence` field).
+"""
+
+
+_pending = ContextVar('pending_changes', default=None)
+"""
+The changes collected by the innermost active `batched_changes` block, by collection
+and owner.
+"""
+
+
+def record_change(collection, created=(), updated=(), deleted=(), owner=None):
+    """
+    Record that objects of `collection` were created, updated or deleted.
+
+    The model signals (see `join.signals`) call this for every saved or deleted task,
+    subtask and contact and every changed assignment, so writes through the API, the
+    admin and the ORM are all recorded; write paths using bulk statements (which send
+    no signals) call it themselves. In one transaction it bumps the version of the
+    collection (so that clients holding an older copy see it invalidated), stamps
+    the created and updated objects with the new version as their `sequence` and
+    leaves tombstones with that sequence for deleted objects (so that delta syncs
+    can report them, see `join.views.SyncView`). It also schedules the update of the
+    task search index (see `join.search.reindex_on_commit`), invalidates cached task
+    responses (see `join.response_cache`) and, once the surrounding transaction is
+    committed, publishes a change event per action to the `broker`.
+
+    Inside a `batched_changes` block the change is only collected and recorded when
+    the block exits.
+
+    Parameters:
+    - `collection`: The name of the changed collection (`TASKS`, `SUBTASKS` or `CONTACTS`).
+    - `created`, `updated`, `deleted`: Primary keys of the affected objects.
+    - `owner` (optional): ID of the user owning the objects, for collections that are
+      per user (`CONTACTS`).
+    """
+    pending = _pending.get()
+    if pending is not None:
+        changes = pending.setdefault((collection, owner), {'created': {}, 'updated': {}, 'deleted': {}})
+        for action, ids in (('created', created), ('updated', updated), ('deleted', deleted)):
+            changes[action].update(dict.fromkeys(ids))
+        return
+    apply_changes([(collection, owner, created, updated, deleted)])
+
+
+def apply_changes(changes):
+    """
+    Record changes as described in `record_change`, bumping every affected version
+    once (in name order, so concurrent writers lock the versions in the same order)
+    and writing the sequence stamps and tombstones of all changes with one statement
+    per model.
+
+    The version is bumped in the transaction that stamps the objects, so the
+    sequences are ordered like the commits: once a version is visible, so are all
+    objects and tombstones stamped with it or a lower sequence.
+
+    Parameters:
+    - `changes`: Tuples of `(collection, owner, created, updated, deleted)`.
+    """
+    changes = [
+        (collection, owner, list(created), list(updated), list(deleted))
+        for collection, owner, created, updated, deleted in changes
+        if created or updated or deleted
+    ]
+    if not changes:
+        return
+    with transaction.atomic(savepoint=False):
+        names = sorted({COLLECTION_VERSIONS[collection] for collection, *_ in changes})
+        sequences = {name: CollectionVersion.bump(name) for name in names}
+        stamped, tombstones = {}, []
+        for collection, owner, created, updated, deleted in changes:
+            sequence = sequences[COLLECTION_VERSIONS[collection]]
+            if collection in SEQUENCED_MODELS:
+                stamped.setdefault(collection, []).extend([*created, *updated])
+            tombstones.extend(
+                Tombstone(collection=collection, object_id=pk, owner=owner, sequence=sequence) for pk in deleted
+            )
+        for collection, ids in stamped.items():
+            if ids:
+                model = SEQUENCED_MODELS[collection]
+                model.objects.filter(pk__in=ids).update(sequence=sequences[COLLECTION_VERSIONS[collection]])
+        if tombstones:
+            Tombstone.objects.bulk_create(tombstones)
+    for collection, owner, created, updated, deleted in changes:
+        if collection == TASKS:
+            reindex_on_commit([*created, *updated], deleted)
+        if collection in (TASKS, SUBTASKS):
+            invalidate('tasks')
+        for action, ids in (('created', created), ('updated', updated), ('deleted', deleted)):
+            if ids:
+                transaction.on_commit(partial(broker.publish, collection, action, ids, owner))
+
+
+@contextmanager
+def batched_changes():
+    """
+    Collect the changes recorded inside the block (by a write path and by the model
+    signals it triggers) and record them when the block exits without an error, with
+    one version bump, one stamp update and one tombstone insert, however many objects
+    were written, and one event per collection and action. Objects deleted in the
+    block are only reported as deleted, objects created in the block only as created.
+    Nested blocks are recorded by the outermost one.
+
+    Usable as a decorator; it has to run inside the transaction of the writes.
+    """
+    if _pending.get() is not None:
+        yield
+        return
+    pending = {}
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    batch = []
+    for (collection, owner), changes in pending.items():
+        deleted = changes['deleted']
+        created = [pk for pk in changes['created'] if pk not in deleted]
+        updated = [pk for pk in changes['updated'] if pk not in deleted and pk not in changes['created']]
+        batch.append((collection, owner, created, updated, list(deleted)))
+    apply_changes(batch)
+
+
+def prune_tombstones(before):
+    """
+    Delete the tombstones of objects deleted before `before`.
+
+    Tombstones are deleted up to the highest sequence among the expired ones, and
+    that sequence is kept as the `pruned` mark of the version: delta syncs from an
+    older cursor could miss deletions and are answered with a full resync instead.
+
+    Parameters:
+    - `before`: The oldest deletion time to keep.
+
+    Returns:
+    - The number of deleted tombstones.
+    """
+    count = 0
+    for name in sorted(set(COLLECTION_VERSIONS.values())):
+        collections = [collection for collection, version in COLLECTION_VERSIONS.items() if version == name]
+        tombstones = Tombstone.objects.filter(collection__in=collections)
+        pruned = tombstones.filter(deleted_at__lt=before).aggregate(pruned=Max('sequence'))['pruned']
+        if pruned is None:
+            continue
+        with transaction.atomic():
+            count += tombstones.filter(sequence__lte=pruned).delete()[0]
+            CollectionVersion.objects.filter(name=name, pruned__lt=pruned).update(pruned=pruned)
+    return count
@@ -0,0 +1,116 @@
+import hashlib
+from functools import wraps
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from .models import CollectionVersion
+
+
+def collection_etag(version, request=None):
+    """
+    Build the `ETag` header value for a collection version.
+
+    The lists depend on the requesting user (contacts are scoped to their owner,
+    tasks can be filtered with `assignee=me`) and on the query parameters (filters,
+    `fields`, `view`, pagination cursors), so both are part of the tag; the query
+    parameters as a digest of their sorted names and values.
+
+    Parameters:
+    - `version`: The `CollectionVersion` of the collection.
+    - `request` (optional): The request the list is served for.
+
+    Returns:
+    - The quoted entity tag, e.g. `"tasks-7-42"` (`"tasks-42"` without a request,
+      `"tasks-7-42-<digest>"` with query parameters).
+    """
+    if request is None:
+        return f'"{version.name}-{version.version}"'
+    user = getattr(request, 'user', None)
+    parts = [version.name, str(version.version)]
+    if user is not None and user.pk is not None:
+        parts.insert(1, str(user.pk))
+    query = sorted((name, value) for name, values in request.GET.lists() for value in values)
+    if query:
+        parts.append(hashlib.sha256(repr(query).encode()).hexdigest()[:16])
+    return f'"{"-".join(parts)}"'
+
+
+def not_modified_response(request, version):
+    """
+    Answer a conditional request against a collection version.
+
+    Parameters:
+    - `request`: The request carrying `If-None-Match` / `If-Modified-Since` headers.
+    - `version`: The current `CollectionVersion` of the requested collection.
+
+    Returns:
+    - A `304 Not Modified` response if the client already holds `version`,
+      otherwise `None`.
+    """
+    response = get_conditional_response(
+        request, etag=collection_etag(version, request), last_modified=_last_modified(version)
+    )
+    if response is not None:
+        add_validators(response, version, request)
+    return response
+
+
+def add_validators(response, version, request=None):
+    """
+    Tag a collection response with `ETag` and `Last-Modified` headers.
+
+    Responses built for a request also vary on the `Authorization` header, so
+    shared caches do not serve them to other users.
+
+    Parameters:
+    - `response`: The response to tag.
+    - `version`: The `CollectionVersion` the response was built from.
+    - `request` (optional): The request the response was built for (see `collection_etag`).
+    """
+    response['ETag'] = collection_etag(version, request)
+    if request is not None:
+        patch_vary_headers(response, ['Authorization'])
+    last_modified = _last_modified(version)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+
+
+def _last_modified(version):
+    """
+    Return the modification time of `version` as a timestamp, or `None`.
+    """
+    return version.updated_at.timestamp() if version.updated_at else None
+
+
+def conditional_collection(collection):
+    """
+    Decorator for list `get` methods that answers conditional requests.
+
+    The current version of `collection` is looked up with a single primary key
+    query and compared against the `If-None-Match` / `If-Modified-Since` request
+    headers. If the client already holds the current version, `304 Not Modified` is
+    returned without running the view. Otherwise the view runs and its response is
+    tagged with `ETag` and `Last-Modified` headers. Entity tags are per user and
+    query string.
+
+    Requests for a single object (an `id` URL argument) are passed through
+    unchanged.
+
+    Parameters:
+    - `collection`: The name of the collection served by the decorated method.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if kwargs.get('id') is not None:
+                return method(view, request, *args, **kwargs)
+            version = CollectionVersion.current(collection)
+            response = not_modified_response(request, version)
+            if response is not None:
+                return response
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                add_validators(response, version, request)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,164 @@
+import asyncio
+import itertools
+import threading
+from collections import deque
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+"""
+Maximum number of undelivered events per subscriber before it is marked as overflowed.
+"""
+
+
+class Subscription:
+    """
+    A subscriber of the `ChangeBroker`, bound to the event loop it was created in.
+
+    Attributes:
+    - `user_id`: ID of the subscribing user; events of objects owned by other users
+      are not delivered.
+    - `overflowed`: Set when events had to be dropped because the subscriber did not
+      keep up, or could not be replayed; the subscriber should then resynchronize.
+    """
+
+    def __init__(self, broker, loop, user_id=None):
+        self.broker = broker
+        self.loop = loop
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def accepts(self, event):
+        """
+        Check whether the subscriber may receive `event`: events without an owner go
+        to everyone, the others only to their owner.
+        """
+        return event['owner'] is None or event['owner'] == self.user_id
+
+    def deliver(self, event):
+        """
+        Queue an event for the subscriber (runs in the subscriber's event loop).
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """
+        Wait for the next event.
+
+        Returns:
+        - The next event, or `None` if no event arrived within `timeout` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.broker.unsubscribe(self)
+
+
+class ChangeBroker:
+    """
+    In-process publish/subscribe broker for change events of the API collections.
+
+    Events are published from any thread (usually after the committing write) and
+    delivered to the subscribers' event loops. The most recent events are kept so
+    that reconnecting subscribers can catch up from the last event they saw.
+
+    The broker only reaches subscribers of the same process; deployments running
+    several worker processes need a shared broker instead.
+
+    Event format:
+    - `id`: Sequence number of the event, increasing per process.
+    - `type`: The collection, e.g. "tasks", "subtasks" or "contacts".
+    - `action`: "created", "updated" or "deleted".
+    - `ids`: Primary keys of the affected objects.
+    - `owner`: ID of the user owning the objects (contacts), or `None` for objects
+      every user may see.
+    """
+
+    def __init__(self, history=1000):
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._last_id = 0
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+
+    def publish(self, collection, action, ids, owner=None):
+        """
+        Publish a change event to the subscribers allowed to see it.
+
+        Parameters:
+        - `collection`: The name of the changed collection.
+        - `action`: "created", "updated" or "deleted".
+        - `ids`: Primary keys of the affected objects.
+        - `owner` (optional): ID of the user owning the objects; only this user
+          receives the event.
+
+        Returns:
+        - The published event.
+        """
+        with self._lock:
+            event = {
+                'id': next(self._sequence), 'type': collection, 'action': action, 'ids': list(ids), 'owner': owner,
+            }
+            self._last_id = event['id']
+            self._history.append(event)
+            subscribers = [subscription for subscription in self._subscribers if subscription.accepts(event)]
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's event loop is closed.
+                self.unsubscribe(subscription)
+        return event
+
+    def subscribe(self, last_event_id=None, user_id=None):
+        """
+        Register a subscriber in the running event loop.
+
+        Parameters:
+        - `last_event_id` (optional): ID of the last event the subscriber received
+          before; the newer events it may see that are still held in the history are
+          queued for it. If events after it are no longer held, or it was never
+          published (e.g. it was issued before a restart), the subscription starts
+          out `overflowed` instead.
+        - `user_id` (optional): ID of the subscribing user (see `Subscription.accepts`).
+
+        Returns:
+        - A `Subscription`, to be used as a context manager that unsubscribes on exit.
+        """
+        subscription = Subscription(self, asyncio.get_running_loop(), user_id)
+        missed = []
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id is not None:
+                oldest_id = self._history[0]['id'] if self._history else self._last_id + 1
+                if not oldest_id - 1 <= last_event_id <= self._last_id:
+                    subscription.overflowed = True
+                else:
+                    missed = [
+                        event for event in self._history
+                        if event['id'] > last_event_id and subscription.accepts(event)
+                    ]
+        for event in missed:
+            subscription.deliver(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Remove a subscriber.
+        """
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+broker = ChangeBroker()
+"""
+The process-wide change broker.
+"""
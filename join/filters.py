@@ -0,0 +1,77 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from .models import TaskItem
+
+TASK_ORDERING_FIELDS = ('id', 'title', 'dueDate', 'prio', 'category', 'categoryboard', 'updated_at')
+"""
+Fields the task list can be ordered by with `?ordering=<field>` (or `-<field>` for descending).
+"""
+
+
+def query_values(params, name):
+    """
+    Read a multi-valued query parameter, given repeatedly or as a comma-separated list.
+
+    Parameters:
+    - `params`: The query parameters (`QueryDict`).
+    - `name`: The name of the parameter.
+
+    Returns:
+    - The list of non-empty values.
+    """
+    return [value for values in params.getlist(name) for value in values.split(',') if value]
+
+
+def filter_tasks(queryset, params, user=None):
+    """
+    Filter and order a task queryset by the query parameters of a task list request.
+
+    All filters are optional and combined with AND; multi-valued filters match any of
+    their values. They are backed by the indexes of `TaskItem`.
+
+    Parameters:
+    - `queryset`: The task queryset.
+    - `params`: The query parameters (`QueryDict`):
+      - `categoryboard`: Board column(s), e.g. "todo,inProgress".
+      - `prio`: Priority (or priorities).
+      - `category`: Category (or categories).
+      - `assignee`: ID(s) of assigned users, "me" for the requesting user.
+      - `due_after`, `due_before`: Due date range (ISO dates, inclusive).
+      - `ordering`: One of `TASK_ORDERING_FIELDS`, prefixed with "-" for descending.
+        Ties are ordered by ID.
+    - `user` (optional): The requesting user, for `assignee=me`.
+
+    Returns:
+    - The filtered and ordered queryset.
+
+    Raises:
+    - `ValidationError` if a parameter is malformed.
+    """
+    for name in ('categoryboard', 'prio', 'category'):
+        values = query_values(params, name)
+        if values:
+            queryset = queryset.filter(**{f'{name}__in': values})
+
+    assignees = query_values(params, 'assignee')
+    if assignees:
+        try:
+            user_ids = [user.pk if value == 'me' and user is not None else int(value) for value in assignees]
+        except ValueError:
+            raise ValidationError({'assignee': ['Expected user IDs or "me".']})
+        # A subquery instead of a join, so tasks with several matching assignees are not duplicated.
+        assignments = TaskItem.assignedToID.through.objects.filter(customuser_id__in=user_ids)
+        queryset = queryset.filter(id__in=assignments.values('taskitem_id'))
+
+    for name, lookup in (('due_after', 'dueDate__gte'), ('due_before', 'dueDate__lte')):
+        if params.get(name):
+            try:
+                queryset = queryset.filter(**{lookup: serializers.DateField().to_internal_value(params[name])})
+            except serializers.ValidationError as exc:
+                raise ValidationError({name: exc.detail})
+
+    ordering = params.get('ordering') or 'id'
+    if ordering.lstrip('-') not in TASK_ORDERING_FIELDS:
+        raise ValidationError({'ordering': [f'Expected one of: {", ".join(TASK_ORDERING_FIELDS)}.']})
+    if ordering.lstrip('-') == 'id':
+        return queryset.order_by(ordering)
+    return queryset.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
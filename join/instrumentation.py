@@ -0,0 +1,191 @@
+import heapq
+import logging
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+from time import perf_counter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+"""
+Upper bounds (in milliseconds) of the latency histogram buckets; slower requests
+fall into a last, unbounded bucket.
+"""
+
+_current = ContextVar('join_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Measurements of a single request, collected while it is served.
+
+    Attributes:
+    - `query_count`: Number of SQL statements executed.
+    - `sql_seconds`: Total time spent executing them.
+    - `timings`: Seconds spent per named section (e.g. `serializer`, see `timed`).
+    - `slowest_queries`: The slowest statements as `(seconds, sql)` pairs, slowest
+      first; at most `keep_queries` are kept.
+    """
+
+    def __init__(self, keep_queries=5):
+        self.query_count = 0
+        self.sql_seconds = 0.0
+        self.timings = {}
+        self.keep_queries = keep_queries
+        self._queries = []
+        self._order = count()
+        self._open = set()
+
+    def add_query(self, sql, seconds):
+        """
+        Count an executed statement, keeping it if it is among the slowest.
+        """
+        self.query_count += 1
+        self.sql_seconds += seconds
+        if self.keep_queries:
+            entry = (seconds, next(self._order), sql)
+            if len(self._queries) < self.keep_queries:
+                heapq.heappush(self._queries, entry)
+            else:
+                heapq.heappushpop(self._queries, entry)
+
+    def add_time(self, name, seconds):
+        """
+        Add `seconds` to the section `name`.
+        """
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    @property
+    def slowest_queries(self):
+        return [(seconds, sql) for seconds, _, sql in sorted(self._queries, reverse=True)]
+
+
+def current_metrics():
+    """
+    Return the `RequestMetrics` of the request being served, or None outside of
+    an instrumented request.
+    """
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """
+    Context manager adding the time spent in its block to the section `name` of the
+    current request. Nested blocks of the same section are only counted once.
+    """
+    metrics = _current.get()
+    if metrics is None or name in metrics._open:
+        yield
+        return
+    metrics._open.add(name)
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, perf_counter() - start)
+        metrics._open.discard(name)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper timing the statements of instrumented requests.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, perf_counter() - start)
+
+
+class LatencyHistograms:
+    """
+    Thread-safe rolling latency histograms per endpoint of this worker process.
+
+    The latest `window` latencies of every endpoint are kept, so the histograms and
+    percentiles reflect recent traffic instead of everything since startup.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies = {}
+
+    def record(self, endpoint, milliseconds):
+        """
+        Record the latency of a request to `endpoint`.
+        """
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None:
+                latencies = self._latencies[endpoint] = deque(maxlen=self.window)
+            latencies.append(milliseconds)
+
+    def reset(self):
+        """
+        Drop all recorded latencies.
+        """
+        with self._lock:
+            self._latencies.clear()
+
+    def snapshot(self):
+        """
+        Return the histograms.
+
+        Returns:
+        - Dict mapping each endpoint (e.g. "GET join/api/tasks/") to the number of
+          recorded requests, their `p50`, `p90`, `p99` and `max` latencies in
+          milliseconds, and the request count per bucket of `LATENCY_BUCKETS_MS`
+          (keyed by the bucket's upper bound, "inf" for the last one).
+        """
+        with self._lock:
+            recorded = {endpoint: sorted(latencies) for endpoint, latencies in self._latencies.items()}
+        snapshot = {}
+        for endpoint, latencies in sorted(recorded.items()):
+            buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            for milliseconds in latencies:
+                buckets[bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+            snapshot[endpoint] = {
+                'count': len(latencies),
+                **{f'p{percent}': _percentile(latencies, percent) for percent in (50, 90, 99)},
+                'max': latencies[-1],
+                'buckets': dict(zip([str(bound) for bound in LATENCY_BUCKETS_MS] + ['inf'], buckets)),
+            }
+        return snapshot
+
+
+def _percentile(ordered, percent):
+    """
+    Nearest-rank percentile of the sorted, non-empty list `ordered`.
+    """
+    return ordered[max(0, -(-len(ordered) * percent // 100) - 1)]
+
+
+latency_histograms = LatencyHistograms(getattr(settings, 'JOIN_LATENCY_WINDOW', 1000))
+
+
+def endpoint_name(request):
+    """
+    Name the endpoint of a request by its method and URL pattern (e.g. "GET
+    join/api/tasks/<int:id>/"), so requests for different objects share one histogram.
+    """
+    match = getattr(request, 'resolver_match', None)
+    return f'{request.method} {match.route if match is not None else "<unmatched>"}'
+
+
+def server_timing(metrics, total_seconds):
+    """
+    Format the measurements of a request as a `Server-Timing` header value.
+    """
+    entries = [f'db;dur={metrics.sql_seconds * 1000:.1f};desc="{metrics.query_count} queries"']
+    entries += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in sorted(metrics.timings.items())]
+    entries.append(f'total;dur={total_seconds * 1000:.1f}')
+    return ', '.join(entries)
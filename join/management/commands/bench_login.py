@@ -0,0 +1,86 @@
+import asyncio
+import statistics
+import uuid
+from time import perf_counter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from join.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    Benchmark of login throughput against concurrent board reads under ASGI.
+
+    Sends a burst of logins while a stream of task list requests is running, once
+    with the sync `LoginView` (`joinbackend.urls`) and once with the async
+    `AsyncLoginView` (`joinbackend.asgi_urls`), both through Django's ASGI request
+    handling. Prints the login throughput and the latency of the board reads
+    that ran during the burst.
+
+    A temporary user is created for the benchmark and deleted afterwards.
+
+    Usage:
+    - `python manage.py bench_login --logins 16 --reads 200 --concurrency 16`
+    """
+    help = 'Compares login throughput and concurrent board read latency of the sync and async login views.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=16, help='Number of logins in the burst.')
+        parser.add_argument('--reads', type=int, default=200, help='Number of task list requests.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent task list requests.')
+
+    def handle(self, *args, **options):
+        username = f'bench-login-{uuid.uuid4().hex[:8]}'
+        password = uuid.uuid4().hex
+        user = CustomUser.objects.create_user(username=username, password=password)
+        token = Token.objects.create(user=user)
+        try:
+            self.stdout.write(f'{"login view":<12}{"logins/s":>10}{"read p50 ms":>13}{"read p99 ms":>13}')
+            for label, urlconf in (('sync', 'joinbackend.urls'), ('async', 'joinbackend.asgi_urls')):
+                with override_settings(ROOT_URLCONF=urlconf, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                    logins_per_second, latencies = asyncio.run(
+                        self.run_burst(username, password, token.key, options)
+                    )
+                quantiles = statistics.quantiles(latencies, n=100)
+                self.stdout.write(
+                    f'{label:<12}{logins_per_second:>10.1f}{quantiles[49]:>13.1f}{quantiles[98]:>13.1f}'
+                )
+        finally:
+            user.delete()
+
+    async def run_burst(self, username, password, token_key, options):
+        """
+        Run the login burst and the board reads concurrently.
+
+        Returns:
+        - The login throughput (logins per second) and the read latencies in milliseconds.
+        """
+        client = AsyncClient()
+        login_url = reverse('login')
+        tasks_url = reverse('task-list')
+        read_slots = asyncio.Semaphore(options['concurrency'])
+        latencies = []
+
+        async def login():
+            response = await client.post(
+                login_url, {'username': username, 'password': password}, content_type='application/json'
+            )
+            assert response.status_code == 200, response.content
+
+        async def read():
+            async with read_slots:
+                start = perf_counter()
+                response = await client.get(tasks_url, headers={'Authorization': f'Token {token_key}'})
+                latencies.append((perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.content
+
+        async def burst():
+            start = perf_counter()
+            await asyncio.gather(*(login() for _ in range(options['logins'])))
+            return options['logins'] / (perf_counter() - start)
+
+        logins_per_second, *_ = await asyncio.gather(burst(), *(read() for _ in range(options['reads'])))
+        return logins_per_second, latencies
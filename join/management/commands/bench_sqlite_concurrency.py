@@ -0,0 +1,154 @@
+import sqlite3
+import statistics
+import tempfile
+import threading
+from pathlib import Path
+from time import perf_counter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def open_connection(path, profile):
+    """
+    Open a SQLite connection configured like Django does for the given settings profile.
+
+    Parameters:
+    - `path`: The database file.
+    - `profile`: An entry of `settings.JOIN_SQLITE_PROFILES`.
+
+    Returns:
+    - The connection (in autocommit mode, transactions are started explicitly).
+    """
+    options = profile.get('OPTIONS', {})
+    connection = sqlite3.connect(
+        path, timeout=options.get('timeout', 5), isolation_level=None, check_same_thread=False
+    )
+    for statement in options.get('init_command', '').split(';'):
+        if statement.strip():
+            connection.execute(statement)
+    return connection
+
+
+class Command(BaseCommand):
+    """
+    Benchmark of concurrent reads and writes against the SQLite settings profiles.
+
+    Runs reader threads (task list queries) and writer threads (task updates and
+    inserts) against a temporary database shaped like the task table, once per
+    profile of `settings.JOIN_SQLITE_PROFILES`. Connections are opened per operation
+    unless the profile keeps them open (`CONN_MAX_AGE`), and write transactions use
+    the profile's `transaction_mode`. Prints the read and write latencies and the
+    number of operations that failed with "database is locked".
+
+    Usage:
+    - `python manage.py bench_sqlite_concurrency --readers 8 --writers 4 --operations 200`
+    """
+    help = 'Compares lock contention and latency of concurrent reads and writes per SQLite profile.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='Number of reader threads.')
+        parser.add_argument('--writers', type=int, default=4, help='Number of writer threads.')
+        parser.add_argument('--operations', type=int, default=200, help='Operations per thread.')
+        parser.add_argument('--rows', type=int, default=2000, help='Number of tasks in the table.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"profile":<13}{"read p50":>10}{"read p99":>10}{"write p50":>11}{"write p99":>11}{"locked":>8}'
+        )
+        for name, profile in settings.JOIN_SQLITE_PROFILES.items():
+            with tempfile.TemporaryDirectory() as directory:
+                path = str(Path(directory) / 'bench.sqlite3')
+                self.create_table(path, options['rows'])
+                reads, writes, locked = self.run(path, profile, options)
+            read_quantiles = statistics.quantiles(reads, n=100)
+            write_quantiles = statistics.quantiles(writes, n=100)
+            self.stdout.write(
+                f'{name:<13}{read_quantiles[49]:>10.2f}{read_quantiles[98]:>10.2f}'
+                f'{write_quantiles[49]:>11.2f}{write_quantiles[98]:>11.2f}{locked:>8}'
+            )
+        self.stdout.write('Latencies in milliseconds.')
+
+    def create_table(self, path, rows):
+        """
+        Create and fill the benchmark table.
+        """
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE task (id INTEGER PRIMARY KEY, title TEXT, description TEXT, '
+            'categoryboard TEXT, prio TEXT, updated_at REAL)'
+        )
+        connection.executemany(
+            'INSERT INTO task (title, description, categoryboard, prio, updated_at) VALUES (?, ?, ?, ?, ?)',
+            [(f'Task {index}', 'x' * 200, 'todo', 'medium', perf_counter()) for index in range(rows)],
+        )
+        connection.commit()
+        connection.close()
+
+    def run(self, path, profile, options):
+        """
+        Run the reader and writer threads.
+
+        Returns:
+        - The read latencies, the write latencies (both in milliseconds) and the number
+          of operations that failed because the database was locked.
+        """
+        persistent = bool(profile.get('CONN_MAX_AGE'))
+        begin = f"BEGIN {profile.get('OPTIONS', {}).get('transaction_mode', '')}".strip()
+        reads, writes = [], []
+        locked = 0
+        lock = threading.Lock()
+        start = threading.Barrier(options['readers'] + options['writers'])
+
+        def read(connection, index):
+            connection.execute(
+                'SELECT * FROM task WHERE categoryboard = ? ORDER BY id LIMIT 50 OFFSET ?', ('todo', index % 40 * 50)
+            ).fetchall()
+
+        def write(connection, index):
+            # Read-then-write, like a serializer update.
+            connection.execute(begin)
+            try:
+                connection.execute('SELECT title FROM task WHERE id = ?', (index + 1,)).fetchone()
+                connection.execute(
+                    'UPDATE task SET prio = ?, updated_at = ? WHERE id = ?', ('urgent', perf_counter(), index + 1)
+                )
+                connection.execute(
+                    'INSERT INTO task (title, description, categoryboard, prio, updated_at) VALUES (?, ?, ?, ?, ?)',
+                    ('New task', 'x' * 200, 'todo', 'low', perf_counter()),
+                )
+                connection.execute('COMMIT')
+            except sqlite3.OperationalError:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                raise
+
+        def worker(operation, latencies):
+            nonlocal locked
+            connection = open_connection(path, profile) if persistent else None
+            start.wait()
+            for index in range(options['operations']):
+                began = perf_counter()
+                current = connection or open_connection(path, profile)
+                try:
+                    operation(current, index)
+                except sqlite3.OperationalError as error:
+                    if 'locked' not in str(error):
+                        raise
+                    with lock:
+                        locked += 1
+                    continue
+                finally:
+                    if current is not connection:
+                        current.close()
+                with lock:
+                    latencies.append((perf_counter() - began) * 1000)
+            if connection is not None:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(read, reads)) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=(write, writes)) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return reads, writes, locked
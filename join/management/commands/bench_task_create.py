@@ -0,0 +1,95 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from join.changes import TASKS
+from join.models import CollectionVersion, CustomUser, Subtask, TaskItem
+from join.serializers import TaskItemSerializer
+
+
+def legacy_create(validated_data):
+    """
+    The task creation path used before the single-write path, kept for comparison.
+
+    Inserts the task, sets the assigned users, saves the task a second time with its
+    list fields and inserts every subtask on its own.
+    """
+    subtasks_data = validated_data.pop('subtasks', [])
+    assignedToID = validated_data.pop('assignedToID', [])
+    assignedTo = validated_data.pop('assignedTo', [])
+    colors = validated_data.pop('colors', [])
+    task = TaskItem.objects.create(**validated_data)
+    task.assignedToID.set(assignedToID)
+    task.assignedTo = assignedTo
+    task.colors = colors
+    task.save()
+    for subtask_data in subtasks_data:
+        subtask_data.pop('id', None)
+        Subtask.objects.create(parent_task=task, **subtask_data)
+    return task
+
+
+class Command(BaseCommand):
+    """
+    Benchmark of the SQL statements and time spent per created task.
+
+    Creates the same task repeatedly through the legacy creation path and through
+    `TaskItemSerializer.create`, then prints the statements and milliseconds per
+    task for both. Everything runs in a transaction that is rolled back at the end,
+    so the database is left unchanged.
+
+    Usage:
+    - `python manage.py bench_task_create --tasks 200 --subtasks 3 --users 2`
+    """
+    help = 'Compares the SQL statements and time per task creation before and after the single-write path.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=200, help='Number of tasks created per path.')
+        parser.add_argument('--subtasks', type=int, default=3, help='Number of subtasks per task.')
+        parser.add_argument('--users', type=int, default=2, help='Number of users assigned to each task.')
+
+    def handle(self, *args, **options):
+        count = options['tasks']
+        with transaction.atomic():
+            users = [
+                CustomUser.objects.create(username=f'bench-task-create-{index}')
+                for index in range(options['users'])
+            ]
+            serializer = TaskItemSerializer(data={
+                'title': 'Benchmark task',
+                'description': 'Created by bench_task_create',
+                'assignedTo': [user.username for user in users],
+                'colors': ['#FFFFFF' for user in users],
+                'category': 'Benchmark',
+                'categoryboard': 'todo',
+                'dueDate': '2024-10-01',
+                'prio': 'medium',
+                'assignedToID': [user.id for user in users],
+                'subtasks': [
+                    {'title': f'Subtask {index}', 'subtaskStatus': False}
+                    for index in range(options['subtasks'])
+                ],
+            })
+            serializer.is_valid(raise_exception=True)
+            validated_data = serializer.validated_data
+
+            def fresh_data():
+                data = dict(validated_data)
+                data['subtasks'] = [dict(subtask) for subtask in validated_data['subtasks']]
+                data['assignedToID'] = list(validated_data['assignedToID'])
+                return data
+
+            # Make sure both paths only update the existing collection version row.
+            CollectionVersion.bump(TASKS)
+            self.stdout.write(f'{"path":<8}{"statements/task":>18}{"ms/task":>10}')
+            for label, create in (('before', legacy_create), ('after', TaskItemSerializer().create)):
+                payloads = [fresh_data() for _ in range(count)]
+                with CaptureQueriesContext(connection) as queries:
+                    start = perf_counter()
+                    for payload in payloads:
+                        create(payload)
+                    elapsed = perf_counter() - start
+                self.stdout.write(
+                    f'{label:<8}{len(queries) / count:>18.1f}{elapsed * 1000 / count:>10.3f}'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,29 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from join.changes import prune_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Delete the tombstones of objects deleted longer ago than the retention period.
+
+    Delta syncs from cursors older than the pruned tombstones are answered with a
+    full resync (see `join.views.SyncView`). Meant to run periodically (e.g. daily
+    from cron).
+
+    Usage:
+    - `python manage.py prune_tombstones --days 30`
+    """
+    help = 'Deletes the tombstones of objects deleted longer ago than the retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'JOIN_TOMBSTONE_RETENTION_DAYS', 30),
+            help='Days tombstones are kept (default: JOIN_TOMBSTONE_RETENTION_DAYS).',
+        )
+
+    def handle(self, *args, **options):
+        count = prune_tombstones(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(f'Pruned {count} tombstone(s).')
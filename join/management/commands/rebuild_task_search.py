@@ -0,0 +1,24 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from join.search import rebuild_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the full-text search index of the tasks from the task table.
+
+    The index is kept up to date by every committed ORM write of tasks and subtasks
+    (see `join.search.reindex_on_commit`); rebuilding is needed after tasks were
+    changed past the ORM (e.g. raw SQL or a restored database file).
+
+    Usage:
+    - `python manage.py rebuild_task_search`
+    """
+    help = 'Rebuilds the FTS5 search index of the tasks.'
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(f'Indexed {count} task(s) in {(perf_counter() - start) * 1000:.1f} ms.')
@@ -0,0 +1,48 @@
+import sqlite3
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    Replication stand-in for local read replicas.
+
+    Copies the primary SQLite database to every replica of
+    `settings.JOIN_DB_READ_REPLICAS` with SQLite's online backup API, which takes a
+    consistent snapshot while the primary is in use. Runs once, or repeatedly with
+    `--interval`, which then roughly is the replication lag.
+
+    Usage:
+    - `JOIN_DB_REPLICAS='["replica.sqlite3"]' python manage.py replicate_sqlite --interval 1`
+    """
+    help = 'Copies the primary SQLite database to the read replicas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0, help='Seconds between copies (0: copy once).')
+
+    def handle(self, *args, **options):
+        replicas = settings.JOIN_DB_READ_REPLICAS
+        if not replicas:
+            self.stderr.write('No replicas configured (set JOIN_DB_REPLICAS).')
+            return
+        while True:
+            start = time.perf_counter()
+            for alias in replicas:
+                self.copy(settings.DATABASES['default']['NAME'], settings.DATABASES[alias]['NAME'])
+            self.stdout.write(f'Replicated to {len(replicas)} replica(s) in {(time.perf_counter() - start) * 1000:.1f} ms.')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def copy(self, source_path, target_path):
+        """
+        Copy the database at `source_path` to `target_path`.
+        """
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path, timeout=5)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
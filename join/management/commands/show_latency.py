@@ -0,0 +1,53 @@
+import json
+import os
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Print the per-endpoint latency histograms and cache counters of a running server.
+
+    The measurements are kept in the memory of each worker process, so they are read
+    from the staff-only metrics endpoint (`join/api/metrics/`) of the server; with
+    several workers, every call reports the worker that served it.
+
+    Usage:
+    - `python manage.py show_latency --url https://example.com/join/api/metrics/ --token <staff token>`
+    - The token can also be given in the `JOIN_METRICS_TOKEN` environment variable.
+    """
+    help = 'Shows the per-endpoint latency histograms of a running server.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000/join/api/metrics/', help='URL of the metrics endpoint.'
+        )
+        parser.add_argument('--token', default=os.getenv('JOIN_METRICS_TOKEN'), help='API token of a staff user.')
+        parser.add_argument('--buckets', action='store_true', help='Also print the histogram buckets.')
+
+    def handle(self, *args, **options):
+        if not options['token']:
+            raise CommandError('A staff token is required (--token or JOIN_METRICS_TOKEN).')
+        request = Request(options['url'], headers={'Authorization': f'Token {options["token"]}'})
+        try:
+            with urlopen(request, timeout=10) as response:
+                metrics = json.load(response)
+        except URLError as error:
+            raise CommandError(f'Could not read {options["url"]}: {error}')
+
+        self.stdout.write(f'{"endpoint":<48}{"count":>7}{"p50":>9}{"p90":>9}{"p99":>9}{"max":>9}')
+        for endpoint, histogram in metrics['endpoints'].items():
+            self.stdout.write(
+                f'{endpoint:<48}{histogram["count"]:>7}{histogram["p50"]:>9.1f}{histogram["p90"]:>9.1f}'
+                f'{histogram["p99"]:>9.1f}{histogram["max"]:>9.1f}'
+            )
+            if options['buckets']:
+                self.stdout.write('  ' + '  '.join(
+                    f'<={bound}: {requests}' for bound, requests in histogram['buckets'].items() if requests
+                ))
+        self.stdout.write('Latencies in milliseconds.')
+        for name in ('token_cache', 'response_cache'):
+            counters = ', '.join(f'{key}={value:.2f}' if isinstance(value, float) else f'{key}={value}'
+                                 for key, value in metrics[name].items())
+            self.stdout.write(f'{name}: {counters}')
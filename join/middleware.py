@@ -0,0 +1,244 @@
+from time import perf_counter
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from .authentication import CachedTokenAuthentication, aauthenticate_token
+from .instrumentation import RequestMetrics, _current, endpoint_name, latency_histograms, logger, server_timing
+from .profiling import PROFILE_HEADER, capture, requested_profile, save_capture, summarize
+from .routers import _pinned, _written
+
+PRIMARY_COOKIE = 'join_primary'
+"""
+Cookie that keeps the next requests of a client that has written on the primary database.
+"""
+
+
+class PrimaryPinningMiddleware:
+    """
+    Scope the primary database pin of `PrimaryReplicaRouter` to the request.
+
+    Every request starts unpinned (reading from the replicas), unless the client has
+    written within the last `JOIN_DB_PIN_SECONDS` seconds: the middleware then sets a
+    cookie, so that the client's next requests also read from the primary until the
+    replicas have caught up with its write.
+
+    The body of a streamed response is read from the database after the request has
+    been handled, so the pin state of the request is restored while it is produced.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        resets = self.process_request(request)
+        try:
+            return self.process_response(self.get_response(request))
+        finally:
+            self.finish(resets)
+
+    async def __acall__(self, request):
+        resets = self.process_request(request)
+        try:
+            return self.process_response(await self.get_response(request))
+        finally:
+            self.finish(resets)
+
+    def process_request(self, request):
+        """
+        Start the request unpinned, unless the client carries the pin cookie.
+        """
+        return _pinned.set(PRIMARY_COOKIE in request.COOKIES), _written.set(False)
+
+    def process_response(self, response):
+        """
+        Set the pin cookie if the request has written, and carry the pin over to the
+        body of streamed responses.
+        """
+        pin_seconds = getattr(settings, 'JOIN_DB_PIN_SECONDS', 0)
+        if _written.get() and pin_seconds and getattr(settings, 'JOIN_DB_READ_REPLICAS', []):
+            response.set_cookie(PRIMARY_COOKIE, '1', max_age=pin_seconds, httponly=True, samesite='Lax')
+        if response.streaming:
+            pin = pinned_content_async if response.is_async else pinned_content
+            response.streaming_content = pin(response.streaming_content, _pinned.get())
+        return response
+
+    def finish(self, resets):
+        """
+        Restore the pin state from before the request.
+        """
+        pinned, written = resets
+        _pinned.reset(pinned)
+        _written.reset(written)
+
+
+def pinned_content(content, pinned):
+    """
+    Yield the chunks of a streamed response body, producing each with the pin state
+    `pinned` of its request. The pin is cleared again after every chunk, so it does
+    not leak into whatever runs between chunks or after the response is closed.
+    """
+    iterator = iter(content)
+    while True:
+        reset = _pinned.set(pinned)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _pinned.reset(reset)
+        yield chunk
+
+
+async def pinned_content_async(content, pinned):
+    """
+    Async variant of `pinned_content`.
+    """
+    iterator = aiter(content)
+    while True:
+        reset = _pinned.set(pinned)
+        try:
+            chunk = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            _pinned.reset(reset)
+        yield chunk
+
+
+class InstrumentationMiddleware:
+    """
+    Measure every request: SQL statements and their time, time spent in sections
+    such as the serializers (see `timed`) and the total time.
+
+    The measurements are sent as a `Server-Timing` header (shown by the browser's
+    developer tools), recorded in the per-endpoint `latency_histograms` and, for
+    requests slower than `JOIN_SLOW_REQUEST_MS`, logged as a warning together with
+    the `JOIN_SLOW_REQUEST_QUERIES` slowest statements. The body of streamed
+    responses is produced after the headers are sent, so only the work up to the
+    first chunk is measured for them.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, reset, start = self.process_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(reset)
+        return self.process_response(request, response, metrics, perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics, reset, start = self.process_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(reset)
+        return self.process_response(request, response, metrics, perf_counter() - start)
+
+    def process_request(self, request):
+        """
+        Start collecting the measurements of the request.
+        """
+        metrics = RequestMetrics(keep_queries=getattr(settings, 'JOIN_SLOW_REQUEST_QUERIES', 5))
+        return metrics, _current.set(metrics), perf_counter()
+
+    def process_response(self, request, response, metrics, total_seconds):
+        """
+        Report the measurements of the request.
+        """
+        response['Server-Timing'] = server_timing(metrics, total_seconds)
+        endpoint = endpoint_name(request)
+        latency_histograms.record(endpoint, total_seconds * 1000)
+        if total_seconds * 1000 >= getattr(settings, 'JOIN_SLOW_REQUEST_MS', 500):
+            logger.warning(
+                'Slow request: %s %s (%s) took %.1f ms, %d queries in %.1f ms%s',
+                endpoint, request.get_full_path(), response.status_code, total_seconds * 1000,
+                metrics.query_count, metrics.sql_seconds * 1000,
+                ''.join(f'\n  {seconds * 1000:.1f} ms: {sql}' for seconds, sql in metrics.slowest_queries),
+            )
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile single requests on demand, for staff users only.
+
+    A request with the `X-Join-Profile` header or the `profile` query parameter set
+    to `1` is run under `cProfile` and `tracemalloc` (see `join.profiling.capture`)
+    and the capture is saved to the ring of `JOIN_PROFILE_DIR`; its name is returned
+    in the `X-Join-Profile` response header. With the value `inline`, the response
+    is replaced by the summary of the capture (see `join.profiling.summarize`). If
+    another request is being profiled, the request is served unprofiled and the
+    header is `busy`. Requests of other users ignore the flag.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mode = requested_profile(request)
+        if mode is None or not self.is_staff(request):
+            return self.get_response(request)
+        with capture() as result:
+            response = self.get_response(request)
+        return self.process_response(request, response, result, mode)
+
+    async def __acall__(self, request):
+        mode = requested_profile(request)
+        if mode is None or not await self.ais_staff(request):
+            return await self.get_response(request)
+        with capture() as result:
+            response = await self.get_response(request)
+        return self.process_response(request, response, result, mode)
+
+    def is_staff(self, request):
+        """
+        Check whether the request comes from a staff user, by token or session.
+        """
+        try:
+            credentials = CachedTokenAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        user = credentials[0] if credentials is not None else request.user
+        return user.is_active and user.is_staff
+
+    async def ais_staff(self, request):
+        """
+        Async counterpart of `is_staff`.
+        """
+        user = await aauthenticate_token(request) or await request.auser()
+        return user.is_active and user.is_staff
+
+    def process_response(self, request, response, result, mode):
+        """
+        Save the capture and report it in the response.
+        """
+        if result is None:
+            response[PROFILE_HEADER] = 'busy'
+            return response
+        name = save_capture(result, request)
+        if mode == 'inline':
+            response = JsonResponse({'profile': name, 'status': response.status_code, **summarize(result)})
+        response[PROFILE_HEADER] = name
+        return response
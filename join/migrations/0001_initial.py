@@ -0,0 +1,88 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:27
+
+import django.contrib.auth.models
+import django.contrib.auth.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('username', models.CharField(error_messages={'unique': 'A user with that username already exists.'}, help_text='Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.', max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator()], verbose_name='username')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='email address')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('is_active', models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('initials', models.CharField(max_length=10)),
+                ('color', models.CharField(max_length=7)),
+                ('rememberlogin', models.BooleanField(default=False)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+            ],
+            options={
+                'verbose_name': 'user',
+                'verbose_name_plural': 'users',
+                'abstract': False,
+            },
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Contacts',
+            fields=[
+                ('firstname', models.CharField(blank=True, max_length=100, null=True)),
+                ('lastname', models.CharField(blank=True, max_length=100, null=True)),
+                ('fullname', models.CharField(blank=True, max_length=100, null=True)),
+                ('initials', models.CharField(blank=True, max_length=5, null=True)),
+                ('email', models.EmailField(blank=True, max_length=100, null=True)),
+                ('phone', models.CharField(blank=True, max_length=100, null=True)),
+                ('color', models.CharField(blank=True, max_length=7, null=True)),
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('taskassigned', models.BooleanField(default=False, verbose_name='Task assigned')),
+                ('contactAssignedTo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contacts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assignedTo', models.TextField()),
+                ('category', models.CharField(max_length=100)),
+                ('categoryboard', models.CharField(max_length=100)),
+                ('colors', models.TextField()),
+                ('description', models.TextField(blank=True)),
+                ('dueDate', models.DateField()),
+                ('prio', models.CharField(max_length=100)),
+                ('title', models.CharField(max_length=100)),
+                ('assignedToID', models.ManyToManyField(blank=True, related_name='tasks', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Subtask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100)),
+                ('subtaskStatus', models.BooleanField(default=False)),
+                ('parent_task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subtasks', to='join.taskitem')),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+import json
+from django.db import migrations, models
+
+JSON_FIELDS = ('assignedTo', 'colors')
+
+
+def normalize_json_lists(apps, schema_editor):
+    """
+    Make sure `assignedTo` and `colors` hold valid JSON before the column type changes.
+
+    Empty or malformed values (which the JSON column would reject) become an empty list.
+    """
+    TaskItem = apps.get_model('join', 'TaskItem')
+    tasks = TaskItem.objects.using(schema_editor.connection.alias)
+    changed = []
+    for task in tasks.only('id', *JSON_FIELDS).iterator(chunk_size=1000):
+        dirty = False
+        for name in JSON_FIELDS:
+            try:
+                json.loads(getattr(task, name))
+            except (TypeError, ValueError):
+                setattr(task, name, '[]')
+                dirty = True
+        if dirty:
+            changed.append(task)
+    tasks.bulk_update(changed, JSON_FIELDS, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0003_updated_at_tombstone'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_json_lists, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='taskitem',
+            name='assignedTo',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AlterField(
+            model_name='taskitem',
+            name='colors',
+            field=models.JSONField(default=list),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0004_taskitem_json_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskitem',
+            index=models.Index(fields=['categoryboard', 'dueDate'], name='task_board_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskitem',
+            index=models.Index(fields=['prio', 'dueDate'], name='task_prio_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskitem',
+            index=models.Index(fields=['category', 'dueDate'], name='task_category_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskitem',
+            index=models.Index(fields=['dueDate'], name='task_due_idx'),
+        ),
+    ]
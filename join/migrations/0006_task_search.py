@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Create the FTS5 search index of the tasks (see `join.search`) and fill it.
+    """
+
+    dependencies = [
+        ('join', '0005_taskitem_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE VIRTUAL TABLE join_tasksearch USING fts5("
+                "title, description, category, subtasks, tokenize='unicode61 remove_diacritics 2')",
+                "INSERT INTO join_tasksearch (rowid, title, description, category, subtasks) "
+                "SELECT task.id, task.title, task.description, task.category, "
+                "COALESCE((SELECT group_concat(subtask.title, ' ') FROM join_subtask AS subtask "
+                "WHERE subtask.parent_task_id = task.id), '') "
+                "FROM join_taskitem AS task",
+            ],
+            reverse_sql=['DROP TABLE join_tasksearch'],
+        ),
+    ]
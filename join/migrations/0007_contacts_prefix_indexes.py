@@ -0,0 +1,30 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:53
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0006_task_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contacts',
+            index=models.Index(django.db.models.functions.text.Lower('fullname'), name='contact_fullname_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contacts',
+            index=models.Index(django.db.models.functions.text.Lower('firstname'), name='contact_firstname_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contacts',
+            index=models.Index(django.db.models.functions.text.Lower('lastname'), name='contact_lastname_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contacts',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='contact_email_lower_idx'),
+        ),
+    ]
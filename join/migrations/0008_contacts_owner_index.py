@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0007_contacts_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contacts',
+            index=models.Index(fields=['contactAssignedTo', 'updated_at'], name='contact_owner_updated_idx'),
+        ),
+    ]
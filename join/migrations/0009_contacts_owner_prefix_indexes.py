@@ -0,0 +1,46 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:29
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0008_contacts_owner_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='contacts',
+            name='contact_fullname_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='contacts',
+            name='contact_firstname_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='contacts',
+            name='contact_lastname_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='contacts',
+            name='contact_email_lower_idx',
+        ),
+        migrations.AddIndex(
+            model_name='contacts',
+            index=models.Index(models.F('contactAssignedTo'), django.db.models.functions.text.Lower('fullname'), name='contact_owner_fullname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contacts',
+            index=models.Index(models.F('contactAssignedTo'), django.db.models.functions.text.Lower('firstname'), name='contact_owner_firstname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contacts',
+            index=models.Index(models.F('contactAssignedTo'), django.db.models.functions.text.Lower('lastname'), name='contact_owner_lastname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contacts',
+            index=models.Index(models.F('contactAssignedTo'), django.db.models.functions.text.Lower('email'), name='contact_owner_email_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0009_contacts_owner_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='owner',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
+from django.db.models import F
 from django.conf import settings
+from django.db.models.functions import Lower
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
 class TaskItem(models.Model):
@@ -7,28 +10,43 @@ class TaskItem(models.Model):
     Represents a task item with various attributes such as title, description, priority, and assigned users.
 
     Fields:
-    - `assignedTo`: A JSON-encoded TextField containing the usernames of the assigned users.
+    - `assignedTo`: A JSONField containing the list of usernames of the assigned users.
     - `assignedToID`: Many-to-Many relationship with `CustomUser`, referencing the actual user objects assigned to this task.
     - `category`: The category of the task (e.g., "Work", "Personal").
     - `categoryboard`: The category board of the task, used for grouping under a specific board.
-    - `colors`: A JSON-encoded TextField representing colors (can be used for visual organization).
+    - `colors`: A JSONField containing the list of colors (can be used for visual organization).
     - `description`: A text description of the task.
     - `dueDate`: The due date of the task.
     - `prio`: The priority of the task (e.g., "High", "Medium", "Low").
     - `title`: The title of the task.
+    - `updated_at`: Time of the last change of the task.
+    - `sequence`: Version of the task collection (see `CollectionVersion`) at the last
+      change of the task or one of its subtasks, used for delta syncs.
 
     Methods:
     - `__str__`: Returns a string representation of the task, consisting of its title and description.
     """
-    assignedTo = models.TextField()
+    assignedTo = models.JSONField(default=list)
     assignedToID = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='tasks', blank=True)
     category = models.CharField(max_length=100)
     categoryboard = models.CharField(max_length=100)
-    colors = models.TextField()
+    colors = models.JSONField(default=list)
     description = models.TextField(blank=True)
     dueDate = models.DateField()
     prio = models.CharField(max_length=100)
     title = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    sequence = models.PositiveBigIntegerField(default=0, db_index=True, editable=False)
+
+    class Meta:
+        # Back the filters of the task list (see `join.filters.filter_tasks`): an
+        # equality filter on the leading column, due date ranges and ordering on the next.
+        indexes = [
+            models.Index(fields=['categoryboard', 'dueDate'], name='task_board_due_idx'),
+            models.Index(fields=['prio', 'dueDate'], name='task_prio_due_idx'),
+            models.Index(fields=['category', 'dueDate'], name='task_category_due_idx'),
+            models.Index(fields=['dueDate'], name='task_due_idx'),
+        ]
 
     def __str__(self):
         return f'{self.title} - {self.description}'
@@ -42,6 +60,7 @@ class Subtask(models.Model):
     - `title`: The title of the subtask.
     - `subtaskStatus`: The completion status of the subtask.
     - `parent_task`: ForeignKey relationship to a parent `TaskItem` instance.
+    - `updated_at`: Time of the last change of the subtask.
 
     Relationships:
     - Each `Subtask` belongs to exactly one parent `TaskItem`.
@@ -54,6 +73,7 @@ class Subtask(models.Model):
         related_name='subtasks',
         on_delete=models.CASCADE
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class CustomUser(AbstractUser):
@@ -91,6 +111,9 @@ class Contacts(models.Model):
     - `id`: Primary key that is auto-generated.
     - `taskassigned`: Boolean field indicating whether a task is assigned to this contact.
     - `contactAssignedTo`: ForeignKey to a user (`CustomUser`) responsible for this contact.
+    - `updated_at`: Time of the last change of the contact.
+    - `sequence`: Version of the contact collection (see `CollectionVersion`) at the
+      last change of the contact, used for delta syncs.
 
     Relationships:
     - A `Contact` is linked to a specific `CustomUser`.
@@ -105,3 +128,114 @@ class Contacts(models.Model):
     id = models.AutoField(primary_key=True)
     taskassigned = models.BooleanField(("Task assigned"), default=False)
     contactAssignedTo = models.ForeignKey(CustomUser, related_name='contacts', on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    sequence = models.PositiveBigIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Case-insensitive prefix lookups of the contact autocomplete (see
+        # `join.search.complete_contacts`) are range scans on the `Lower()` indexes,
+        # within the contacts of one owner.
+        indexes = [
+            # The contact list of an owner and its fingerprint (see `join.caching`).
+            models.Index(fields=['contactAssignedTo', 'updated_at'], name='contact_owner_updated_idx'),
+            # The changes of an owner's contacts since a sync cursor (see `join.views.SyncView`).
+            models.Index(fields=['contactAssignedTo', 'sequence'], name='contact_owner_sequence_idx'),
+            models.Index(F('contactAssignedTo'), Lower('fullname'), name='contact_owner_fullname_idx'),
+            models.Index(F('contactAssignedTo'), Lower('firstname'), name='contact_owner_firstname_idx'),
+            models.Index(F('contactAssignedTo'), Lower('lastname'), name='contact_owner_lastname_idx'),
+            models.Index(F('contactAssignedTo'), Lower('email'), name='contact_owner_email_idx'),
+        ]
+
+
+class CollectionVersion(models.Model):
+    """
+    Version counter of an API collection (e.g. all tasks or all contacts).
+
+    The counter is bumped by every create, update or delete in the collection and is
+    used to answer conditional GET requests without querying or serializing the
+    collection itself. It is also the sequence of the collection's changes: changed
+    objects and tombstones are stamped with the version of their change (see
+    `join.changes.record_change`).
+
+    Fields:
+    - `name`: Name of the collection, used as primary key.
+    - `version`: Monotonically increasing version number.
+    - `updated_at`: Time of the last change in the collection.
+    - `pruned`: Highest sequence of the pruned tombstones of the collection (see
+      `join.changes.prune_tombstones`).
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+    pruned = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name} v{self.version}'
+
+    @classmethod
+    def bump(cls, name):
+        """
+        Increment the version of the collection `name`, creating it if necessary.
+
+        Returns:
+        - The new version. Call inside a transaction to read the own increment.
+        """
+        now = timezone.now()
+        versions = cls.objects.filter(name=name)
+        if versions.update(version=models.F('version') + 1, updated_at=now):
+            return versions.values_list('version', flat=True).get()
+        version, created = cls.objects.get_or_create(name=name, defaults={'version': 1, 'updated_at': now})
+        return version.version
+
+    @classmethod
+    def current(cls, name):
+        """
+        Return the version of the collection `name`.
+
+        Collections that have never changed are reported as version 0 without a
+        modification time.
+        """
+        try:
+            return cls.objects.get(name=name)
+        except cls.DoesNotExist:
+            return cls(name=name, version=0, updated_at=None)
+
+    @classmethod
+    async def acurrent(cls, name):
+        """
+        Async variant of `current`.
+        """
+        try:
+            return await cls.objects.aget(name=name)
+        except cls.DoesNotExist:
+            return cls(name=name, version=0, updated_at=None)
+
+
+class Tombstone(models.Model):
+    """
+    Records the deletion of an object so that syncing clients can remove it as well.
+
+    Fields:
+    - `collection`: Name of the collection the deleted object belonged to (e.g. "tasks").
+    - `object_id`: Primary key of the deleted object.
+    - `owner`: ID of the user the object was deleted for, in collections that are
+      per user (contacts; a reassigned contact is deleted for its previous owner),
+      otherwise null. A plain ID, so tombstones outlive their owner.
+    - `deleted_at`: Time of the deletion.
+    - `sequence`: Version of the collection (see `CollectionVersion`) the deletion was
+      recorded with.
+    """
+    collection = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    owner = models.BigIntegerField(blank=True, null=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+    sequence = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['collection', 'deleted_at']),
+            models.Index(fields=['collection', 'sequence']),
+        ]
+
+    def __str__(self):
+        return f'{self.collection} #{self.object_id}'
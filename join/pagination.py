@@ -0,0 +1,161 @@
+import json
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opt-in cursor (keyset) pagination for list endpoints.
+
+    Pages are addressed by an opaque cursor that encodes the position in a stable,
+    unique ordering instead of an OFFSET, so fetching page N costs the same as
+    fetching the first page.
+
+    Pagination is only applied when the client sends a `cursor` or `page_size`
+    query parameter. Requests without either keep receiving the full,
+    unpaginated list. Pages follow the ordering of the queryset (e.g. the one
+    requested with `?ordering=`), or the ID if the queryset is not ordered; the ID
+    is appended as a tiebreaker if the ordering does not end with it. The cursor
+    holds the values of all ordering fields of the last (or first) item of a page,
+    so orderings on non-unique fields such as the due date need no OFFSET either.
+
+    Response (paginated):
+    - `next`: URL of the next page or `None`.
+    - `previous`: URL of the previous page or `None`.
+    - `results`: The serialized items of the current page.
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Paginate the queryset if the client asked for a page.
+
+        Returns:
+        - The list of items of the requested page, or `None` if the request carries
+          neither a cursor nor a page size.
+        """
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        ordering = [self.invert(name) for name in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self.following(ordering, self.decode_position(queryset.model), queryset.model))
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.encode_position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.encode_position(self.page[0])))
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Use the ordering of the queryset, falling back to `ordering`, and end it with
+        the primary key so that it is unique.
+        """
+        ordering = tuple(queryset.query.order_by) or (self.ordering,)
+        pk_name = queryset.model._meta.pk.name
+        if not any(name.lstrip('-') in ('pk', pk_name) for name in ordering):
+            ordering += (f'-{pk_name}' if ordering[0].startswith('-') else pk_name,)
+        return ordering
+
+    def encode_position(self, instance):
+        """
+        Encode the values of the ordering fields of `instance` as the cursor position.
+        """
+        values = [getattr(instance, name.lstrip('-')) for name in self.ordering]
+        return json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+    def decode_position(self, model):
+        """
+        Decode the cursor position into the values of the ordering fields.
+
+        Raises:
+        - `NotFound` if the position does not match the ordering.
+        """
+        try:
+            values = json.loads(self.cursor.position)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                None if value is None else self.model_field(model, name).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def following(self, ordering, position, model):
+        """
+        Build the filter for the items after `position` in `ordering`.
+
+        Compares the ordering fields lexicographically: an item follows if its first
+        field is beyond the position's, or equal and its second field is beyond, and
+        so on. NULLs sort before all other values, like in SQLite. A range condition
+        on the first field is added so that the lookup can seek in its index.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for name, value in zip(ordering, position):
+            field = name.lstrip('-')
+            descending = name.startswith('-')
+            nullable = self.model_field(model, name).null
+            if value is None:
+                beyond = Q(pk__in=[]) if descending else Q(**{f'{field}__isnull': False})
+                same = Q(**{f'{field}__isnull': True})
+            else:
+                beyond = Q(**{f'{field}__{"lt" if descending else "gt"}': value})
+                if descending and nullable:
+                    beyond |= Q(**{f'{field}__isnull': True})
+                same = Q(**{field: value})
+            condition |= equal & beyond
+            equal &= same
+
+        field, value = ordering[0].lstrip('-'), position[0]
+        if value is not None and not ordering[0].startswith('-'):
+            condition &= Q(**{f'{field}__gte': value})
+        elif value is not None and not self.model_field(model, ordering[0]).null:
+            condition &= Q(**{f'{field}__lte': value})
+        return condition
+
+    @staticmethod
+    def model_field(model, name):
+        """
+        Return the model field of an ordering field name (e.g. "-dueDate" or "pk").
+        """
+        name = name.lstrip('-')
+        return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+    @staticmethod
+    def invert(name):
+        """
+        Invert the direction of an ordering field.
+        """
+        return name[1:] if name.startswith('-') else f'-{name}'
@@ -0,0 +1,148 @@
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+PROFILE_HEADER = 'X-Join-Profile'
+"""
+Request header (and response header) of on-demand profiling; the query parameter is
+`?profile=`. The value `1` saves the capture, `inline` also returns its summary.
+"""
+
+PROFILE_MODES = {'1': 'save', 'true': 'save', 'yes': 'save', 'inline': 'inline'}
+
+_lock = threading.Lock()
+
+
+class Capture:
+    """
+    The CPU profile and the memory allocations recorded while serving one request.
+
+    Attributes:
+    - `profiler`: The `cProfile.Profile` of the request.
+    - `snapshot`: The `tracemalloc` snapshot of the memory allocated (and still
+      held) by the request, taken before the request's objects are released.
+    - `peak_bytes`: The peak of the traced memory during the request.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.snapshot = None
+        self.peak_bytes = 0
+
+
+def requested_profile(request):
+    """
+    Read the profiling mode requested by the `X-Join-Profile` header or the
+    `profile` query parameter.
+
+    Returns:
+    - "save", "inline" or `None` if no profile was requested.
+    """
+    value = request.headers.get(PROFILE_HEADER) or request.GET.get('profile') or ''
+    return PROFILE_MODES.get(value.lower())
+
+
+@contextmanager
+def capture():
+    """
+    Context manager running its block under `cProfile` and `tracemalloc`.
+
+    Both profilers are process-wide, so only one request is profiled at a time: if
+    another capture is running, the block runs unprofiled and `None` is yielded.
+    `cProfile` only sees the calling thread (for async views, the event loop thread,
+    without the ORM queries run in worker threads).
+
+    Yields:
+    - The `Capture` being recorded, or `None`.
+    """
+    if not _lock.acquire(blocking=False):
+        yield None
+        return
+    try:
+        result = Capture()
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(getattr(settings, 'JOIN_PROFILE_TRACEBACK', 1))
+        tracemalloc.reset_peak()
+        result.profiler.enable()
+        try:
+            yield result
+        finally:
+            result.profiler.disable()
+            result.peak_bytes = tracemalloc.get_traced_memory()[1]
+            result.snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ])
+            if started:
+                tracemalloc.stop()
+    finally:
+        _lock.release()
+
+
+def save_capture(result, request):
+    """
+    Save a capture to `JOIN_PROFILE_DIR`, keeping only the latest `JOIN_PROFILE_KEEP`.
+
+    The CPU profile is written as `<name>.prof` (readable with `pstats` or e.g.
+    snakeviz) and the allocations as `<name>.alloc` (readable with
+    `tracemalloc.Snapshot.load`).
+
+    Returns:
+    - The name of the capture, e.g. "20241001T120000123456-get-join-api-tasks".
+    """
+    directory = Path(settings.JOIN_PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f'{timezone.now():%Y%m%dT%H%M%S%f}-{slugify(f"{request.method} {request.path}")[:80]}'
+    result.profiler.dump_stats(directory / f'{name}.prof')
+    result.snapshot.dump(str(directory / f'{name}.alloc'))
+
+    captures = sorted(path.stem for path in directory.glob('*.prof'))
+    for stale in captures[:-getattr(settings, 'JOIN_PROFILE_KEEP', 20) or None]:
+        for suffix in ('.prof', '.alloc'):
+            (directory / f'{stale}{suffix}').unlink(missing_ok=True)
+    return name
+
+
+def summarize(result, top=None):
+    """
+    Summarize a capture: the functions with the highest cumulative time and the
+    source lines holding the most allocated memory.
+
+    Parameters:
+    - `result`: The `Capture`.
+    - `top` (optional): Number of entries per list, defaults to `JOIN_PROFILE_TOP`.
+
+    Returns:
+    - Dict with `cpu` (function, calls, own and cumulative time in milliseconds),
+      `memory` (source line, size in KiB and number of blocks) and `peak_kib`.
+    """
+    top = top or getattr(settings, 'JOIN_PROFILE_TOP', 25)
+    stats = pstats.Stats(result.profiler).stats
+    functions = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    return {
+        'cpu': [
+            {
+                'function': pstats.func_std_string(function),
+                'calls': calls,
+                'own_ms': round(own * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3),
+            }
+            for function, (_, calls, own, cumulative, _) in functions
+        ],
+        'memory': [
+            {
+                'line': f'{statistic.traceback[0].filename}:{statistic.traceback[0].lineno}',
+                'kib': round(statistic.size / 1024, 1),
+                'blocks': statistic.count,
+            }
+            for statistic in result.snapshot.statistics('lineno')[:top]
+        ],
+        'peak_kib': round(result.peak_bytes / 1024, 1),
+    }
@@ -0,0 +1,155 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+from .routers import pin_to_primary
+from .streaming import wants_stream
+
+response_cache = caches['responses']
+"""
+The cache of API responses (see `cached_response`), bounded by its `MAX_ENTRIES`.
+"""
+
+
+class ResponseCacheStats:
+    """
+    Thread-safe counters of the response cache of this worker process.
+
+    Attributes:
+    - `hits`: Number of responses served from the cache.
+    - `misses`: Number of responses that had to be built by the view.
+    - `hit_seconds`: Total time spent serving cache hits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Reset all counters.
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.hit_seconds = 0.0
+
+    def record(self, hit, seconds=0.0):
+        """
+        Count a cache lookup; for hits, `seconds` is the time it took to serve the response.
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.hit_seconds += seconds
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        """
+        Return the counters with the hit ratio and the mean hit latency in milliseconds.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'mean_hit_ms': self.hit_seconds * 1000 / self.hits if self.hits else 0.0,
+            }
+
+
+response_cache_stats = ResponseCacheStats()
+
+
+def generation(scope):
+    """
+    Return the current generation of an invalidation scope (e.g. "tasks" or "contacts:7").
+
+    A scope without a generation (never used, or evicted from the cache) starts from
+    the current time, so that keys built from an evicted generation are never reused.
+    """
+    key = f'join:generation:{scope}'
+    value = response_cache.get(key)
+    if value is None:
+        response_cache.add(key, time.time_ns(), timeout=None)
+        value = response_cache.get(key)
+    return value
+
+
+def _bump(scopes):
+    for scope in scopes:
+        key = f'join:generation:{scope}'
+        try:
+            response_cache.incr(key)
+        except ValueError:
+            response_cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate(*scopes):
+    """
+    Invalidate all cached responses that depend on any of `scopes`.
+
+    The generations are bumped right away and again once the current transaction is
+    committed, so that a response built by a concurrent request from data read
+    before the commit is not cached under the new generation.
+    """
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def response_key(request, scopes):
+    """
+    Build the cache key of a response: the endpoint (full URL with sorted query
+    parameters), the requesting user and the generations of the scopes it depends on.
+    """
+    query = sorted((name, value) for name, values in request.GET.lists() for value in values)
+    generations = [generation(scope) for scope in scopes]
+    raw = repr((request.build_absolute_uri(request.path), query, request.user.pk, generations))
+    return f'join:response:{hashlib.sha256(raw.encode()).hexdigest()}'
+
+
+def cached_response(scopes):
+    """
+    Decorator for `get` methods of API views that caches their successful responses.
+
+    The serialized data of `200 OK` responses is cached per endpoint, user and query
+    parameters (see `response_key`). Entries are invalidated precisely: signals on
+    the models (see `join.signals`) and `join.changes.record_change` call
+    `invalidate` for the scopes they touch, which changes the key of every response
+    depending on them. Streamed responses are not cached. Responses carry an
+    `X-Cache: HIT` or `X-Cache: MISS` header; hit ratio and latency are kept in
+    `response_cache_stats`. Responses to be cached are built from the primary
+    database (see `join.routers.pin_to_primary`), never from a read replica.
+
+    Parameters:
+    - `scopes`: Function of the request returning the invalidation scopes the
+      response depends on.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if wants_stream(request):
+                return method(view, request, *args, **kwargs)
+            start = time.perf_counter()
+            key = response_key(request, scopes(request))
+            data = response_cache.get(key)
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                response_cache_stats.record(True, time.perf_counter() - start)
+                return response
+            response_cache_stats.record(False)
+            # A replica may not have caught up with the write that invalidated the
+            # entry yet, and its stale data would be cached under the new generation.
+            pin_to_primary()
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == 200 and hasattr(response, 'data'):
+                response_cache.set(key, response.data)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,51 @@
+import random
+from contextvars import ContextVar
+from django.conf import settings
+
+_pinned = ContextVar('join_db_pinned', default=False)
+_written = ContextVar('join_db_written', default=False)
+
+
+def pin_to_primary():
+    """
+    Send all further reads of the current request (or context) to the primary database.
+    """
+    _pinned.set(True)
+
+
+def is_pinned():
+    """
+    Return whether reads of the current request (or context) go to the primary database.
+    """
+    return _pinned.get()
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router that sends reads to the read replicas and writes to the primary.
+
+    The replicas are the aliases listed in `settings.JOIN_DB_READ_REPLICAS`; without
+    replicas all queries go to the `default` database. As soon as a request writes,
+    it is pinned to the primary (see `pin_to_primary`), so it reads its own writes
+    instead of a replica that may not have caught up yet. `PrimaryPinningMiddleware`
+    scopes the pin to the request and carries it over to the client's next requests.
+
+    Migrations only run on the primary; the replicas are copies of it.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'JOIN_DB_READ_REPLICAS', [])
+        if not replicas or is_pinned():
+            return 'default'
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _written.set(True)
+        pin_to_primary()
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,181 @@
+import re
+from django.db import connection, connections, router, transaction
+from django.db.models.functions import Lower
+from .models import Contacts, TaskItem
+
+SEARCH_TABLE = 'join_tasksearch'
+"""
+The SQLite FTS5 table indexing the tasks (created by migration `0006_task_search`).
+
+Its rowid is the task ID; the indexed columns are `title`, `description`, `category`
+and `subtasks` (the titles of the task's subtasks).
+"""
+
+SEARCH_WEIGHTS = (10.0, 1.0, 3.0, 5.0)
+"""
+BM25 weights of the indexed columns, in column order: matches in the title rank highest.
+"""
+
+CONTACT_PREFIX_FIELDS = ('fullname', 'firstname', 'lastname', 'email')
+"""
+Contact fields matched by the autocomplete, in rank order: full name matches come first.
+"""
+
+CONTACT_COMPLETION_FIELDS = ('id', 'fullname', 'firstname', 'lastname', 'initials', 'email', 'color')
+"""
+Contact fields returned by the autocomplete.
+"""
+
+_INDEX_SQL = f'''
+    INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, title, description, category, subtasks)
+    SELECT task.id, task.title, task.description, task.category,
+           COALESCE((SELECT group_concat(subtask.title, ' ') FROM join_subtask AS subtask
+                     WHERE subtask.parent_task_id = task.id), '')
+    FROM join_taskitem AS task
+'''
+
+
+def index_tasks(task_ids):
+    """
+    Add or refresh tasks (including their subtask titles) in the search index.
+
+    Writes are indexed through `reindex_on_commit`; this runs the statement right away.
+
+    Parameters:
+    - `task_ids`: IDs of the created or updated tasks.
+    """
+    task_ids = list(task_ids)
+    if task_ids:
+        placeholders = ', '.join(['%s'] * len(task_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'{_INDEX_SQL} WHERE task.id IN ({placeholders})', task_ids)
+
+
+def unindex_tasks(task_ids):
+    """
+    Remove deleted tasks from the search index.
+
+    Parameters:
+    - `task_ids`: IDs of the deleted tasks.
+    """
+    task_ids = list(task_ids)
+    if task_ids:
+        placeholders = ', '.join(['%s'] * len(task_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})', task_ids)
+
+
+def reindex_on_commit(task_ids=(), deleted_ids=()):
+    """
+    Refresh and remove tasks in the search index once the current transaction commits
+    (right away outside of a transaction).
+
+    Called by `join.changes.record_change` for every recorded task change, which the
+    `TaskItem` and `Subtask` signals (see `join.signals`) record for every ORM write
+    and the bulk write paths record themselves. Indexing after the commit reads the committed tasks with
+    all their subtasks, and a rolled back write leaves the index untouched.
+
+    Parameters:
+    - `task_ids`: IDs of the created or updated tasks.
+    - `deleted_ids`: IDs of the deleted tasks.
+    """
+    task_ids, deleted_ids = list(task_ids), list(deleted_ids)
+    if task_ids or deleted_ids:
+        def reindex():
+            index_tasks(task_ids)
+            unindex_tasks(deleted_ids)
+        transaction.on_commit(reindex)
+
+
+def rebuild_index():
+    """
+    Rebuild the search index from all tasks.
+
+    Returns:
+    - The number of indexed tasks.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(_INDEX_SQL)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {SEARCH_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def match_query(text):
+    """
+    Turn user input into an FTS5 query.
+
+    Every word must occur (as a prefix for the last word, so results appear while
+    typing); FTS5 operators and special characters in the input are not interpreted.
+
+    Returns:
+    - The FTS5 query, or an empty string if the input contains no words.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return ''
+    return ' '.join(f'"{word}"' for word in words) + '*'
+
+
+def search_task_ids(text, limit, offset=0):
+    """
+    Find the tasks matching `text`, best matches first (BM25 with `SEARCH_WEIGHTS`).
+
+    Parameters:
+    - `text`: The search input.
+    - `limit`, `offset`: The window of results to return.
+
+    Returns:
+    - The list of matching task IDs in rank order.
+    """
+    query = match_query(text)
+    if not query:
+        return []
+    weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+    with connections[router.db_for_read(TaskItem)].cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+            f'ORDER BY bm25({SEARCH_TABLE}, {weights}), rowid LIMIT %s OFFSET %s',
+            [query, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def complete_contacts(owner, prefix, limit):
+    """
+    Find the contacts of `owner` with a name or email starting with `prefix`
+    (case-insensitive).
+
+    Every field of `CONTACT_PREFIX_FIELDS` is searched with a range scan on its
+    `(owner, Lower())` index (`prefix <= lower(field) < prefix with the last
+    character incremented`), reading at most `limit` rows each, so the cost depends
+    on `limit` and not on the number of contacts. Only ASCII letters are folded,
+    like SQLite's `lower()`.
+
+    Parameters:
+    - `owner`: The user whose contacts are searched.
+    - `prefix`: The typed input.
+    - `limit`: The maximum number of contacts to return.
+
+    Returns:
+    - The matching contacts as dicts of `CONTACT_COMPLETION_FIELDS`, matches on the
+      full name first, then first name, last name and email, each alphabetically.
+    """
+    prefix = ''.join(char.lower() if char.isascii() else char for char in prefix.strip())
+    if not prefix:
+        return []
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    matches = {}
+    for field in CONTACT_PREFIX_FIELDS:
+        contacts = (
+            Contacts.objects.annotate(key=Lower(field))
+            .filter(contactAssignedTo=owner, key__gte=prefix, key__lt=upper)
+            .order_by('key', 'id')
+            .values(*CONTACT_COMPLETION_FIELDS)[:limit]
+        )
+        for contact in contacts:
+            matches.setdefault(contact['id'], contact)
+        if len(matches) >= limit:
+            break
+    return list(matches.values())[:limit]
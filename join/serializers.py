@@ -1,47 +1,168 @@
-import json
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
 from django.http import JsonResponse
+from django.utils import timezone
 from rest_framework import serializers
+from .changes import SUBTASKS, TASKS, batched_changes, record_change
+from .filters import query_values
+from .instrumentation import timed
 from .models import Contacts, CustomUser, Subtask, TaskItem
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
 
 User = get_user_model()
 
 class JSONListField(serializers.ListField):
     """
-    Custom field for handling JSON-encoded lists in the model.
+    Custom field for handling lists stored in a `JSONField` of the model.
 
-    This serializer field is used to serialize a JSON string stored in the 
-    database into a Python list and vice versa.
+    The model field already decodes the stored JSON into a Python list, so lists are
+    passed through as they are instead of being converted item by item.
     """
 
     def to_representation(self, value):
         """
-        Convert the JSON string into a Python list.
+        Return the list stored in the model.
 
         Args:
-            value (str): JSON-encoded string representing a list.
+            value (list): The decoded list from the model's JSON field.
 
         Returns:
-            list: Python list representation of the input value. 
-            Returns an empty list if value is None.
+            list: The input value, or an empty list if value is None.
         """
         if value is None:
             return []
-        return json.loads(value)
+        return value
 
     def to_internal_value(self, data):
         """
-        Convert the input list into a JSON string.
+        Return the input list to be stored in the model's JSON field.
 
         Args:
-            data (list): Python list to be converted into a JSON string.
+            data (list): Python list sent by the client.
 
         Returns:
-            str: JSON-encoded string representation of the list.
+            list: The input list.
         """
         return data
 
 
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that can resolve keys without a query per key.
+
+    If the serializer context contains a `preloaded` dict mapping models to
+    `{pk: instance}` maps, keys are looked up there (keys missing from the map
+    are reported as not existing). Otherwise the field behaves like a regular
+    `PrimaryKeyRelatedField`.
+    """
+
+    def to_internal_value(self, data):
+        """
+        Resolve the primary key `data` into a model instance.
+
+        Args:
+            data: The primary key sent by the client.
+
+        Returns:
+            Model: The related instance.
+        """
+        if isinstance(data, bool):
+            # Like `PrimaryKeyRelatedField`, which rejects booleans before the lookup.
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        queryset = self.get_queryset()
+        preloaded = self.context.get('preloaded', {}).get(queryset.model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            return preloaded[queryset.model._meta.pk.to_python(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError, serializers.DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class TimedRepresentationMixin:
+    """
+    Serializer mixin that adds the time spent serializing objects to the `serializer`
+    section of the request measurements (see `join.instrumentation.timed`).
+    """
+
+    def to_representation(self, instance):
+        with timed('serializer'):
+            return super().to_representation(instance)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin for sparse fieldsets, i.e. representations with only some fields.
+
+    The serializer takes an optional `fields` argument, the names of the fields to
+    emit (all readable fields if `None`). `select_fields` reads the selection from
+    the `?fields=` / `?exclude=` query parameters of a request, and `only_fields`
+    restricts a queryset to the columns the selected fields need.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def select_fields(cls, params):
+        """
+        Read the requested fields from the `fields` and `exclude` query parameters.
+
+        Both take comma-separated field names: `fields` lists the fields to emit,
+        `exclude` the fields to leave out.
+
+        Args:
+            params (QueryDict): The query parameters of the request.
+
+        Returns:
+            set: The names of the fields to emit, or None if all fields are requested.
+
+        Raises:
+            ValidationError: If an unknown field is named.
+        """
+        fields, exclude = query_values(params, 'fields'), query_values(params, 'exclude')
+        if not fields and not exclude:
+            return None
+        available = [name for name, field in cls().fields.items() if not field.write_only]
+        unknown = set(fields + exclude) - set(available)
+        if unknown:
+            raise serializers.ValidationError({'fields': [f'Unknown fields: {", ".join(sorted(unknown))}.']})
+        return set(fields or available) - set(exclude)
+
+    @classmethod
+    def only_fields(cls, queryset, fields):
+        """
+        Restrict a queryset to the columns needed for `fields`.
+
+        Loads the primary key, the columns of the selected model fields and the
+        columns the queryset is ordered by (read by the cursor pagination), so that
+        unrequested columns (e.g. long descriptions) are not read at all. Must be
+        applied after the queryset is ordered.
+
+        Args:
+            queryset (QuerySet): The queryset to be serialized.
+            fields (set): The selected fields, or None for all fields.
+
+        Returns:
+            QuerySet: The restricted queryset.
+        """
+        if fields is None:
+            return queryset
+        model = queryset.model
+        columns = {field.name for field in model._meta.concrete_fields}
+        serializer_fields = cls().fields
+        names = {model._meta.pk.name}
+        names |= {serializer_fields[name].source for name in fields} & columns
+        names |= {name.lstrip('-') for name in queryset.query.order_by} & columns
+        return queryset.only(*names)
+
+
 class SubtaskSerializer(serializers.ModelSerializer):
     """
     Serializer for the Subtask model.
@@ -50,6 +171,7 @@ class SubtaskSerializer(serializers.ModelSerializer):
     into JSON format and vice versa.
     """
 
+    id = serializers.IntegerField(required=False)
     title = serializers.CharField()
     subtaskStatus = serializers.BooleanField()
 
@@ -58,7 +180,98 @@ class SubtaskSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'subtaskStatus']
 
 
-class TaskItemSerializer(serializers.ModelSerializer):
+@batched_changes()
+def reconcile_subtasks(subtasks_by_task, now=None, new_task_ids=()):
+    """
+    Bring the stored subtasks of one or more tasks in line with incoming subtask data.
+
+    Incoming subtasks carrying the `id` of an existing subtask of the same task update
+    that subtask (only if its title or status changed), incoming subtasks without a
+    known `id` are created and existing subtasks missing from the incoming data are
+    deleted. Subtask IDs therefore stay stable across updates.
+
+    The existing subtasks of all tasks are read with one query and the changes are
+    written with at most three bulk statements (insert, update, delete), no matter
+    how many tasks and subtasks are involved. The changes are recorded with
+    `record_change` (the deletions by the `Subtask` signals) in one batch, together
+    with the change of the tasks that already existed.
+
+    Args:
+        subtasks_by_task (list): Pairs of a saved TaskItem and its validated subtask data.
+        now (datetime, optional): Modification time to store, defaults to the current time.
+        new_task_ids (iterable, optional): IDs of tasks that were just created and
+            therefore have no stored subtasks to read.
+    """
+    now = now or timezone.now()
+    existing_by_task = {}
+    new_task_ids = set(new_task_ids)
+    task_ids = [task.id for task, _ in subtasks_by_task if task.id not in new_task_ids]
+    if task_ids:
+        for subtask in Subtask.objects.filter(parent_task__in=task_ids):
+            existing_by_task.setdefault(subtask.parent_task_id, {})[subtask.id] = subtask
+
+    created, updated, deleted_ids = [], [], []
+    for task, subtasks_data in subtasks_by_task:
+        existing = existing_by_task.get(task.id, {})
+        for subtask_data in subtasks_data:
+            subtask = existing.pop(subtask_data.get('id'), None)
+            if subtask is None:
+                created.append(Subtask(
+                    parent_task=task,
+                    title=subtask_data['title'],
+                    subtaskStatus=subtask_data['subtaskStatus'],
+                    updated_at=now,
+                ))
+            elif (subtask.title, subtask.subtaskStatus) != (subtask_data['title'], subtask_data['subtaskStatus']):
+                subtask.title = subtask_data['title']
+                subtask.subtaskStatus = subtask_data['subtaskStatus']
+                subtask.updated_at = now
+                updated.append(subtask)
+        deleted_ids.extend(existing)
+
+    if created:
+        Subtask.objects.bulk_create(created)
+    if updated:
+        Subtask.objects.bulk_update(updated, ['title', 'subtaskStatus', 'updated_at'])
+    if deleted_ids:
+        Subtask.objects.filter(id__in=deleted_ids).delete()
+    if created or updated:
+        record_change(
+            SUBTASKS,
+            created=[subtask.id for subtask in created],
+            updated=[subtask.id for subtask in updated],
+        )
+        record_change(TASKS, updated=[
+            task_id for task_id in dict.fromkeys(subtask.parent_task_id for subtask in created + updated)
+            if task_id not in new_task_ids
+        ])
+
+
+def replace_assignments(users_by_task, new_task_ids=()):
+    """
+    Replace the assigned users (`assignedToID`) of one or more tasks.
+
+    The current assignments of all given tasks are removed with one DELETE and the
+    new ones are written with one bulk INSERT into the many-to-many through table.
+
+    Args:
+        users_by_task (list): Pairs of a saved TaskItem and the users to assign to it.
+        new_task_ids (iterable, optional): IDs of tasks that were just created and
+            therefore have no assignments to remove.
+    """
+    through = TaskItem.assignedToID.through
+    new_task_ids = set(new_task_ids)
+    task_ids = [task.id for task, _ in users_by_task if task.id not in new_task_ids]
+    if task_ids:
+        through.objects.filter(taskitem_id__in=task_ids).delete()
+    through.objects.bulk_create([
+        through(taskitem_id=task.id, customuser_id=user.id)
+        for task, users in users_by_task
+        for user in dict.fromkeys(users)
+    ])
+
+
+class TaskItemSerializer(TimedRepresentationMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the TaskItem model.
 
@@ -69,17 +282,46 @@ class TaskItemSerializer(serializers.ModelSerializer):
     assignedTo = JSONListField(child=serializers.CharField())
     colors = JSONListField(child=serializers.CharField())
     subtasks = SubtaskSerializer(many=True, required=False)
-    assignedToID = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), many=True)
+    assignedToID = PreloadedPrimaryKeyRelatedField(queryset=User.objects.all(), many=True)
 
     class Meta:
         model = TaskItem
-        fields = '__all__'
+        exclude = ['sequence']
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        """
+        Prefetch the relations rendered by this serializer.
 
+        The nested `subtasks` and the `assignedToID` primary keys are loaded
+        with one query each, so serializing a list of tasks costs a constant
+        number of queries regardless of its length. With a field selection, only
+        the selected relations are prefetched and only the needed columns are
+        loaded (see `only_fields`).
+
+        Args:
+            queryset (QuerySet): TaskItem queryset to be serialized.
+            fields (set, optional): The selected fields, or None for all fields.
+
+        Returns:
+            QuerySet: The queryset with the serializer's relations prefetched.
+        """
+        prefetches = []
+        if fields is None or 'subtasks' in fields:
+            prefetches.append('subtasks')
+        if fields is None or 'assignedToID' in fields:
+            prefetches.append(Prefetch('assignedToID', queryset=User.objects.only('id')))
+        return cls.only_fields(queryset.prefetch_related(*prefetches), fields)
+
+    @transaction.atomic
+    @batched_changes()
     def create(self, validated_data):
         """
         Create a new TaskItem instance.
 
         Handles the creation of a TaskItem, including associated subtasks and assigned users.
+        The task is written with a single INSERT, followed by one bulk INSERT for its
+        subtasks and one for its assigned users, all in one transaction.
 
         Args:
             validated_data (dict): Validated data from the request.
@@ -89,29 +331,23 @@ class TaskItemSerializer(serializers.ModelSerializer):
         """
         subtasks_data = validated_data.pop('subtasks', [])
         assignedToID = validated_data.pop('assignedToID', [])
-        assignedTo = validated_data.pop('assignedTo', [])
-        colors = validated_data.pop('colors', [])
 
         # Create the TaskItem object
         task = TaskItem.objects.create(**validated_data)
 
-        # Set many-to-many relationship for assigned users
-        task.assignedToID.set(assignedToID)
-        task.assignedTo = json.dumps(assignedTo)
-        task.colors = json.dumps(colors)
-        task.save()
-
-        # Create subtasks
-        for subtask_data in subtasks_data:
-            Subtask.objects.create(parent_task=task, **subtask_data)
-
+        # Create subtasks and the many-to-many relationship for assigned users
+        reconcile_subtasks([(task, subtasks_data)], new_task_ids=[task.id])
+        replace_assignments([(task, assignedToID)], new_task_ids=[task.id])
         return task
 
+    @transaction.atomic
+    @batched_changes()
     def update(self, instance, validated_data):
         """
         Update an existing TaskItem instance.
 
-        Handles updating of a TaskItem, including associated subtasks and assigned users.
+        Handles updating of a TaskItem, including associated subtasks and assigned users,
+        all in one transaction.
 
         Args:
             instance (TaskItem): The existing TaskItem instance.
@@ -126,8 +362,8 @@ class TaskItemSerializer(serializers.ModelSerializer):
         colors = validated_data.pop('colors', [])
 
         # Update TaskItem fields
-        instance.assignedTo = json.dumps(assignedTo)
-        instance.colors = json.dumps(colors)
+        instance.assignedTo = assignedTo
+        instance.colors = colors
         instance.category = validated_data.get('category', instance.category)
         instance.categoryboard = validated_data.get('categoryboard', instance.categoryboard)
         instance.description = validated_data.get('description', instance.description)
@@ -137,33 +373,314 @@ class TaskItemSerializer(serializers.ModelSerializer):
         instance.save()
 
         # Update many-to-many relationship
-        instance.assignedToID.set(assignedToID)
+        replace_assignments([(instance, assignedToID)])
 
-        # Delete all existing subtasks and recreate them based on new data
-        instance.subtasks.all().delete()
+        # Insert, update and delete subtasks to match the new data
+        reconcile_subtasks([(instance, subtasks_data)])
+        return instance
 
-        # Manage subtasks
-        for subtask_data in subtasks_data:
-            subtask_id = subtask_data.get('id')
-
-            # If the subtask exists, update it
-            if subtask_id:
-                try:
-                    subtask = Subtask.objects.get(id=subtask_id, parent_task=instance)
-                    subtask.title = subtask_data.get('title')
-                    subtask.subtaskStatus = subtask_data.get('subtaskStatus')
-                    subtask.save()
-                except Subtask.DoesNotExist:
-                    # If the subtask does not exist, create a new one
-                    Subtask.objects.create(parent_task=instance, **subtask_data)
-            else:
-                # If no subtask ID is provided, create a new subtask
-                Subtask.objects.create(parent_task=instance, **subtask_data)
 
-        return instance
+class TaskCardSerializer(TimedRepresentationMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Read-only serializer for the compact "card" representation of a task on the board.
+
+    Instead of the nested subtasks and the assigned user IDs, a card carries the
+    subtask progress (`subtasks_total`, `subtasks_done`) counted in SQL, and the
+    assignee names and colors stored on the task itself, so a board load is a
+    single query.
+    """
+
+    assignedTo = JSONListField(child=serializers.CharField(), read_only=True)
+    colors = JSONListField(child=serializers.CharField(), read_only=True)
+    subtasks_total = serializers.IntegerField(read_only=True)
+    subtasks_done = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = TaskItem
+        fields = [
+            'id', 'title', 'description', 'category', 'categoryboard', 'prio', 'dueDate',
+            'assignedTo', 'colors', 'subtasks_total', 'subtasks_done',
+        ]
+        read_only_fields = fields
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        """
+        Annotate the subtask progress counted in SQL.
+
+        Both counts come from one join on the subtasks, aggregated per task; only
+        the selected counts are annotated and only the needed columns are loaded
+        (see `only_fields`).
+
+        Args:
+            queryset (QuerySet): TaskItem queryset to be serialized.
+            fields (set, optional): The selected fields, or None for all fields.
+
+        Returns:
+            QuerySet: The queryset with `subtasks_total` and `subtasks_done` annotated.
+        """
+        counts = {
+            'subtasks_total': Count('subtasks'),
+            'subtasks_done': Count('subtasks', filter=Q(subtasks__subtaskStatus=True)),
+        }
+        counts = {name: count for name, count in counts.items() if fields is None or name in fields}
+        return cls.only_fields(queryset.annotate(**counts), fields)
+
+
+TASK_REPRESENTATIONS = {'full': TaskItemSerializer, 'card': TaskCardSerializer}
+"""
+Serializers of the task representations clients can request with `?view=<name>`.
+"""
 
 
-class UserSerializer(serializers.ModelSerializer):
+def task_serializer_class(params):
+    """
+    Choose the task serializer for the `view` query parameter (`full` by default).
+
+    Args:
+        params (QueryDict): The query parameters of the request.
+
+    Returns:
+        type: `TaskItemSerializer` or `TaskCardSerializer`.
+
+    Raises:
+        ValidationError: If an unknown representation is requested.
+    """
+    name = params.get('view') or 'full'
+    if name not in TASK_REPRESENTATIONS:
+        raise serializers.ValidationError({'view': [f'Expected one of: {", ".join(TASK_REPRESENTATIONS)}.']})
+    return TASK_REPRESENTATIONS[name]
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    Serializer for a batch of task operations.
+
+    Accepts a list of operations, each one of:
+    - `{"action": "create", "data": {...}}`: Create a task from `data`.
+    - `{"action": "update", "id": 1, "data": {...}}`: Update the given fields of a
+      task. `subtasks` and `assignedToID` are only replaced if they are given.
+    - `{"action": "delete", "id": 1}`: Delete a task.
+
+    All operations are validated in one pass (with a single query for the affected
+    tasks and one for the referenced users). If any operation is invalid, nothing is
+    applied and the per-operation results are reported as validation errors (and
+    kept in `invalid_results`). Otherwise all operations are applied in one
+    transaction with bulk statements for tasks (one per set of updated fields),
+    subtasks and task assignments.
+    """
+
+    actions = ('create', 'update', 'delete')
+    invalid_results = None
+
+    def to_internal_value(self, data):
+        """
+        Validate all operations of the batch.
+
+        Args:
+            data (list): The operations sent by the client.
+
+        Returns:
+            dict: The `operations`, one dict per operation with its `index`,
+            `action`, the affected `task` (for updates and deletes) and its
+            `validated_data`.
+
+        Raises:
+            ValidationError: If the batch or any of its operations is invalid. The
+            results of invalid operations are also stored in `invalid_results`, as
+            `errors` turns all their values into strings.
+        """
+        if not isinstance(data, list) or not all(isinstance(operation, dict) for operation in data):
+            raise serializers.ValidationError({'non_field_errors': ['Expected a list of operations.']})
+
+        task_ids = [operation.get('id') for operation in data if operation.get('action') in ('update', 'delete')]
+        tasks = TaskItem.objects.in_bulk([pk for pk in task_ids if self.is_task_id(pk)])
+        context = {'preloaded': {User: self.preload_users(data)}}
+
+        operations, results, seen_ids = [], [], set()
+        for index, operation in enumerate(data):
+            action = operation.get('action')
+            result = {'index': index, 'action': action}
+            errors = None
+            task = None
+            if action not in self.actions:
+                errors = {'action': [f'Must be one of: {", ".join(self.actions)}.']}
+            elif action != 'create':
+                task_id = operation.get('id')
+                result['id'] = task_id
+                if not self.is_task_id(task_id):
+                    errors = {'id': ['Expected an integer task ID.']}
+                else:
+                    task = tasks.get(task_id)
+                    if task is None:
+                        errors = {'id': ['Task does not exist.']}
+                    elif task.id in seen_ids:
+                        errors = {'id': ['Task is affected by more than one operation.']}
+                    seen_ids.add(task_id)
+            validated_data = None
+            if errors is None and action != 'delete':
+                serializer = TaskItemSerializer(
+                    task, data=operation.get('data', {}), partial=action == 'update', context=context
+                )
+                if serializer.is_valid():
+                    validated_data = serializer.validated_data
+                else:
+                    errors = serializer.errors
+            if errors is not None:
+                result.update(status='invalid', errors=errors)
+            results.append(result)
+            operations.append({'index': index, 'action': action, 'task': task, 'validated_data': validated_data})
+
+        if any(result.get('status') == 'invalid' for result in results):
+            self.invalid_results = results
+            raise serializers.ValidationError({'results': results})
+        return {'operations': operations}
+
+    def is_task_id(self, value):
+        """
+        Check whether `value` sent as the `id` of an operation (or as a user ID) is an
+        integer primary key; booleans are not.
+        """
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    def preload_users(self, data):
+        """
+        Load all users referenced by `assignedToID` in the batch with one query.
+
+        Args:
+            data (list): The operations sent by the client.
+
+        Returns:
+            dict: Users by primary key.
+        """
+        user_ids = set()
+        for operation in data:
+            payload = operation.get('data')
+            assigned = payload.get('assignedToID') if isinstance(payload, dict) else None
+            if isinstance(assigned, list):
+                user_ids.update(pk for pk in assigned if self.is_task_id(pk) or (isinstance(pk, str) and pk.isdigit()))
+        return User.objects.only('id').in_bulk({int(pk) for pk in user_ids})
+
+    def to_representation(self, instance):
+        """
+        Represent the applied batch.
+
+        Args:
+            instance (list): The per-operation results returned by `create`.
+
+        Returns:
+            dict: The results of all operations.
+        """
+        return {'results': instance}
+
+    @transaction.atomic
+    @batched_changes()
+    def create(self, validated_data):
+        """
+        Apply all operations of the batch.
+
+        Args:
+            validated_data (dict): The operations returned by `to_internal_value`.
+
+        Returns:
+            list: One result dict per operation with `index`, `action`, `id` and `status`.
+        """
+        now = timezone.now()
+        operations = validated_data['operations']
+        creates = [operation for operation in operations if operation['action'] == 'create']
+        updates = [operation for operation in operations if operation['action'] == 'update']
+        deletes = [operation for operation in operations if operation['action'] == 'delete']
+
+        if deletes:
+            TaskItem.objects.filter(id__in=[operation['task'].id for operation in deletes]).delete()
+
+        for operation in creates:
+            operation['task'] = TaskItem(**self.task_fields(operation['validated_data']), updated_at=now)
+        TaskItem.objects.bulk_create([operation['task'] for operation in creates])
+
+        # Each update only writes the fields it was sent: updates are grouped by their
+        # field set, so columns of a task read before the batch are never written back.
+        updates_by_fields = {}
+        for operation in updates:
+            fields = self.task_fields(operation['validated_data'])
+            for name, value in fields.items():
+                setattr(operation['task'], name, value)
+            operation['task'].updated_at = now
+            updates_by_fields.setdefault(tuple(sorted([*fields, 'updated_at'])), []).append(operation['task'])
+        for fields, tasks in updates_by_fields.items():
+            TaskItem.objects.bulk_update(tasks, fields)
+
+        self.apply_subtasks(creates + updates, now)
+        self.apply_assignments(creates + updates)
+
+        # Deleted tasks are recorded by their `post_delete` signal.
+        record_change(
+            TASKS,
+            created=[operation['task'].id for operation in creates],
+            updated=[operation['task'].id for operation in updates],
+        )
+        status_by_action = {'create': 'created', 'update': 'updated', 'delete': 'deleted'}
+        return [
+            {
+                'index': operation['index'],
+                'action': operation['action'],
+                'id': operation['task'].id,
+                'status': status_by_action[operation['action']],
+            }
+            for operation in operations
+        ]
+
+    def task_fields(self, validated_data):
+        """
+        Extract the concrete TaskItem fields from validated task data.
+
+        Args:
+            validated_data (dict): Validated data of one task.
+
+        Returns:
+            dict: Model field values.
+        """
+        return {
+            name: value for name, value in validated_data.items()
+            if name not in ('subtasks', 'assignedToID')
+        }
+
+    def apply_subtasks(self, operations, now):
+        """
+        Reconcile the subtasks of all operations that carry a `subtasks` list.
+
+        Args:
+            operations (list): Create and update operations with their saved task.
+            now (datetime): Modification time of the batch.
+        """
+        reconcile_subtasks(
+            [
+                (operation['task'], operation['validated_data']['subtasks'])
+                for operation in operations
+                if 'subtasks' in operation['validated_data']
+            ],
+            now,
+            new_task_ids=[operation['task'].id for operation in operations if operation['action'] == 'create'],
+        )
+
+    def apply_assignments(self, operations):
+        """
+        Replace the assigned users of all operations that carry an `assignedToID` list.
+
+        Args:
+            operations (list): Create and update operations with their saved task.
+        """
+        replace_assignments(
+            [
+                (operation['task'], operation['validated_data']['assignedToID'])
+                for operation in operations
+                if 'assignedToID' in operation['validated_data']
+            ],
+            new_task_ids=[operation['task'].id for operation in operations if operation['action'] == 'create'],
+        )
+
+
+class UserSerializer(TimedRepresentationMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the CustomUser model.
 
@@ -176,6 +693,26 @@ class UserSerializer(serializers.ModelSerializer):
         fields = '__all__'
         extra_kwargs = {'password': {'write_only': True}}
 
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        """
+        Prefetch the selected many-to-many relations (`groups`, `user_permissions`)
+        and load only the needed columns (see `only_fields`).
+
+        Args:
+            queryset (QuerySet): CustomUser queryset to be serialized.
+            fields (set, optional): The selected fields, or None for all fields.
+
+        Returns:
+            QuerySet: The prepared queryset.
+        """
+        prefetches = [
+            Prefetch(name, queryset=model.objects.only('id'))
+            for name, model in (('groups', Group), ('user_permissions', Permission))
+            if fields is None or name in fields
+        ]
+        return cls.only_fields(queryset.prefetch_related(*prefetches), fields)
+
     def create(self, validated_data):
         """
         Create a new CustomUser instance.
@@ -211,13 +748,15 @@ class UserSerializer(serializers.ModelSerializer):
         return JsonResponse(validated_data)
 
 
-class ContactsSerializer(serializers.ModelSerializer):
+class ContactsSerializer(TimedRepresentationMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Contacts model.
 
-    Handles the serialization and deserialization of Contacts objects.
+    Handles the serialization and deserialization of Contacts objects. The owner
+    (`contactAssignedTo`) is read-only: the views save contacts for the requesting user.
     """
 
     class Meta:
         model = Contacts
-        fields = '__all__'
+        exclude = ['sequence']
+        read_only_fields = ['contactAssignedTo']
@@ -0,0 +1,143 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import token_cache
+from .changes import CONTACTS, SUBTASKS, TASKS, record_change
+from .instrumentation import record_query
+from .models import Contacts, CustomUser, Subtask, TaskItem
+from .response_cache import invalidate
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """
+    Drop a deleted token from the token cache.
+    """
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_changed_user(sender, instance, **kwargs):
+    """
+    Drop the cached tokens of a changed (e.g. deactivated) user from the token cache.
+    """
+    token_cache.invalidate_user(instance.pk)
+
+
+def is_cascade_from_task(origin):
+    """
+    Check whether a deletion started at a task (or a queryset of tasks), so its
+    subtasks are deleted along with it.
+    """
+    return getattr(origin, 'model', type(origin)) is TaskItem
+
+
+@receiver(post_save, sender=TaskItem)
+@receiver(post_delete, sender=TaskItem)
+def record_task_change(sender, instance, signal, created=False, **kwargs):
+    """
+    Record a saved or deleted task with `record_change`.
+    """
+    if signal is post_delete:
+        record_change(TASKS, deleted=[instance.pk])
+    else:
+        record_change(TASKS, **{'created' if created else 'updated': [instance.pk]})
+
+
+@receiver(post_save, sender=Subtask)
+@receiver(post_delete, sender=Subtask)
+def record_subtask_change(sender, instance, signal, created=False, origin=None, **kwargs):
+    """
+    Record a saved or deleted subtask, and the change of its task, with
+    `record_change`. Subtasks deleted along with their task are covered by the
+    task's deletion.
+    """
+    if signal is post_delete:
+        if is_cascade_from_task(origin):
+            return
+        record_change(SUBTASKS, deleted=[instance.pk])
+    else:
+        record_change(SUBTASKS, **{'created' if created else 'updated': [instance.pk]})
+    record_change(TASKS, updated=[instance.parent_task_id])
+
+
+@receiver(m2m_changed, sender=TaskItem.assignedToID.through)
+def record_assignment_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Record the tasks whose assigned users were changed through the many-to-many
+    managers (`task.assignedToID`, `user.tasks`) with `record_change`.
+
+    When the tasks of a user are cleared, they are read before they are removed.
+    """
+    if not reverse:
+        if action == 'post_clear' or (action in ('post_add', 'post_remove') and pk_set):
+            record_change(TASKS, updated=[instance.pk])
+    elif action in ('post_add', 'post_remove') and pk_set:
+        record_change(TASKS, updated=sorted(pk_set))
+    elif action == 'pre_clear':
+        record_change(TASKS, updated=list(instance.tasks.values_list('id', flat=True)))
+
+
+@receiver(pre_delete, sender=CustomUser)
+def record_user_assignments(sender, instance, **kwargs):
+    """
+    Record the tasks of a user that is about to be deleted with `record_change`:
+    their assignments are deleted along with the user, without `m2m_changed`.
+    """
+    record_change(TASKS, updated=list(instance.tasks.values_list('id', flat=True)))
+
+
+@receiver(post_init, sender=Contacts)
+def remember_contact_owner(sender, instance, **kwargs):
+    """
+    Remember the owner a contact was loaded with, to notice when it is reassigned.
+    """
+    instance._loaded_owner_id = instance.contactAssignedTo_id
+
+
+@receiver(post_save, sender=Contacts)
+@receiver(post_delete, sender=Contacts)
+def record_contact_change(sender, instance, signal, created=False, **kwargs):
+    """
+    Record a saved or deleted contact for its owner with `record_change` and
+    invalidate the cached contact responses of its owner (and previous owner).
+
+    A contact reassigned to another user is recorded as deleted for its previous
+    owner and as created for the new one.
+    """
+    owner_id, loaded_owner_id = instance.contactAssignedTo_id, instance._loaded_owner_id
+    if signal is post_delete:
+        record_change(CONTACTS, deleted=[instance.pk], owner=owner_id)
+    elif created or loaded_owner_id not in (None, owner_id):
+        if not created:
+            record_change(CONTACTS, deleted=[instance.pk], owner=loaded_owner_id)
+        record_change(CONTACTS, created=[instance.pk], owner=owner_id)
+    else:
+        record_change(CONTACTS, updated=[instance.pk], owner=owner_id)
+    owners = {instance.contactAssignedTo_id, instance._loaded_owner_id} - {None}
+    invalidate(*(f'contacts:{owner_id}' for owner_id in owners))
+    instance._loaded_owner_id = instance.contactAssignedTo_id
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_responses(sender, **kwargs):
+    """
+    Invalidate the cached user responses when a user changes. The tasks a deleted user
+    was assigned to are recorded by `record_user_assignments`.
+    """
+    invalidate('users')
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Install `join.instrumentation.record_query` on every new database connection.
+
+    Connections are per thread, and async views query from worker threads; the
+    wrapper finds the metrics of the request through a context variable, which
+    `sync_to_async` carries over to those threads.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
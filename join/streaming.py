@@ -0,0 +1,112 @@
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_CHUNK_SIZE = 500
+"""
+Number of rows fetched from the database and encoded per streamed chunk.
+"""
+
+
+def wants_stream(request):
+    """
+    Check whether the client asked for a streamed response with `?stream=true`.
+
+    Parameters:
+    - `request`: The DRF or Django request object.
+
+    Returns:
+    - `True` if the `stream` query parameter is set to a truthy value.
+    """
+    return request.GET.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def stream_json_list(queryset, serializer_class, chunk_size=None, **serializer_kwargs):
+    """
+    Serialize a queryset into a JSON array that is sent while it is being built.
+
+    Rows are read with `QuerySet.iterator(chunk_size=...)` (prefetches are applied
+    per chunk) and every chunk is encoded and handed to the server before the next
+    one is fetched, so the memory used stays bounded by `chunk_size` no matter how
+    many rows the queryset holds.
+
+    Parameters:
+    - `queryset`: The ordered queryset to serialize.
+    - `serializer_class`: The serializer used to represent a single row.
+    - `chunk_size` (optional): Number of rows fetched and encoded per chunk,
+      defaults to `STREAM_CHUNK_SIZE`.
+    - `serializer_kwargs` (optional): Arguments of the serializer, e.g. `fields`.
+
+    Returns:
+    - A `StreamingHttpResponse` with the JSON array of serialized rows.
+    """
+    response = StreamingHttpResponse(
+        _iter_json_array(queryset, serializer_class(**serializer_kwargs), chunk_size or STREAM_CHUNK_SIZE),
+        content_type='application/json',
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def astream_json_list(queryset, serializer_class, chunk_size=None, **serializer_kwargs):
+    """
+    Async variant of `stream_json_list` for async views served under ASGI.
+
+    Rows are read with `QuerySet.aiterator(chunk_size=...)`, so the event loop is not
+    blocked while the next chunk is fetched.
+
+    Parameters:
+    - `queryset`: The ordered queryset to serialize.
+    - `serializer_class`: The serializer used to represent a single row.
+    - `chunk_size` (optional): Number of rows fetched and encoded per chunk,
+      defaults to `STREAM_CHUNK_SIZE`.
+
+    Returns:
+    - A `StreamingHttpResponse` with the JSON array of serialized rows.
+    """
+    response = StreamingHttpResponse(
+        _aiter_json_array(queryset, serializer_class(**serializer_kwargs), chunk_size or STREAM_CHUNK_SIZE),
+        content_type='application/json',
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _iter_json_array(queryset, serializer, chunk_size):
+    """
+    Yield the JSON encoding of `queryset` piece by piece.
+
+    The encoding matches DRF's `JSONRenderer` defaults (compact separators,
+    unescaped unicode).
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    yield '['
+    separator = ''
+    chunk = []
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(encoder.encode(serializer.to_representation(instance)))
+        if len(chunk) >= chunk_size:
+            yield separator + ','.join(chunk)
+            separator = ','
+            chunk = []
+    if chunk:
+        yield separator + ','.join(chunk)
+    yield ']'
+
+
+async def _aiter_json_array(queryset, serializer, chunk_size):
+    """
+    Async variant of `_iter_json_array`.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    yield '['
+    separator = ''
+    chunk = []
+    async for instance in queryset.aiterator(chunk_size=chunk_size):
+        chunk.append(encoder.encode(serializer.to_representation(instance)))
+        if len(chunk) >= chunk_size:
+            yield separator + ','.join(chunk)
+            separator = ','
+            chunk = []
+    if chunk:
+        yield separator + ','.join(chunk)
+    yield ']'
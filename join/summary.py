@@ -0,0 +1,72 @@
+from django.db.models import Count, Min, Q
+from .models import TaskItem
+
+URGENT = 'urgent'
+"""
+`TaskItem.prio` of urgent tasks.
+"""
+
+IN_PROGRESS = 'inProgress'
+"""
+`TaskItem.categoryboard` of the "In progress" board column.
+"""
+
+DONE = 'done'
+"""
+`TaskItem.categoryboard` of the "Done" board column.
+"""
+
+
+def board_summary(today):
+    """
+    Compute the figures of the summary page in a single aggregate query.
+
+    The tasks are grouped by board column, and each group is counted with
+    conditional aggregates (`COUNT(...) FILTER (WHERE ...)`, `MIN(...) FILTER`), so
+    the table is read once however many figures are computed.
+
+    Parameters:
+    - `today`: The current date, for the upcoming deadline.
+
+    Returns:
+    - A dict with:
+      - `total`: Number of tasks on the board.
+      - `boards`: Number of tasks per board column.
+      - `inProgress`, `done`: Number of tasks in these columns.
+      - `urgent`: Number of urgent tasks that are not done.
+      - `upcomingDeadline`: The earliest due date from `today` on of the tasks that
+        are not done (ISO date), or `None`.
+      - `upcomingUrgentDeadline`: The same for urgent tasks.
+    """
+    open_tasks = ~Q(categoryboard=DONE)
+    upcoming = open_tasks & Q(dueDate__gte=today)
+    rows = (
+        TaskItem.objects.order_by()
+        .values('categoryboard')
+        .annotate(
+            tasks=Count('id'),
+            urgent=Count('id', filter=open_tasks & Q(prio=URGENT)),
+            deadline=Min('dueDate', filter=upcoming),
+            urgent_deadline=Min('dueDate', filter=upcoming & Q(prio=URGENT)),
+        )
+    )
+    boards = {}
+    urgent = 0
+    deadlines = []
+    urgent_deadlines = []
+    for row in rows:
+        boards[row['categoryboard']] = row['tasks']
+        urgent += row['urgent']
+        if row['deadline'] is not None:
+            deadlines.append(row['deadline'])
+        if row['urgent_deadline'] is not None:
+            urgent_deadlines.append(row['urgent_deadline'])
+    return {
+        'total': sum(boards.values()),
+        'boards': boards,
+        'inProgress': boards.get(IN_PROGRESS, 0),
+        'done': boards.get(DONE, 0),
+        'urgent': urgent,
+        'upcomingDeadline': min(deadlines).isoformat() if deadlines else None,
+        'upcomingUrgentDeadline': min(urgent_deadlines).isoformat() if urgent_deadlines else None,
+    }
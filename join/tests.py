@@ -1,7 +1,40 @@
+import asyncio
+import contextvars
+import json
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from django.db import connection, connections
+from django.db.models.functions import Lower
+from django.http import HttpResponse, QueryDict, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from rest_framework.test import APITestCase, APIClient
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APIClient, APITransactionTestCase
 from rest_framework import status
-from .models import CustomUser, TaskItem, Contacts
+from .authentication import token_cache
+from .caching import contact_list_key
+from .changes import TASKS
+from .events import ChangeBroker, broker
+from .filters import filter_tasks
+from .instrumentation import latency_histograms
+from .management.commands.bench_sqlite_concurrency import open_connection
+from .middleware import PRIMARY_COOKIE, PrimaryPinningMiddleware
+from .models import CollectionVersion, CustomUser, TaskItem, Contacts, Subtask, Tombstone
+from .response_cache import response_cache, response_cache_stats
+from .routers import PrimaryReplicaRouter, is_pinned
+from .search import search_task_ids
+from .serializers import TaskItemSerializer, reconcile_subtasks
+from .views import SyncView
 
 # Documentation for the test cases
 
@@ -38,7 +71,9 @@ class UserCreateViewTests(APITestCase):
     """Tests for the user registration endpoint."""
 
     def setUp(self):
-        """Sets up the user registration URL."""
+        """Sets up an authenticated user and the user registration URL."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
         self.url = reverse('user-register')
 
     def test_create_user(self):
@@ -46,25 +81,31 @@ class UserCreateViewTests(APITestCase):
         data = {
             'username': 'newuser',
             'password': 'newpassword',
-            'email': 'newuser@example.com'
+            'email': 'newuser@example.com',
+            'first_name': 'New',
+            'last_name': 'User',
+            'initials': 'NU',
+            'color': '#FFFFFF',
+            'rememberlogin': False,
         }
         response = self.client.post(self.url, data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(CustomUser.objects.count(), 1)
-        self.assertEqual(CustomUser.objects.get().username, 'newuser')
+        self.assertEqual(CustomUser.objects.count(), 2)
+        self.assertTrue(CustomUser.objects.get(username='newuser').check_password('newpassword'))
 
 
 class UserGetViewTests(APITestCase):
     """Tests for retrieving user data."""
 
     def setUp(self):
-        """Sets up a test user and the URL for getting users."""
+        """Sets up an authenticated test user and the URL for getting users."""
         self.url = reverse('get_users')
-        CustomUser.objects.create_user(
+        self.user = CustomUser.objects.create_user(
             username='testuser',
             password='password',
             email='test@example.com'
         )
+        self.client.force_authenticate(self.user)
 
     def test_get_users(self):
         """Tests the retrieval of user data."""
@@ -78,9 +119,10 @@ class TaskViewTests(APITestCase):
     """Tests for task management functionalities."""
 
     def setUp(self):
-        """Sets up a test task and the URL for task detail."""
+        """Sets up an authenticated user, a test task and the URL for task detail."""
         self.client = APIClient()
-        self.task = TaskItem.objects.create(
+        self.client.force_authenticate(CustomUser.objects.create_user(username='testuser', password='password'))
+        self.task = create_task(
             title='Test Task',
             description='Task description'
         )
@@ -95,11 +137,11 @@ class TaskViewTests(APITestCase):
     def test_post_task(self):
         """Tests the creation of a new task."""
         url = reverse('task-list')
-        data = {
-            'title': 'New Task',
-            'description': 'New task description'
-        }
-        response = self.client.post(url, data)
+        data = task_payload(
+            title='New Task',
+            description='New task description'
+        )
+        response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(TaskItem.objects.count(), 2)
 
@@ -111,11 +153,11 @@ class TaskViewTests(APITestCase):
 
     def test_put_task(self):
         """Tests updating an existing task."""
-        data = {
-            'title': 'Updated Task',
-            'description': 'Updated description'
-        }
-        response = self.client.put(self.url, data)
+        data = task_payload(
+            title='Updated Task',
+            description='Updated description'
+        )
+        response = self.client.put(self.url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(TaskItem.objects.get(id=self.task.id).title, 'Updated Task')
 
@@ -124,11 +166,14 @@ class ContactsViewTests(APITestCase):
     """Tests for contacts management functionalities."""
 
     def setUp(self):
-        """Sets up a test contact and the URL for contact detail."""
+        """Sets up an authenticated user, a test contact of the user and the URL for contact detail."""
         self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
         self.contact = Contacts.objects.create(
-            name='Test Contact',
-            email='contact@example.com'
+            fullname='Test Contact',
+            email='contact@example.com',
+            contactAssignedTo=self.user
         )
         self.url = reverse('contact-detail', kwargs={'id': self.contact.id})
 
@@ -138,13 +183,13 @@ class ContactsViewTests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], 'Test Contact')
+        self.assertEqual(response.data[0]['fullname'], 'Test Contact')
 
     def test_post_contact(self):
         """Tests the creation of a new contact."""
         url = reverse('contact-list')
         data = {
-            'name': 'New Contact',
+            'fullname': 'New Contact',
             'email': 'newcontact@example.com'
         }
         response = self.client.post(url, data)
@@ -160,9 +205,1485 @@ class ContactsViewTests(APITestCase):
     def test_put_contact(self):
         """Tests updating an existing contact."""
         data = {
-            'name': 'Updated Contact',
+            'fullname': 'Updated Contact',
             'email': 'updatedcontact@example.com'
         }
         response = self.client.put(self.url, data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(Contacts.objects.get(id=self.contact.id).name, 'Updated Contact')
+        self.assertEqual(Contacts.objects.get(id=self.contact.id).fullname, 'Updated Contact')
+
+
+def create_task(**kwargs):
+    """Creates a fully populated task, overriding any of its fields with `kwargs`."""
+    data = {
+        'title': 'Task',
+        'description': 'Task description',
+        'assignedTo': [],
+        'colors': [],
+        'category': 'Work',
+        'categoryboard': 'todo',
+        'dueDate': '2024-10-01',
+        'prio': 'medium',
+    }
+    data.update(kwargs)
+    return TaskItem.objects.create(**data)
+
+
+class TaskListQueryBudgetTests(APITestCase):
+    """Tests that loading the task board costs a constant number of queries."""
+
+    def setUp(self):
+        """Sets up an authenticated user and the task list URL."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        self.url = reverse('task-list')
+
+    def create_tasks(self, count):
+        """Creates `count` tasks, each with two subtasks and one assigned user."""
+        for index in range(count):
+            task = create_task(title=f'Task {index}')
+            task.assignedToID.set([self.user])
+            Subtask.objects.create(parent_task=task, title='First')
+            Subtask.objects.create(parent_task=task, title='Second', subtaskStatus=True)
+
+    def test_task_list_query_count_is_constant(self):
+        """Tests that the board load runs the same queries for 1 and for 20 tasks."""
+        # Collection version, tasks, subtasks and assigned users.
+        self.create_tasks(1)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 1)
+
+        self.create_tasks(19)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 20)
+        self.assertEqual(response.data[0]['assignedToID'], [self.user.id])
+        self.assertEqual(len(response.data[0]['subtasks']), 2)
+
+
+class KeysetPaginationTests(APITestCase):
+    """Tests for the opt-in cursor pagination of the list endpoints."""
+
+    def setUp(self):
+        """Sets up an authenticated user and five tasks."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        self.tasks = [create_task(title=f'Task {index}') for index in range(5)]
+        self.url = reverse('task-list')
+
+    def test_unpaginated_without_cursor(self):
+        """Tests that a request without cursor parameters returns the plain list."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 5)
+
+    def test_pages_follow_cursor(self):
+        """Tests that following the `next` links walks all tasks exactly once."""
+        response = self.client.get(self.url, {'page_size': 2})
+        seen = [task['id'] for task in response.data['results']]
+        self.assertIsNone(response.data['previous'])
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen.extend(task['id'] for task in response.data['results'])
+        self.assertEqual(seen, [task.id for task in self.tasks])
+
+    def test_non_unique_ordering_uses_keyset(self):
+        """Tests that pages of an ordering with ties walk all tasks in both directions without an OFFSET."""
+        TaskItem.objects.filter(id__in=[task.id for task in self.tasks[1:4]]).update(dueDate='2024-09-01')
+        expected = [task.id for task in TaskItem.objects.order_by('-dueDate', '-id')]
+        response = self.client.get(self.url, {'ordering': '-dueDate', 'page_size': 2})
+        pages = [response.data]
+        while pages[-1]['next']:
+            with CaptureQueriesContext(connection) as queries:
+                pages.append(self.client.get(pages[-1]['next']).data)
+            self.assertFalse([query for query in queries if 'OFFSET' in query['sql']])
+        self.assertEqual([task['id'] for page in pages for task in page['results']], expected)
+        previous = self.client.get(pages[-1]['previous']).data
+        self.assertEqual(previous['results'], pages[-2]['results'])
+        self.assertEqual(self.client.get(self.url, {'ordering': '-dueDate', 'cursor': 'cD1bMV0='}).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_paginated_users(self):
+        """Tests that the user list is paginated when a page size is given."""
+        response = self.client.get(reverse('get_users'), {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+
+class StreamingResponseTests(APITestCase):
+    """Tests for the streamed JSON mode of the task and contact lists."""
+
+    def setUp(self):
+        """Sets up an authenticated user, tasks with subtasks and a contact."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        for index in range(5):
+            task = create_task(title=f'Täsk {index}')
+            Subtask.objects.create(parent_task=task, title='Subtask')
+        Contacts.objects.create(fullname='Test Contact', contactAssignedTo=self.user)
+
+    def get_streamed(self, url):
+        """Requests `url` in streaming mode and returns the decoded JSON body."""
+        response = self.client.get(url, {'stream': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_streamed_tasks_match_regular_response(self):
+        """Tests that streaming the tasks in small chunks yields the regular payload."""
+        url = reverse('task-list')
+        with mock.patch('join.streaming.STREAM_CHUNK_SIZE', 2):
+            streamed = self.get_streamed(url)
+        regular = json.loads(self.client.get(url).content)
+        self.assertEqual(streamed, regular)
+
+    def test_streamed_contacts(self):
+        """Tests that the contact list can be streamed."""
+        streamed = self.get_streamed(reverse('contact-list'))
+        self.assertEqual([contact['fullname'] for contact in streamed], ['Test Contact'])
+
+
+class ConditionalGetTests(APITestCase):
+    """Tests for the ETag based conditional GETs of the task and contact lists."""
+
+    def setUp(self):
+        """Sets up an authenticated user and a task."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        self.task = create_task()
+        self.url = reverse('task-list')
+
+    def test_unchanged_list_is_not_modified(self):
+        """Tests that polling with the current ETag returns 304 after a single query."""
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_delete_changes_etag(self):
+        """Tests that deleting a task invalidates the ETag of the task list."""
+        etag = self.client.get(self.url)['ETag']
+        self.client.delete(reverse('task-detail', kwargs={'id': self.task.id}))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data, [])
+
+    def test_contact_update_changes_etag(self):
+        """Tests that updating a contact invalidates the ETag of the contact list."""
+        contact = Contacts.objects.create(fullname='Test Contact', contactAssignedTo=self.user)
+        url = reverse('contact-list')
+        etag = self.client.get(url)['ETag']
+        data = {'fullname': 'Updated Contact', 'contactAssignedTo': self.user.id}
+        response = self.client.put(reverse('contact-detail', kwargs={'id': contact.id}), data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_is_per_user(self):
+        """Tests that the ETag of another user's list does not match and that lists vary on the token."""
+        Contacts.objects.create(fullname='Test Contact', contactAssignedTo=self.user)
+        for url in (reverse('contact-list'), f'{self.url}?assignee=me'):
+            response = self.client.get(url)
+            self.assertIn('Authorization', response['Vary'])
+            other = CustomUser.objects.create_user(username=f'other{len(url)}', password='password')
+            self.client.force_authenticate(other)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data, [])
+            self.client.force_authenticate(self.user)
+
+    def test_orm_and_admin_writes_change_etag(self):
+        """Tests that writes outside of the API (ORM, admin) invalidate the ETags as well."""
+        contact_url = reverse('contact-list')
+        contact = Contacts.objects.create(fullname='Test Contact', contactAssignedTo=self.user)
+        writes = [
+            (self.url, lambda: Subtask.objects.create(parent_task=self.task, title='Subtask')),
+            (self.url, lambda: self.task.assignedToID.add(self.user)),
+            (self.url, lambda: self.user.tasks.clear()),
+            (contact_url, lambda: Contacts.objects.filter(id=contact.id).first().save()),
+        ]
+        for url, write in writes:
+            etag = self.client.get(url)['ETag']
+            write()
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+        admin = CustomUser.objects.create_superuser(username='admin', password='password')
+        self.client.force_login(admin)
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(contact_url)['ETag']
+        response = self.client.post(reverse('admin:join_contacts_delete', args=[contact.id]), {'post': 'yes'})
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(self.client.get(contact_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+        self.assertTrue(Tombstone.objects.filter(collection='contacts', object_id=contact.id).exists())
+
+    def test_user_deletion_changes_etag(self):
+        """Tests that deleting an assigned user, which removes their assignments, invalidates the task ETag."""
+        other = CustomUser.objects.create_user(username='assignee', password='password')
+        self.task.assignedToID.add(other)
+        etag = self.client.get(self.url)['ETag']
+        other.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['assignedToID'], [])
+
+    def test_etag_depends_on_query(self):
+        """Tests that the ETag of a filtered list does not match the same list with other filters."""
+        etag = self.client.get(f'{self.url}?categoryboard=todo')['ETag']
+        same = self.client.get(f'{self.url}?categoryboard=todo', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(same.status_code, status.HTTP_304_NOT_MODIFIED)
+        for query in ('?categoryboard=done', '', '?fields=id'):
+            response = self.client.get(f'{self.url}{query}', HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+
+
+class SyncViewTests(APITestCase):
+    """Tests for the delta synchronization endpoint."""
+
+    def setUp(self):
+        """Sets up an authenticated user with a task, a contact and the cursor of a first sync."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        self.url = reverse('sync')
+        self.old_task = create_task(title='Old Task')
+        self.subtask = Subtask.objects.create(parent_task=self.old_task, title='Subtask')
+        self.contact = Contacts.objects.create(fullname='Test Contact', contactAssignedTo=self.user)
+        self.cursor = self.client.get(self.url).data['cursor']
+
+    def sync(self, cursor=None):
+        """Returns the response data of a sync from `cursor` (default: the cursor of the first sync)."""
+        response = self.client.get(self.url, {'since': cursor or self.cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_sync_without_cursor(self):
+        """Tests that a sync without cursor returns everything and a new cursor."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([task['id'] for task in response.data['tasks']], [self.old_task.id])
+        self.assertEqual(len(response.data['contacts']), 1)
+        self.assertNotIn('sequence', response.data['tasks'][0])
+        self.assertEqual(response.data['cursor'], self.cursor)
+        self.assertFalse(response.data['reset'])
+
+    def test_delta_sync_returns_only_changes(self):
+        """Tests that only changed tasks and tombstones of deleted objects are returned."""
+        new_task = create_task(title='New Task')
+        self.client.delete(reverse('contact-detail', kwargs={'id': self.contact.id}))
+        data = self.sync()
+        self.assertEqual([task['id'] for task in data['tasks']], [new_task.id])
+        self.assertEqual(data['contacts'], [])
+        self.assertEqual(data['deleted']['contacts'], [self.contact.id])
+        self.assertFalse(data['reset'])
+        data = self.sync(data['cursor'])
+        self.assertEqual((data['tasks'], data['deleted']['contacts']), ([], []))
+
+    def test_subtask_change_marks_task_changed(self):
+        """Tests that changing a subtask or an assignment reports the parent task."""
+        self.subtask.subtaskStatus = True
+        self.subtask.save()
+        data = self.sync()
+        self.assertEqual([task['id'] for task in data['tasks']], [self.old_task.id])
+        self.old_task.assignedToID.add(self.user)
+        self.assertEqual([task['id'] for task in self.sync(data['cursor'])['tasks']], [self.old_task.id])
+
+    def test_changes_keep_the_sequence_order(self):
+        """Tests that a change is reported once its sequence is past the cursor, whatever its timestamps say."""
+        TaskItem.objects.filter(id=self.old_task.id).update(updated_at=timezone.now() + timedelta(days=1))
+        self.assertEqual(self.sync()['tasks'], [])
+        self.old_task.save(update_fields=['title'])
+        TaskItem.objects.filter(id=self.old_task.id).update(updated_at=timezone.now() - timedelta(days=1))
+        self.assertEqual([task['id'] for task in self.sync()['tasks']], [self.old_task.id])
+
+    def test_contact_tombstones_are_per_user(self):
+        """Tests that users only receive the tombstones of their own contacts."""
+        other = CustomUser.objects.create_user(username='otheruser', password='password')
+        Contacts.objects.create(fullname='Other Contact', contactAssignedTo=other).delete()
+        self.assertEqual(self.sync()['deleted']['contacts'], [])
+
+    def test_outdated_cursor_resets(self):
+        """Tests that cursors older than the pruned tombstones or newer than the versions force a full resync."""
+        self.client.delete(reverse('task-detail', kwargs={'id': self.old_task.id}))
+        new_task = create_task(title='New Task')
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=31))
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('Pruned 1 tombstone(s).', out.getvalue())
+        for cursor in (self.cursor, '999999.0', '1729245600000000'):
+            data = self.sync(cursor)
+            self.assertTrue(data['reset'])
+            self.assertEqual([task['id'] for task in data['tasks']], [new_task.id])
+            self.assertEqual(len(data['contacts']), 1)
+            self.assertEqual(data['deleted']['tasks'], [])
+        data = self.sync(data['cursor'])
+        self.assertFalse(data['reset'])
+        self.assertEqual(data['tasks'], [])
+
+    def test_invalid_cursor(self):
+        """Tests that a malformed cursor is rejected."""
+        for cursor in ('yesterday', '1.2.3', '1.-2'):
+            response = self.client.get(self.url, {'since': cursor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+def task_payload(**kwargs):
+    """Returns the API payload of a fully populated task, overriding any of its fields with `kwargs`."""
+    data = {
+        'title': 'Task',
+        'description': 'Task description',
+        'assignedTo': ['Test User'],
+        'colors': ['#FFFFFF'],
+        'category': 'Work',
+        'categoryboard': 'todo',
+        'dueDate': '2024-10-01',
+        'prio': 'medium',
+        'assignedToID': [],
+        'subtasks': [],
+    }
+    data.update(kwargs)
+    return data
+
+
+class TaskBulkViewTests(APITestCase):
+    """Tests for the batch task endpoint."""
+
+    def setUp(self):
+        """Sets up an authenticated user, two existing tasks and the bulk URL."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        self.url = reverse('task-bulk')
+        self.task = create_task(title='Existing Task')
+        Subtask.objects.create(parent_task=self.task, title='Old Subtask')
+        self.other_task = create_task(title='Other Task')
+
+    def test_applies_all_operations(self):
+        """Tests that creates, updates and deletes are applied and reported."""
+        operations = [
+            {'action': 'create', 'data': task_payload(
+                title='Created', assignedToID=[self.user.id], subtasks=[{'title': 'New', 'subtaskStatus': False}]
+            )},
+            {'action': 'update', 'id': self.task.id, 'data': {
+                'categoryboard': 'done', 'subtasks': [{'title': 'Replaced', 'subtaskStatus': True}]
+            }},
+            {'action': 'delete', 'id': self.other_task.id},
+        ]
+        response = self.client.post(self.url, operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status'] for result in response.data['results']], ['created', 'updated', 'deleted'])
+
+        created = TaskItem.objects.get(id=response.data['results'][0]['id'])
+        self.assertEqual(created.assignedTo, ['Test User'])
+        self.assertEqual(list(created.assignedToID.all()), [self.user])
+        self.assertEqual([subtask.title for subtask in created.subtasks.all()], ['New'])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.categoryboard, 'done')
+        self.assertEqual(self.task.title, 'Existing Task')
+        self.assertEqual([subtask.title for subtask in self.task.subtasks.all()], ['Replaced'])
+        self.assertFalse(TaskItem.objects.filter(id=self.other_task.id).exists())
+
+    def test_invalid_operation_rolls_back_batch(self):
+        """Tests that one invalid operation rejects the whole batch with per-item errors."""
+        operations = [
+            {'action': 'update', 'id': self.task.id, 'data': {'title': 'Changed'}},
+            {'action': 'delete', 'id': 0},
+            {'action': 'create', 'data': task_payload(assignedToID=[0])},
+        ]
+        response = self.client.post(self.url, operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        results = response.data['results']
+        self.assertEqual([(result['index'], result.get('id')) for result in results], [(0, self.task.id), (1, 0), (2, None)])
+        self.assertNotIn('status', results[0])
+        self.assertIn('id', results[1]['errors'])
+        self.assertIn('assignedToID', results[2]['errors'])
+        self.assertEqual(TaskItem.objects.get(id=self.task.id).title, 'Existing Task')
+
+    def test_empty_batch_changes_nothing(self):
+        """Tests that an empty batch leaves the version of the task list alone."""
+        version = CollectionVersion.current(TASKS).version
+        response = self.client.post(self.url, [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+        self.assertEqual(CollectionVersion.current(TASKS).version, version)
+
+    def test_malformed_task_ids_are_rejected(self):
+        """Tests that non-integer task IDs are reported as invalid instead of failing."""
+        operations = [{'action': 'delete', 'id': [self.task.id]}, {'action': 'update', 'id': {'id': 1}, 'data': {}}]
+        response = self.client.post(self.url, operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([list(result['errors']) for result in response.data['results']], [['id'], ['id']])
+
+    def test_boolean_user_ids_are_rejected(self):
+        """Tests that `true` is not accepted as the ID of the first user."""
+        operations = [{'action': 'create', 'data': task_payload(assignedToID=[True])}]
+        response = self.client.post(self.url, operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('assignedToID', response.data['results'][0]['errors'])
+        response = self.client.post(reverse('task-list'), task_payload(assignedToID=[True]), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_updates_only_write_their_fields(self):
+        """Tests that an update does not write back fields another update of the batch sent."""
+        operations = [
+            {'action': 'update', 'id': self.task.id, 'data': {'title': 'Renamed'}},
+            {'action': 'update', 'id': self.other_task.id, 'data': {'prio': 'urgent'}},
+        ]
+        read_tasks = TaskItem.objects.in_bulk
+
+        def read_then_edit_concurrently(*args, **kwargs):
+            tasks = read_tasks(*args, **kwargs)
+            TaskItem.objects.filter(id=self.task.id).update(prio='low')
+            return tasks
+
+        with mock.patch.object(TaskItem.objects, 'in_bulk', side_effect=read_then_edit_concurrently):
+            response = self.client.post(self.url, operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        task = TaskItem.objects.get(id=self.task.id)
+        self.assertEqual((task.title, task.prio), ('Renamed', 'low'))
+        self.assertEqual(TaskItem.objects.get(id=self.other_task.id).prio, 'urgent')
+
+    def test_query_count_is_independent_of_batch_size(self):
+        """Tests that creating many tasks runs a fixed number of statements."""
+        operations = [
+            {'action': 'create', 'data': task_payload(
+                title=f'Task {index}', assignedToID=[self.user.id], subtasks=[{'title': 'Sub', 'subtaskStatus': False}]
+            )}
+            for index in range(20)
+        ]
+        CollectionVersion.bump('tasks')
+        # Users lookup, savepoint, task, subtask and assignment inserts, collection
+        # version bump and read, sequence stamp of the tasks and release of the savepoint
+        # (the search index is updated on commit).
+        with self.assertNumQueries(9):
+            response = self.client.post(self.url, operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(TaskItem.objects.count(), 22)
+        self.assertEqual(Subtask.objects.count(), 21)
+
+
+class SubtaskReconciliationTests(APITestCase):
+    """Tests for the set based reconciliation of subtasks on task updates."""
+
+    def setUp(self):
+        """Sets up an authenticated user and a task with three subtasks."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        self.task = create_task()
+        self.kept, self.changed, self.removed = [
+            Subtask.objects.create(parent_task=self.task, title=title) for title in ('Kept', 'Changed', 'Removed')
+        ]
+
+    def test_reconcile_keeps_ids_and_uses_bulk_statements(self):
+        """Tests that existing subtasks keep their IDs and changes are written in bulk."""
+        subtasks_data = [
+            {'id': self.kept.id, 'title': 'Kept', 'subtaskStatus': False},
+            {'id': self.changed.id, 'title': 'Changed', 'subtaskStatus': True},
+            {'title': 'Added', 'subtaskStatus': False},
+        ]
+        # Select, insert, update, select and delete of the removed subtasks (for their
+        # `post_delete` signal), the task version bump and read, the sequence stamp of
+        # the task and the tombstone insert.
+        with self.assertNumQueries(9):
+            reconcile_subtasks([(self.task, subtasks_data)])
+        subtasks = {subtask.title: subtask for subtask in self.task.subtasks.all()}
+        self.assertEqual(set(subtasks), {'Kept', 'Changed', 'Added'})
+        self.assertEqual(subtasks['Kept'].id, self.kept.id)
+        self.assertEqual(subtasks['Changed'].id, self.changed.id)
+        self.assertTrue(subtasks['Changed'].subtaskStatus)
+        self.assertTrue(Tombstone.objects.filter(collection='subtasks', object_id=self.removed.id).exists())
+
+    def test_put_keeps_subtask_ids(self):
+        """Tests that updating a task through the API keeps the IDs of its subtasks."""
+        data = task_payload(subtasks=[
+            {'id': self.kept.id, 'title': 'Kept', 'subtaskStatus': True},
+            {'id': self.removed.id + 100, 'title': 'Unknown ID', 'subtaskStatus': False},
+        ])
+        response = self.client.put(reverse('task-detail', kwargs={'id': self.task.id}), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = {subtask['title']: subtask['id'] for subtask in response.data['subtasks']}
+        self.assertEqual(ids['Kept'], self.kept.id)
+        self.assertNotEqual(ids['Unknown ID'], self.removed.id + 100)
+        self.assertEqual(self.task.subtasks.count(), 2)
+
+    def test_failed_update_is_rolled_back(self):
+        """Tests that a task update is applied completely or not at all."""
+        serializer = TaskItemSerializer(self.task, data=task_payload(title='Renamed', assignedToID=[self.user.id]))
+        self.assertTrue(serializer.is_valid())
+        with mock.patch('join.serializers.reconcile_subtasks', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                serializer.save()
+        self.task.refresh_from_db()
+        self.assertNotEqual(self.task.title, 'Renamed')
+        self.assertEqual(list(self.task.assignedToID.all()), [])
+
+
+class TaskCreationTests(APITestCase):
+    """Tests for the single-write task creation path."""
+
+    def setUp(self):
+        """Sets up two users to assign."""
+        self.users = [CustomUser.objects.create_user(username=f'user{index}') for index in range(2)]
+        CollectionVersion.bump('tasks')
+
+    def test_create_inserts_into_each_table_once(self):
+        """Tests that a task with subtasks and assignees is created with one INSERT per table."""
+        serializer = TaskItemSerializer(data=task_payload(
+            assignedToID=[user.id for user in self.users],
+            subtasks=[{'title': f'Subtask {index}', 'subtaskStatus': False} for index in range(3)],
+        ))
+        self.assertTrue(serializer.is_valid())
+        # Savepoint, task, subtask and assignment inserts, version bump and read,
+        # sequence stamp of the task, savepoint release (the search index is updated
+        # on commit).
+        with self.assertNumQueries(8):
+            task = serializer.save()
+        self.assertEqual(task.colors, ['#FFFFFF'])
+        self.assertEqual(task.subtasks.count(), 3)
+        self.assertEqual(set(task.assignedToID.all()), set(self.users))
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    """Tests for the cached token authentication."""
+
+    def setUp(self):
+        """Sets up a user with a token and an empty token cache."""
+        token_cache.clear()
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('task-list')
+
+    def token_queries(self):
+        """Requests the task list and returns the status code and the number of token queries."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        return response.status_code, sum('authtoken_token' in query['sql'] for query in queries)
+
+    def test_repeated_requests_skip_token_query(self):
+        """Tests that only the first request with a token queries the database for it."""
+        self.assertEqual(self.token_queries(), (status.HTTP_200_OK, 1))
+        self.assertEqual(self.token_queries(), (status.HTTP_200_OK, 0))
+        stats = token_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_deactivated_user_is_rejected(self):
+        """Tests that deactivating a user invalidates the cached token."""
+        self.token_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_is_rejected(self):
+        """Tests that deleting a token invalidates its cache entry."""
+        self.token_queries()
+        self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Tests that the cache holds at most `max_size` entries."""
+        with mock.patch.object(token_cache, 'max_size', 1):
+            token_cache.set('first', (self.user, None))
+            token_cache.set('second', (self.user, None))
+            self.assertIsNone(token_cache.get('first'))
+            self.assertIsNotNone(token_cache.get('second'))
+
+
+@override_settings(ROOT_URLCONF='joinbackend.asgi_urls')
+class AsyncLoginViewTests(APITransactionTestCase):
+    """Tests for the async login view served under ASGI."""
+
+    def setUp(self):
+        """Sets up a test user."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.url = reverse('login')
+
+    async def test_login_valid_user(self):
+        """Tests login with valid credentials through the async view."""
+        response = await self.async_client.post(
+            self.url, {'username': 'testuser', 'password': 'password'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = await Token.objects.aget(user_id=self.user.id)
+        self.assertEqual(response.json()['token'], token.key)
+        self.assertEqual(response.json()['user_id'], self.user.id)
+
+    async def test_login_invalid_user(self):
+        """Tests login with invalid credentials through the async view."""
+        response = await self.async_client.post(self.url, {'username': 'testuser', 'password': 'wrong'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('non_field_errors', response.json())
+
+    async def test_login_rejected_when_too_many_in_progress(self):
+        """Tests that logins beyond the queue limit are rejected instead of queued."""
+        with mock.patch('join.async_views._login_slots', threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = await self.async_client.post(self.url, {'username': 'testuser', 'password': 'password'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@override_settings(ROOT_URLCONF='joinbackend.asgi_urls')
+class AsyncCollectionViewTests(APITestCase):
+    """Tests for the async task and contact views served under ASGI."""
+
+    def setUp(self):
+        """Sets up a user with a token, two tasks with subtasks and a contact."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.headers = {'Authorization': f'Token {Token.objects.create(user=self.user).key}'}
+        self.task = create_task(title='Task 1')
+        Subtask.objects.create(parent_task=self.task, title='Subtask')
+        create_task(title='Task 2').assignedToID.set([self.user])
+        self.contact = Contacts.objects.create(fullname='Test Contact', contactAssignedTo=self.user)
+
+    async def test_task_list_matches_sync_view(self):
+        """Tests that the async task list returns the same body as the sync view."""
+        response = await self.async_client.get(reverse('task-list'), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with override_settings(ROOT_URLCONF='joinbackend.urls'):
+            expected = await self.async_client.get(reverse('task-list'), headers=self.headers)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response['ETag'], expected['ETag'])
+
+    async def test_unchanged_list_is_not_modified(self):
+        """Tests that the async list answers conditional requests."""
+        url = reverse('contact-list')
+        etag = (await self.async_client.get(url, headers=self.headers))['ETag']
+        response = await self.async_client.get(url, headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_paginated_and_streamed_lists(self):
+        """Tests the cursor pagination and the streaming mode of the async list."""
+        url = reverse('task-list')
+        page = (await self.async_client.get(url, {'page_size': 1}, headers=self.headers)).json()
+        self.assertEqual([task['title'] for task in page['results']], ['Task 1'])
+        self.assertIsNotNone(page['next'])
+        response = await self.async_client.get(url, {'stream': 'true'}, headers=self.headers)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual([task['title'] for task in json.loads(body)], ['Task 1', 'Task 2'])
+
+    async def test_task_write_round_trip(self):
+        """Tests creating, updating and deleting a task through the async view."""
+        response = await self.async_client.post(
+            reverse('task-list'), task_payload(title='Created'), content_type='application/json', headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        url = reverse('task-detail', kwargs={'id': response.json()['id']})
+        response = await self.async_client.put(
+            url, task_payload(title='Updated'), content_type='application/json', headers=self.headers
+        )
+        self.assertEqual(response.json()['title'], 'Updated')
+        response = await self.async_client.delete(url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = await self.async_client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_contact_writes_are_scoped_to_owner(self):
+        """Tests that the async contact writes only reach the requesting user's contacts."""
+        other = await sync_to_async(CustomUser.objects.create_user)(username='otheruser', password='password')
+        headers = {'Authorization': f'Token {(await Token.objects.acreate(user=other)).key}'}
+        url = reverse('contact-detail', kwargs={'id': self.contact.id})
+        data = json.dumps({'fullname': 'Taken over'})
+        response = await self.async_client.put(url, data, content_type='application/json', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.delete(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        data = json.dumps({'fullname': 'Planted', 'contactAssignedTo': self.user.id})
+        response = await self.async_client.post(
+            reverse('contact-list'), data, content_type='application/json', headers=headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['contactAssignedTo'], other.id)
+        self.assertEqual(await Contacts.objects.filter(contactAssignedTo=self.user).acount(), 1)
+
+    async def test_requires_token(self):
+        """Tests that the async views reject requests without a valid token."""
+        response = await self.async_client.get(reverse('task-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.async_client.get(reverse('task-list'), headers={'Authorization': 'Token invalid'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ChangeBrokerTests(APITestCase):
+    """Tests for the change events published on writes."""
+
+    def setUp(self):
+        """Sets up a user and a broker for the test."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(user=self.user)
+        self.broker = ChangeBroker(history=2)
+
+    def test_write_publishes_after_commit(self):
+        """Tests that creating a task publishes a change event once committed."""
+        with mock.patch('join.changes.broker', self.broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('task-list'), task_payload(), format='json')
+        event = self.broker.publish('contacts', 'created', [1])
+        self.assertEqual(event['id'], 2)
+        task_event = list(self.broker._history)[0]
+        self.assertEqual(
+            {key: task_event[key] for key in ('type', 'action', 'ids')},
+            {'type': 'tasks', 'action': 'created', 'ids': [response.data['id']]},
+        )
+
+    async def test_subscriber_catches_up_and_detects_gaps(self):
+        """Tests that subscribers replay missed events and are told about lost ones."""
+        for pk in (1, 2, 3):
+            self.broker.publish('tasks', 'updated', [pk])
+        with self.broker.subscribe(last_event_id=2) as subscription:
+            self.assertEqual((await subscription.get(1))['ids'], [3])
+            self.assertFalse(subscription.overflowed)
+        with self.broker.subscribe(last_event_id=1) as subscription:
+            self.assertEqual([(await subscription.get(1))['ids'] for _ in range(2)], [[2], [3]])
+            self.assertFalse(subscription.overflowed)
+        for last_event_id in (0, 4):
+            with self.broker.subscribe(last_event_id=last_event_id) as subscription:
+                self.assertTrue(subscription.overflowed)
+                self.assertIsNone(await subscription.get(0.01))
+        with ChangeBroker().subscribe(last_event_id=7) as subscription:
+            self.assertTrue(subscription.overflowed)
+        self.assertEqual(self.broker._subscribers, set())
+
+    async def test_owned_events_reach_their_owner_only(self):
+        """Tests that events of owned objects are only delivered and replayed to their owner."""
+        self.broker = ChangeBroker()
+        with self.broker.subscribe(user_id=1) as own, self.broker.subscribe(user_id=2) as other:
+            self.broker.publish('contacts', 'created', [10], owner=1)
+            self.broker.publish('tasks', 'created', [20])
+            self.assertEqual([(await own.get(1))['ids'] for _ in range(2)], [[10], [20]])
+            self.assertEqual((await other.get(1))['ids'], [20])
+            self.assertIsNone(await other.get(0.01))
+        with self.broker.subscribe(last_event_id=0, user_id=2) as replay:
+            self.assertEqual((await replay.get(1))['ids'], [20])
+            self.assertIsNone(await replay.get(0.01))
+
+    def test_contact_events_carry_the_owner(self):
+        """Tests that contact writes publish events tagged with the contact's owner."""
+        with mock.patch('join.changes.broker', self.broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                contact = Contacts.objects.create(fullname='Test Contact', contactAssignedTo=self.user)
+        event = self.broker._history[-1]
+        self.assertEqual((event['type'], event['ids'], event['owner']), ('contacts', [contact.id], self.user.id))
+
+
+@override_settings(ROOT_URLCONF='joinbackend.asgi_urls')
+class ChangeStreamViewTests(APITestCase):
+    """Tests for the server-sent change stream."""
+
+    def setUp(self):
+        """Sets up a user with a token."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.headers = {'Authorization': f'Token {Token.objects.create(user=self.user).key}'}
+
+    async def test_stream_delivers_published_events(self):
+        """Tests that published changes are pushed to connected clients."""
+        response = await self.async_client.get(reverse('change-stream'), headers=self.headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertTrue((await anext(chunks)).startswith(b'retry:'))
+        pending = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0)
+        event = broker.publish('tasks', 'deleted', [42])
+        self.assertEqual(
+            await pending,
+            f'id: {event["id"]}\nevent: tasks\ndata: {{"action":"deleted","ids":[42]}}\n\n'.encode(),
+        )
+        await chunks.aclose()
+
+    async def test_unknown_last_event_id_resets(self):
+        """Tests that a client reconnecting with an event ID the broker does not know is told to reload."""
+        last_event_id = broker.publish('tasks', 'updated', [1])['id'] + 1000
+        headers = {**self.headers, 'Last-Event-ID': str(last_event_id)}
+        response = await self.async_client.get(reverse('change-stream'), headers=headers)
+        chunks = aiter(response.streaming_content)
+        self.assertTrue((await anext(chunks)).startswith(b'retry:'))
+        self.assertEqual(await anext(chunks), b'event: reset\ndata: {}\n\n')
+        await chunks.aclose()
+
+    async def test_unsent_response_does_not_subscribe(self):
+        """Tests that a stream which is never iterated leaves no subscriber behind."""
+        subscribers = len(broker._subscribers)
+        response = await self.async_client.get(reverse('change-stream'), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(broker._subscribers), subscribers)
+
+    async def test_requires_token(self):
+        """Tests that the change stream rejects requests without a valid token."""
+        response = await self.async_client.get(reverse('change-stream'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SqliteProfileTests(APITestCase):
+    """Tests for the SQLite connection profiles."""
+
+    def test_production_profile_pragmas(self):
+        """Tests that connections of the production profile use WAL and wait for locks."""
+        with tempfile.TemporaryDirectory() as directory:
+            sqlite = open_connection(str(Path(directory) / 'db.sqlite3'), settings.JOIN_SQLITE_PROFILES['production'])
+            pragmas = {name: sqlite.execute(f'PRAGMA {name}').fetchone()[0] for name in ('journal_mode', 'busy_timeout')}
+            sqlite.close()
+        self.assertEqual(pragmas, {'journal_mode': 'wal', 'busy_timeout': 5000})
+
+
+@override_settings(JOIN_DB_READ_REPLICAS=['replica1'], JOIN_DB_PIN_SECONDS=5)
+class PrimaryReplicaRouterTests(APITestCase):
+    """Tests for the read/write database router and the primary pinning."""
+
+    def setUp(self):
+        """Sets up the router and a request factory."""
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def handle(self, request, write=False):
+        """Runs a request through the middleware and returns the read alias it saw and the response."""
+        seen = {}
+
+        def view(request):
+            if write:
+                self.router.db_for_write(TaskItem)
+            seen['read'] = self.router.db_for_read(TaskItem)
+            return HttpResponse()
+
+        response = PrimaryPinningMiddleware(view)(request)
+        return seen['read'], response
+
+    def test_reads_go_to_replica_until_request_writes(self):
+        """Tests that requests read from the replica unless they have written."""
+        read, response = self.handle(self.factory.get('/'))
+        self.assertEqual(read, 'replica1')
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+        read, response = self.handle(self.factory.post('/'), write=True)
+        self.assertEqual(read, 'default')
+        self.assertEqual(response.cookies[PRIMARY_COOKIE]['max-age'], 5)
+        self.assertEqual(self.handle(self.factory.get('/'))[0], 'replica1')
+
+    def test_pin_cookie_reads_from_primary(self):
+        """Tests that a client which has just written keeps reading from the primary."""
+        request = self.factory.get('/')
+        request.COOKIES[PRIMARY_COOKIE] = '1'
+        read, response = self.handle(request)
+        self.assertEqual(read, 'default')
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_streamed_body_keeps_the_pin(self):
+        """Tests that the body of a streamed response reads from the primary when its request is pinned."""
+        request = self.factory.get('/')
+        request.COOKIES[PRIMARY_COOKIE] = '1'
+
+        def view(request):
+            return StreamingHttpResponse(self.router.db_for_read(TaskItem) for _ in range(2))
+
+        def consume():
+            response = PrimaryPinningMiddleware(view)(request)
+            return b''.join(response.streaming_content), is_pinned()
+
+        # A fresh context, which starts unpinned like a new request.
+        self.assertEqual(contextvars.Context().run(consume), (b'defaultdefault', False))
+
+    def test_migrations_only_on_primary(self):
+        """Tests that migrations are not applied to the replicas."""
+        self.assertTrue(self.router.allow_migrate('default', 'join'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'join'))
+
+
+@override_settings(JOIN_DB_READ_REPLICAS=['replica1'])
+class SqliteReplicationTests(APITestCase):
+    """Tests for the SQLite replication stand-in with real database files."""
+
+    def setUp(self):
+        """Points the primary and a replica at temporary SQLite files."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for alias in ('default', 'replica1'):
+            self.use_sqlite_file(alias, Path(directory.name) / f'{alias}.sqlite3')
+
+    def use_sqlite_file(self, alias, path):
+        """Connects `alias` to the SQLite file at `path` until the end of the test."""
+        original = connections[alias] if alias in connections.settings else None
+        settings_override = mock.patch.dict(connections.settings, {
+            alias: {**connections.settings['default'], 'NAME': str(path)},
+        })
+        settings_override.start()
+        self.addCleanup(settings_override.stop)
+        connections[alias] = connections.create_connection(alias)
+        # Connect right away, the test case only lets its `databases` connect lazily.
+        connections[alias].connect()
+
+        def restore():
+            connections[alias].close()
+            if original is None:
+                del connections[alias]
+            else:
+                connections[alias] = original
+        self.addCleanup(restore)
+
+    def test_replica_serves_rows_written_to_primary(self):
+        """Tests that a row written to the primary can be read from the replica once replicated."""
+        with connection.schema_editor() as editor:
+            editor.create_model(CollectionVersion)
+        CollectionVersion.objects.create(name='tasks', version=7)
+        output = StringIO()
+        call_command('replicate_sqlite', stdout=output)
+        self.assertIn('Replicated to 1 replica(s)', output.getvalue())
+        self.assertEqual(CollectionVersion.objects.using('replica1').get(name='tasks').version, 7)
+
+
+class TaskFilterTests(APITestCase):
+    """Tests for filtering and ordering the task list."""
+
+    def setUp(self):
+        """Sets up an authenticated user and tasks on different boards, priorities and due dates."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        self.first = create_task(title='First', categoryboard='todo', prio='urgent', dueDate='2024-10-03')
+        self.second = create_task(title='Second', categoryboard='done', prio='low', dueDate='2024-10-01')
+        self.third = create_task(title='Third', categoryboard='todo', prio='low', dueDate='2024-10-02')
+        self.first.assignedToID.set([self.user])
+        self.url = reverse('task-list')
+
+    def titles(self, params):
+        """Returns the titles of the task list for the given query parameters."""
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['title'] for task in response.data]
+
+    def test_filters(self):
+        """Tests filtering by board, priority, assignee and due date range."""
+        self.assertEqual(self.titles({'categoryboard': 'todo'}), ['First', 'Third'])
+        self.assertEqual(self.titles({'categoryboard': 'todo,done', 'prio': 'low'}), ['Second', 'Third'])
+        self.assertEqual(self.titles({'assignee': 'me'}), ['First'])
+        self.assertEqual(self.titles({'due_after': '2024-10-02', 'due_before': '2024-10-02'}), ['Third'])
+
+    def test_ordering_and_pagination(self):
+        """Tests that the list and its pages follow the requested ordering."""
+        self.assertEqual(self.titles({'ordering': 'dueDate'}), ['Second', 'Third', 'First'])
+        self.assertEqual(self.titles({'ordering': '-prio'}), ['First', 'Third', 'Second'])
+        response = self.client.get(self.url, {'ordering': '-dueDate', 'page_size': 2})
+        titles = [task['title'] for task in response.data['results']]
+        titles += [task['title'] for task in self.client.get(response.data['next']).data['results']]
+        self.assertEqual(titles, ['First', 'Third', 'Second'])
+
+    def test_invalid_parameters(self):
+        """Tests that malformed filters and unknown orderings are rejected."""
+        for params in ({'ordering': 'description'}, {'due_after': 'tomorrow'}, {'assignee': 'someone'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), response.data)
+
+    def test_filters_use_index(self):
+        """Tests that the board filter with due date ordering is served by the composite index."""
+        tasks = filter_tasks(TaskItem.objects.all(), QueryDict('categoryboard=todo&ordering=dueDate'))
+        self.assertIn('task_board_due_idx', tasks.explain())
+
+
+class TaskSearchTests(APITestCase):
+    """Tests for the full-text task search."""
+
+    def setUp(self):
+        """Sets up an authenticated user and the search URL."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        self.url = reverse('task-search')
+
+    def write(self, method, url, data=None):
+        """Sends a write request and runs the callbacks of its committed transaction."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(url, data, format='json')
+
+    def search(self, text, **params):
+        """Returns the response data of a search."""
+        response = self.client.get(self.url, {'q': text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_index_follows_writes(self):
+        """Tests that created, updated and deleted tasks are found accordingly."""
+        payload = task_payload(title='Quarterly report', subtasks=[{'title': 'Collect invoices', 'subtaskStatus': False}])
+        task_id = self.write('post', reverse('task-list'), payload).data['id']
+        self.assertEqual([task['id'] for task in self.search('invoice')['results']], [task_id])
+        url = reverse('task-detail', kwargs={'id': task_id})
+        self.write('put', url, task_payload(title='Annual report', subtasks=[]))
+        self.assertEqual(self.search('invoice')['results'], [])
+        self.assertEqual(len(self.search('annual')['results']), 1)
+        self.write('delete', url)
+        self.assertEqual(self.search('annual')['results'], [])
+
+    def test_orm_writes_are_indexed(self):
+        """Tests that tasks and subtasks written through the ORM are indexed once committed."""
+        with self.captureOnCommitCallbacks(execute=True):
+            task = create_task(title='Quarterly report')
+            subtask = Subtask.objects.create(parent_task=task, title='Collect invoices')
+        self.assertEqual([result['id'] for result in self.search('invoice')['results']], [task.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            subtask.delete()
+        self.assertEqual(self.search('invoice')['results'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(self.search('quarterly')['results'], [])
+
+    def test_rolled_back_writes_are_not_indexed(self):
+        """Tests that the index is only updated once the write is committed."""
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_task(title='Quarterly report')
+        self.assertEqual(self.search('quarterly')['results'], [])
+        self.assertTrue(callbacks)
+
+    def test_ranked_and_paginated(self):
+        """Tests that title matches rank first and that results are paginated."""
+        in_description = create_task(title='Groceries', description='Buy milk for the office')
+        in_title = create_task(title='Milk', description='Whole milk')
+        create_task(title='Unrelated')
+        call_command('rebuild_task_search', stdout=StringIO())
+        data = self.search('milk', page_size=1)
+        self.assertEqual([task['id'] for task in data['results']], [in_title.id])
+        self.assertIsNone(data['previous'])
+        data = self.client.get(data['next']).data
+        self.assertEqual([task['id'] for task in data['results']], [in_description.id])
+        self.assertIsNone(data['next'])
+
+    def test_search_input_is_not_a_query(self):
+        """Tests that FTS5 syntax in the input is searched for literally instead of failing."""
+        self.assertEqual(self.search('"title: OR (')['results'], [])
+        self.assertEqual(self.search('')['results'], [])
+
+
+class ContactAutocompleteTests(APITestCase):
+    """Tests for the contact typeahead."""
+
+    def setUp(self):
+        """Sets up an authenticated user and a few contacts."""
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        for firstname, lastname, email in (
+            ('Anna', 'Berg', 'anna@example.com'),
+            ('Bernd', 'Annen', 'bernd@example.com'),
+            ('Carla', 'Diaz', 'annabelle@example.com'),
+            ('Anton', 'Zeller', 'anton@example.com'),
+        ):
+            Contacts.objects.create(
+                firstname=firstname, lastname=lastname, fullname=f'{firstname} {lastname}',
+                email=email, contactAssignedTo=self.user,
+            )
+        self.url = reverse('contact-autocomplete')
+
+    def names(self, params):
+        """Returns the full names of the matches for the given query parameters."""
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [contact['fullname'] for contact in response.data]
+
+    def test_prefix_matches_ranked_by_field(self):
+        """Tests that full name matches come first, followed by last name and email matches."""
+        self.assertEqual(self.names({'q': 'ANN'}), ['Anna Berg', 'Bernd Annen', 'Carla Diaz'])
+        self.assertEqual(self.names({'q': 'an', 'limit': 2}), ['Anna Berg', 'Anton Zeller'])
+        self.assertEqual(self.names({'q': 'x'}), [])
+
+    def test_prefix_lookup_uses_index(self):
+        """Tests that the prefix lookup is a range scan on the functional index."""
+        plan = (
+            Contacts.objects.annotate(key=Lower('fullname'))
+            .filter(contactAssignedTo=self.user, key__gte='an', key__lt='ao')
+            .order_by('key', 'id')
+            .explain()
+        )
+        self.assertIn('contact_owner_fullname_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_other_owners_contacts_are_not_matched(self):
+        """Tests that the typeahead and the sync only return the requesting user's contacts."""
+        other = CustomUser.objects.create_user(username='other', password='password')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.names({'q': 'an'}), [])
+        self.assertEqual(self.client.get(reverse('sync')).data['contacts'], [])
+
+
+class OwnerContactListTests(APITestCase):
+    """Tests for the owner-scoped, cached contact list."""
+
+    def setUp(self):
+        """Sets up two users with a contact each and clears the caches."""
+        cache.clear()
+        response_cache.clear()
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.other = CustomUser.objects.create_user(username='otheruser', password='password')
+        self.client.force_authenticate(self.user)
+        self.contact = Contacts.objects.create(fullname='Own Contact', contactAssignedTo=self.user)
+        Contacts.objects.create(fullname='Other Contact', contactAssignedTo=self.other)
+        self.url = reverse('contact-list')
+
+    def names(self):
+        """Returns the full names of the requesting user's contact list."""
+        return [contact['fullname'] for contact in self.client.get(self.url).data]
+
+    def test_list_is_scoped_to_owner(self):
+        """Tests that users only receive their own contacts."""
+        self.assertEqual(self.names(), ['Own Contact'])
+
+    def test_cached_list_follows_owner_changes(self):
+        """Tests that the cached list is reused until the owner's contacts change."""
+        self.names()
+        # Only the collection version, the response comes from the response cache.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.names(), ['Own Contact'])
+        response_cache.clear()
+        # Collection version and owner fingerprint, no contact rows.
+        with self.assertNumQueries(2):
+            self.assertEqual(self.names(), ['Own Contact'])
+        key = contact_list_key(self.user)
+        Contacts.objects.create(fullname='Another Other', contactAssignedTo=self.other)
+        self.assertEqual(contact_list_key(self.user), key)
+        self.client.put(
+            reverse('contact-detail', kwargs={'id': self.contact.id}),
+            {'fullname': 'Renamed Contact', 'contactAssignedTo': self.user.id},
+        )
+        self.assertNotEqual(contact_list_key(self.user), key)
+        self.assertEqual(self.names(), ['Renamed Contact'])
+        self.client.delete(reverse('contact-detail', kwargs={'id': self.contact.id}))
+        self.assertEqual(self.names(), [])
+
+    def test_writes_are_scoped_to_owner(self):
+        """Tests that users can neither change other users' contacts nor create contacts for them."""
+        self.client.force_authenticate(self.other)
+        url = reverse('contact-detail', kwargs={'id': self.contact.id})
+        response = self.client.put(url, {'fullname': 'Taken over', 'contactAssignedTo': self.other.id})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(self.url, {'fullname': 'Planted', 'contactAssignedTo': self.user.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['contactAssignedTo'], self.other.id)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.names(), ['Own Contact'])
+
+    def test_reassignment_leaves_tombstone_for_previous_owner(self):
+        """Tests that a contact reassigned to another user is reported as deleted to its previous owner only."""
+        self.contact.contactAssignedTo = self.other
+        self.contact.save()
+        tombstone = Tombstone.objects.get(collection='contacts', object_id=self.contact.id)
+        self.assertEqual(tombstone.owner, self.user.id)
+        self.assertEqual(self.names(), [])
+        cursor = SyncView().make_cursor([0, 0])
+        for user, deleted in ((self.user, [self.contact.id]), (self.other, [])):
+            self.client.force_authenticate(user)
+            response = self.client.get(reverse('sync'), {'since': cursor})
+            self.assertEqual(response.data['deleted']['contacts'], deleted)
+
+
+class ResponseCacheTests(APITestCase):
+    """Tests for the signal-invalidated response cache of the read endpoints."""
+
+    def setUp(self):
+        """Sets up two users, a task and a contact, and resets the cache and its stats."""
+        response_cache.clear()
+        response_cache_stats.reset()
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.other = CustomUser.objects.create_user(username='otheruser', password='password')
+        self.client.force_authenticate(self.user)
+        self.task = create_task(title='Cached')
+        self.contact = Contacts.objects.create(fullname='Own Contact', contactAssignedTo=self.user)
+
+    def assertCache(self, url, expected, params=None):
+        """Requests `url` and checks its `X-Cache` header."""
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], expected)
+        return response
+
+    def test_hits_and_stats(self):
+        """Tests that repeated reads are served from the cache and counted."""
+        url = reverse('task-list')
+        self.assertCache(url, 'MISS')
+        response = self.assertCache(url, 'HIT')
+        self.assertEqual(response.data[0]['title'], 'Cached')
+        self.assertCache(url, 'MISS', {'categoryboard': 'done'})
+        self.assertCache(url, 'MISS', {'stream': 'false'})
+        self.assertCache(url, 'HIT', {'stream': 'false'})
+        self.assertCache(reverse('get_users'), 'MISS')
+        self.assertCache(reverse('get_users'), 'HIT')
+        stats = response_cache_stats.snapshot()
+        self.assertEqual((stats['hits'], stats['misses']), (3, 4))
+        self.assertAlmostEqual(stats['hit_ratio'], 3 / 7)
+
+    def test_task_writes_invalidate(self):
+        """Tests that saves, assignment changes and bulk writes invalidate the task list."""
+        url = reverse('task-list')
+        self.assertCache(url, 'MISS')
+        self.task.assignedToID.add(self.user)
+        self.assertEqual(self.assertCache(url, 'MISS').data[0]['assignedToID'], [self.user.id])
+        reconcile_subtasks([(self.task, [{'title': 'Bulk', 'subtaskStatus': False}])])
+        self.assertEqual(len(self.assertCache(url, 'MISS').data[0]['subtasks']), 1)
+        self.assertCache(url, 'HIT')
+
+    def test_contact_invalidation_is_per_owner(self):
+        """Tests that only the owner's cached contact list is invalidated by their contacts."""
+        url = reverse('contact-list')
+        self.assertCache(url, 'MISS')
+        Contacts.objects.create(fullname='Other Contact', contactAssignedTo=self.other)
+        self.assertCache(url, 'HIT')
+        self.contact.contactAssignedTo = self.other
+        self.contact.save()
+        self.assertEqual(self.assertCache(url, 'MISS').data, [])
+
+    def test_single_subtask_delete_is_recorded(self):
+        """Tests that deleting one subtask (as in the admin) invalidates responses, the version and the index."""
+        with self.captureOnCommitCallbacks(execute=True):
+            subtask = Subtask.objects.create(parent_task=self.task, title='Groceries')
+        url = reverse('task-list')
+        self.assertCache(url, 'MISS')
+        self.assertEqual(search_task_ids('groceries', 10), [self.task.id])
+        version = CollectionVersion.current(TASKS).version
+        subtask_id = subtask.id
+        with self.captureOnCommitCallbacks(execute=True):
+            subtask.delete()
+        self.assertEqual(self.assertCache(url, 'MISS').data[0]['subtasks'], [])
+        self.assertGreater(CollectionVersion.current(TASKS).version, version)
+        self.assertTrue(Tombstone.objects.filter(collection='subtasks', object_id=subtask_id).exists())
+        self.assertEqual(search_task_ids('groceries', 10), [])
+
+    def test_misses_read_from_the_primary(self):
+        """Tests that responses to be cached are built from the primary database."""
+        with mock.patch('join.response_cache.pin_to_primary') as pin:
+            self.assertCache(reverse('task-list'), 'MISS')
+            self.assertCache(reverse('task-list'), 'HIT')
+        self.assertEqual(pin.call_count, 1)
+
+
+class SummaryViewTests(APITestCase):
+    """Tests for the summary endpoint."""
+
+    def setUp(self):
+        """Sets up an authenticated user and tasks across the board."""
+        response_cache.clear()
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        today = timezone.localdate()
+        create_task(categoryboard='todo', prio='urgent', dueDate=today + timedelta(days=5))
+        create_task(categoryboard='todo', prio='low', dueDate=today + timedelta(days=2))
+        create_task(categoryboard='inProgress', prio='urgent', dueDate=today - timedelta(days=1))
+        create_task(categoryboard='done', prio='urgent', dueDate=today)
+        self.today = today
+
+    def test_summary_in_one_query(self):
+        """Tests the summary figures and that they are computed with a single query."""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('summary'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'total': 4,
+            'boards': {'done': 1, 'inProgress': 1, 'todo': 2},
+            'inProgress': 1,
+            'done': 1,
+            'urgent': 2,
+            'upcomingDeadline': (self.today + timedelta(days=2)).isoformat(),
+            'upcomingUrgentDeadline': (self.today + timedelta(days=5)).isoformat(),
+        })
+
+    def test_summary_follows_task_changes(self):
+        """Tests that the cached summary is refreshed when a task changes."""
+        self.assertEqual(self.client.get(reverse('summary')).data['total'], 4)
+        create_task(categoryboard='done')
+        response = self.client.get(reverse('summary'))
+        self.assertEqual((response.data['total'], response.data['done']), (5, 2))
+
+
+class SparseFieldsTests(APITestCase):
+    """Tests for the `fields` and `exclude` query parameters of the list endpoints."""
+
+    def setUp(self):
+        """Sets up an authenticated user, a task with a subtask and assignee, and a contact."""
+        response_cache.clear()
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        self.task = task = create_task(title='Task 1', description='Long description')
+        task.assignedToID.set([self.user])
+        Subtask.objects.create(parent_task=task, title='Subtask')
+        self.contact = Contacts.objects.create(fullname='Test Contact', email='test@example.com', contactAssignedTo=self.user)
+
+    def test_task_fields_skip_relations_and_columns(self):
+        """Tests that a board card projection neither prefetches relations nor selects unused columns."""
+        # Collection version and tasks.
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task-list'), {'fields': 'id,title,categoryboard,prio'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'id': self.task.id, 'title': 'Task 1', 'categoryboard': 'todo', 'prio': 'medium'}])
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('description', queries[-1]['sql'])
+
+    def test_task_exclude(self):
+        """Tests that excluded fields are left out of the task list."""
+        response = self.client.get(reverse('task-list'), {'exclude': 'description,subtasks'})
+        self.assertNotIn('description', response.data[0])
+        self.assertNotIn('subtasks', response.data[0])
+        self.assertEqual(response.data[0]['assignedToID'], [self.user.id])
+
+    def test_unknown_field_is_rejected(self):
+        """Tests that an unknown field name is a validation error."""
+        response = self.client.get(reverse('task-list'), {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+    def test_contact_and_user_fields(self):
+        """Tests sparse fieldsets on the contact and user lists, including the cached contact list."""
+        for _ in range(2):
+            response = self.client.get(reverse('contact-list'), {'fields': 'id,fullname'})
+            self.assertEqual(response.data, [{'id': self.contact.id, 'fullname': 'Test Contact'}])
+        response = self.client.get(reverse('get_users'), {'fields': 'id,username'})
+        self.assertEqual(response.data, [{'id': self.user.id, 'username': 'testuser'}])
+
+    @override_settings(ROOT_URLCONF='joinbackend.asgi_urls')
+    async def test_async_task_fields(self):
+        """Tests sparse fieldsets on the async task list."""
+        headers = {'Authorization': f'Token {(await Token.objects.acreate(user=self.user)).key}'}
+        response = await self.async_client.get(reverse('task-list'), {'fields': 'id,title'}, headers=headers)
+        self.assertEqual(response.json(), [{'id': self.task.id, 'title': 'Task 1'}])
+        response = await self.async_client.get(reverse('task-list'), {'fields': 'nope'}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskCardViewTests(APITestCase):
+    """Tests for the card representation of the task list."""
+
+    def setUp(self):
+        """Sets up an authenticated user and tasks with partly done subtasks."""
+        response_cache.clear()
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        for index in range(3):
+            task = create_task(title=f'Task {index}')
+            task.assignedToID.set([self.user])
+            for number in range(index):
+                Subtask.objects.create(parent_task=task, title=f'Subtask {number}', subtaskStatus=number == 0)
+
+    def test_cards_count_subtasks_in_one_query(self):
+        """Tests the subtask progress of the cards and that the tasks are read with a single query."""
+        # Collection version and tasks.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('task-list'), {'view': 'card'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        progress = [(card['subtasks_total'], card['subtasks_done']) for card in response.data]
+        self.assertEqual(progress, [(0, 0), (1, 1), (2, 1)])
+        self.assertNotIn('subtasks', response.data[0])
+        full = self.client.get(reverse('task-list'))
+        self.assertLess(len(response.content), len(full.content))
+
+    def test_cards_with_filters_pages_and_fields(self):
+        """Tests that cards combine with filtering, ordering, pagination and sparse fieldsets."""
+        params = {'view': 'card', 'ordering': '-title', 'page_size': 2, 'fields': 'title,subtasks_done'}
+        response = self.client.get(reverse('task-list'), params)
+        self.assertEqual(response.data['results'], [
+            {'title': 'Task 2', 'subtasks_done': 1},
+            {'title': 'Task 1', 'subtasks_done': 1},
+        ])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'], [{'title': 'Task 0', 'subtasks_done': 0}])
+
+    def test_unknown_view_is_rejected(self):
+        """Tests that an unknown representation is a validation error."""
+        response = self.client.get(reverse('task-list'), {'view': 'tiles'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(ROOT_URLCONF='joinbackend.asgi_urls')
+    async def test_async_cards(self):
+        """Tests the card representation on the async task list."""
+        headers = {'Authorization': f'Token {(await Token.objects.acreate(user=self.user)).key}'}
+        response = await self.async_client.get(reverse('task-list'), {'view': 'card'}, headers=headers)
+        self.assertEqual([card['subtasks_total'] for card in response.json()], [0, 1, 2])
+
+
+class InstrumentationTests(APITestCase):
+    """Tests for the request instrumentation and the metrics endpoint."""
+
+    def setUp(self):
+        """Sets up an authenticated user, a task and empty latency histograms."""
+        response_cache.clear()
+        latency_histograms.reset()
+        self.user = CustomUser.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(self.user)
+        create_task(title='Task 1')
+
+    def test_server_timing_header(self):
+        """Tests that responses report their SQL, serializer and total time."""
+        response = self.client.get(reverse('task-list'))
+        timing = response['Server-Timing']
+        # Collection version, tasks, subtasks and assigned users.
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="4 queries"', timing)
+        self.assertIn('serializer;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_slow_requests_are_logged_with_their_queries(self):
+        """Tests that requests over the threshold are logged with their slowest statements."""
+        with override_settings(JOIN_SLOW_REQUEST_MS=0, JOIN_SLOW_REQUEST_QUERIES=2):
+            with self.assertLogs('join.instrumentation', 'WARNING') as logs:
+                self.client.get(reverse('task-list'))
+        self.assertIn('GET join/api/tasks/', logs.output[0])
+        self.assertEqual(logs.output[0].count(' ms: SELECT'), 2)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        """Tests the per-endpoint histograms of the metrics endpoint and that it requires a staff user."""
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.get(reverse('task-list'))
+        self.client.get(reverse('task-detail', kwargs={'id': TaskItem.objects.get().id}))
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        endpoints = response.data['endpoints']
+        self.assertEqual(endpoints['GET join/api/tasks/']['count'], 1)
+        self.assertEqual(endpoints['GET join/api/tasks/<int:id>/']['count'], 1)
+        self.assertEqual(sum(endpoints['GET join/api/tasks/']['buckets'].values()), 1)
+        self.assertIn('hit_ratio', response.data['token_cache'])
+        self.assertIn('hit_ratio', response.data['response_cache'])
+
+    @override_settings(ROOT_URLCONF='joinbackend.asgi_urls')
+    async def test_async_views_are_measured(self):
+        """Tests that the queries of async views, run in worker threads, are counted."""
+        headers = {'Authorization': f'Token {(await Token.objects.acreate(user=self.user)).key}'}
+        response = await self.async_client.get(reverse('task-list'), headers=headers)
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+
+class ProfilingMiddlewareTests(APITestCase):
+    """Tests for on-demand profiling of requests by staff users."""
+
+    def setUp(self):
+        """Sets up a staff user with a token, a task and a temporary profile directory."""
+        response_cache.clear()
+        self.user = CustomUser.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+        create_task(title='Task 1')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings_override = override_settings(JOIN_PROFILE_DIR=directory.name, JOIN_PROFILE_KEEP=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_inline_summary(self):
+        """Tests that an inline profile returns the top functions and allocations of the request."""
+        response = self.client.get(reverse('task-list'), {'profile': 'inline'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary = response.json()
+        self.assertEqual(summary['status'], 200)
+        self.assertTrue(any('to_representation' in entry['function'] for entry in summary['cpu']))
+        self.assertIn('memory', summary)
+        self.assertTrue((self.directory / f'{summary["profile"]}.prof').exists())
+        self.assertTrue((self.directory / f'{summary["profile"]}.alloc').exists())
+
+    def test_captures_are_kept_in_a_ring(self):
+        """Tests that saved captures are limited to `JOIN_PROFILE_KEEP` and named in the response."""
+        names = [
+            self.client.get(reverse('task-list'), headers={'X-Join-Profile': '1'})['X-Join-Profile'] for _ in range(3)
+        ]
+        self.assertEqual(sorted(path.stem for path in self.directory.glob('*.prof')), names[1:])
+        self.assertEqual(len(list(self.directory.glob('*.alloc'))), 2)
+
+    def test_busy_and_non_staff_requests_are_not_profiled(self):
+        """Tests that concurrent captures are refused and that other users cannot profile."""
+        with mock.patch('join.profiling._lock', threading.Lock()) as lock:
+            lock.acquire()
+            response = self.client.get(reverse('task-list'), {'profile': '1'})
+        self.assertEqual(response['X-Join-Profile'], 'busy')
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(reverse('task-list'), {'profile': 'inline'})
+        self.assertNotIn('X-Join-Profile', response)
+        self.assertIsInstance(response.json(), list)
+        self.assertEqual(list(self.directory.iterdir()), [])
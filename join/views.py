@@ -1,14 +1,31 @@
+from django.db.models import Q
+from django.utils.timezone import localdate
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import generics
-from .models import Contacts, TaskItem, CustomUser, Subtask
-from .serializers import ContactsSerializer, TaskItemSerializer, UserSerializer
+from .authentication import CachedTokenAuthentication, token_cache
+from .caching import cached_contact_list, owner_contacts
+from .changes import CONTACTS, SUBTASKS, TASKS
+from .conditional import conditional_collection
+from .filters import filter_tasks
+from .instrumentation import latency_histograms
+from .models import CollectionVersion, TaskItem, CustomUser, Tombstone
+from .pagination import KeysetPagination
+from .response_cache import cached_response, response_cache_stats
+from .routers import pin_to_primary
+from .search import complete_contacts, search_task_ids
+from .serializers import (
+    ContactsSerializer, TaskBulkSerializer, TaskItemSerializer, UserSerializer, task_serializer_class,
+)
+from .streaming import stream_json_list, wants_stream
+from .summary import board_summary
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import replace_query_param
 from django.shortcuts import get_object_or_404, redirect
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
 
 class LoginView(ObtainAuthToken):
@@ -31,18 +48,32 @@ class LoginView(ObtainAuthToken):
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
         token, created = Token.objects.get_or_create(user=user)
-        return Response({
-            'token': token.key,
-            'user_id': user.pk,
-            'email': user.email,
-            'initials': user.initials,
-            'color': user.color,
-            'rememberlogin': user.rememberlogin,
-            'username': user.username,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'name': f"{user.first_name} {user.last_name}"
-        })
+        return Response(login_payload(user, token))
+
+
+def login_payload(user, token):
+    """
+    Build the login response body shared by the sync and async login views.
+
+    Parameters:
+    - `user`: The authenticated user.
+    - `token`: The user's authentication token.
+
+    Returns:
+    - Dict with the token and user details.
+    """
+    return {
+        'token': token.key,
+        'user_id': user.pk,
+        'email': user.email,
+        'initials': user.initials,
+        'color': user.color,
+        'rememberlogin': user.rememberlogin,
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'name': f"{user.first_name} {user.last_name}"
+    }
 
 
 class UserCreateView(generics.CreateAPIView):
@@ -60,11 +91,32 @@ class UserGetView(generics.ListAPIView):
     View for retrieving a list of all users.
 
     Inherits from `ListAPIView` and uses the `UserSerializer` to serialize the user data.
+    The list is paginated with `KeysetPagination` when a `cursor` or `page_size`
+    query parameter is given.
     """
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
+    pagination_class = KeysetPagination
+
+    @cached_response(lambda request: ['users'])
+    def get(self, request, *args, **kwargs):
+        """
+        Retrieve the list of users, served from the response cache (see `cached_response`).
+
+        Parameters:
+        - `fields`, `exclude` (optional query parameters): Emit only some fields of
+          the users (see `SparseFieldsMixin`).
+        """
+        self.fields = UserSerializer.select_fields(request.query_params)
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return UserSerializer.setup_eager_loading(super().get_queryset(), self.fields)
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(*args, fields=self.fields, **kwargs)
 
 
 class TaskView(APIView):
@@ -77,25 +129,53 @@ class TaskView(APIView):
     - DELETE: Delete a specific task by ID.
     - PUT: Update a specific task by ID.
     """
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @conditional_collection(TASKS)
+    @cached_response(lambda request: ['tasks'])
     def get(self, request, id=None, format=None):
         """
         Retrieve a single task or a list of all tasks.
 
+        The task list carries an `ETag` and answers `304 Not Modified` when the
+        client already holds the current version (see `conditional_collection`).
+        Responses are served from the response cache (see `cached_response`).
+
         Parameters:
         - `id` (optional): The ID of a specific task to retrieve.
+        - `categoryboard`, `prio`, `category`, `assignee`, `due_after`, `due_before`,
+          `ordering` (optional query parameters): Filter and order the task list
+          (see `filter_tasks`).
+        - `cursor`, `page_size` (optional query parameters): Request a page of the
+          task list instead of the full list (see `KeysetPagination`).
+        - `stream` (optional query parameter): Stream the full task list in chunks
+          instead of building it in memory (see `stream_json_list`).
+        - `fields`, `exclude` (optional query parameters): Emit only some fields of
+          the tasks (see `SparseFieldsMixin`).
+        - `view` (optional query parameter): `card` for the compact board card
+          representation with subtask progress counts (see `TaskCardSerializer`).
 
         Returns:
         - JSON response with the serialized task data.
         """
+        serializer_class = task_serializer_class(request.query_params)
+        fields = serializer_class.select_fields(request.query_params)
         if id:
-            task = get_object_or_404(TaskItem, id=id)
-            serializer = TaskItemSerializer(task)
-        else:
-            tasks = TaskItem.objects.all()
-            serializer = TaskItemSerializer(tasks, many=True)
+            tasks = serializer_class.setup_eager_loading(TaskItem.objects.all(), fields)
+            task = get_object_or_404(tasks, id=id)
+            serializer = serializer_class(task, fields=fields)
+            return Response(serializer.data)
+        tasks = filter_tasks(TaskItem.objects.all(), request.query_params, request.user)
+        tasks = serializer_class.setup_eager_loading(tasks, fields)
+        if wants_stream(request):
+            return stream_json_list(tasks, serializer_class, fields=fields)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(tasks, request, view=self)
+        if page is not None:
+            serializer = serializer_class(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializer.data)
+        serializer = serializer_class(tasks, many=True, fields=fields)
         return Response(serializer.data)
 
     def post(self, request, format=None):
@@ -146,59 +226,31 @@ class TaskView(APIView):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    def delete_removed_subtasks(self, task, incoming_subtask_ids):
-        """
-        Helper function to delete subtasks that are not in the incoming data.
-
-        Parameters:
-        - `task`: The task object.
-        - `incoming_subtask_ids`: A set of subtask IDs that are expected to remain.
-        """
-        existing_subtasks = task.subtasks.all()
-        for subtask in existing_subtasks:
-            if subtask.id not in incoming_subtask_ids:
-                subtask.delete()
 
-    def update_or_create_subtask(self, task, subtask_data):
-        """
-        Helper function to update or create a subtask.
+class TaskBulkView(APIView):
+    """
+    API view for applying a batch of task operations at once.
 
-        Parameters:
-        - `task`: The parent task object.
-        - `subtask_data`: Data of the subtask to be updated or created.
-        """
-        subtask_id = subtask_data.get('id')
-        if subtask_id:
-            try:
-                subtask = Subtask.objects.get(id=subtask_id, parent_task=task)
-                subtask.title = subtask_data.get('title', subtask.title)
-                subtask.subtaskStatus = subtask_data.get('subtaskStatus', subtask.subtaskStatus)
-                subtask.save()
-            except Subtask.DoesNotExist:
-                Subtask.objects.create(
-                    parent_task=task,
-                    title=subtask_data.get('title', 'New Subtask'),
-                    subtaskStatus=subtask_data.get('subtaskStatus', False)
-                )
-        else:
-            Subtask.objects.create(
-                parent_task=task,
-                title=subtask_data.get('title', 'New Subtask'),
-                subtaskStatus=subtask_data.get('subtaskStatus', False)
-            )
+    POST:
+    - Validates a list of create, update and delete operations (see
+      `TaskBulkSerializer`) and applies them in a single transaction.
 
-    def handle_subtasks(self, task, subtasks_data):
-        """
-        Helper function to handle subtasks creation, update, and deletion.
+    Returns:
+    - JSON response with one result per operation, or HTTP 400 with the
+      per-operation results and validation errors if any operation is invalid (in
+      which case nothing is applied).
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
 
-        Parameters:
-        - `task`: The parent task object.
-        - `subtasks_data`: List of subtasks data to be processed.
-        """
-        incoming_subtask_ids = {subtask['id'] for subtask in subtasks_data if subtask.get('id')}
-        self.delete_removed_subtasks(task, incoming_subtask_ids)
-        for subtask_data in subtasks_data:
-            self.update_or_create_subtask(task, subtask_data)
+    def post(self, request, format=None):
+        serializer = TaskBulkSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        if serializer.invalid_results is not None:
+            return Response({'results': serializer.invalid_results}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class ContactsView(APIView):
@@ -206,28 +258,50 @@ class ContactsView(APIView):
     API view for handling contact-related operations.
 
     Methods:
-    - GET: Retrieve a list of all contacts.
-    - POST: Create a new contact.
-    - DELETE: Delete a specific contact by ID.
-    - PUT: Update a specific contact by ID.
+    - GET: Retrieve the contacts of the requesting user.
+    - POST: Create a new contact of the requesting user.
+    - DELETE: Delete a specific contact of the requesting user by ID.
+    - PUT: Update a specific contact of the requesting user by ID.
     """
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @conditional_collection(CONTACTS)
+    @cached_response(lambda request: [f'contacts:{request.user.pk}'])
     def get(self, request, format=None):
         """
-        Retrieve a list of all contacts.
+        Retrieve the contacts owned by the requesting user (`contactAssignedTo`).
+
+        The list carries an `ETag` and answers `304 Not Modified` when the client
+        already holds the current version (see `conditional_collection`). Responses
+        are served from the response cache (see `cached_response`) and the full list
+        from a per-owner cache (see `cached_contact_list`).
+
+        Parameters:
+        - `cursor`, `page_size` (optional query parameters): Request a page of the
+          contact list instead of the full list (see `KeysetPagination`).
+        - `stream` (optional query parameter): Stream the full contact list in chunks
+          instead of building it in memory (see `stream_json_list`).
+        - `fields`, `exclude` (optional query parameters): Emit only some fields of
+          the contacts (see `SparseFieldsMixin`).
 
         Returns:
         - JSON response with the serialized contact data.
         """
-        contacts = Contacts.objects.all()
-        serializer = ContactsSerializer(contacts, many=True)
-        return Response(serializer.data)
+        fields = ContactsSerializer.select_fields(request.query_params)
+        contacts = ContactsSerializer.only_fields(owner_contacts(request.user).order_by('id'), fields)
+        if wants_stream(request):
+            return stream_json_list(contacts, ContactsSerializer, fields=fields)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(contacts, request, view=self)
+        if page is not None:
+            serializer = ContactsSerializer(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializer.data)
+        return Response(cached_contact_list(request.user, fields))
     
     def post(self, request, format=None):
         """
-        Create a new contact.
+        Create a new contact owned by the requesting user.
 
         Parameters:
         - `request`: The HTTP request object containing contact data.
@@ -237,36 +311,38 @@ class ContactsView(APIView):
         """
         serializer = ContactsSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(contactAssignedTo=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     def delete(self, request, id, format=None):
         """
-        Delete a specific contact by ID.
+        Delete a specific contact of the requesting user by ID.
 
         Parameters:
         - `id`: The ID of the contact to delete.
 
         Returns:
-        - HTTP 204 No Content response on successful deletion.
+        - HTTP 204 No Content response on successful deletion, HTTP 404 if the
+          requesting user has no contact with this ID.
         """
-        contact = get_object_or_404(Contacts, id=id)
+        contact = get_object_or_404(owner_contacts(request.user), id=id)
         contact.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     def put(self, request, id, format=None):
         """
-        Update a specific contact by ID.
+        Update a specific contact of the requesting user by ID.
 
         Parameters:
         - `id`: The ID of the contact to update.
         - `request`: The HTTP request object containing updated contact data.
 
         Returns:
-        - JSON response with the updated contact data.
+        - JSON response with the updated contact data, HTTP 404 if the requesting
+          user has no contact with this ID.
         """
-        contact = get_object_or_404(Contacts, id=id)
+        contact = get_object_or_404(owner_contacts(request.user), id=id)
         serializer = ContactsSerializer(contact, data=request.data)
         if serializer.is_valid():
             serializer.save()
@@ -274,6 +350,215 @@ class ContactsView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class SyncView(APIView):
+    """
+    API view for incremental (delta) synchronization of tasks and contacts.
+
+    GET:
+    - Without a cursor, returns all tasks and the requesting user's contacts together
+      with a cursor.
+    - With `?since=<cursor>`, returns only the tasks and contacts created or changed
+      since the cursor was issued (a task also counts as changed when one of its
+      subtasks or assignments changed) and the IDs of tasks, subtasks and the user's
+      contacts deleted since then.
+
+    The cursor holds the sequences (collection versions, see `CollectionVersion`) of
+    tasks and contacts the response is complete up to. Changes are stamped with the
+    version of their collection in the transaction that bumps it (see
+    `join.changes.record_change`), and the versions are read before the objects, so
+    every change committed after a sync is reported by the next one; a change may be
+    reported twice. The returned cursor is to be sent as `since` with the next sync.
+
+    When the cursor is older than the retained tombstones (see `prune_tombstones`),
+    newer than the current versions (e.g. after a database restore) or of the former
+    timestamp format, the response is a full resync with `reset` set: the client
+    replaces its copy instead of applying a delta.
+
+    Returns:
+    - JSON response with `cursor`, `reset`, `tasks`, `contacts` and `deleted`.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    collections = (TASKS, CONTACTS)
+
+    def get(self, request, format=None):
+        since = self.parse_cursor(request.query_params.get('since'))
+        # The cursor has to be consistent with the objects read, so everything is read
+        # from the primary database.
+        pin_to_primary()
+        versions = {name: CollectionVersion.current(name) for name in self.collections}
+        reset = since is not None and any(
+            not versions[name].pruned <= sequence <= versions[name].version
+            for name, sequence in zip(self.collections, since)
+        )
+        if reset:
+            since = None
+        tasks = TaskItemSerializer.setup_eager_loading(TaskItem.objects.all())
+        contacts = owner_contacts(request.user)
+        deleted = {TASKS: [], SUBTASKS: [], CONTACTS: []}
+        if since is not None:
+            tasks_since, contacts_since = since
+            tasks = tasks.filter(sequence__gt=tasks_since)
+            contacts = contacts.filter(sequence__gt=contacts_since)
+            tombstones = Tombstone.objects.filter(
+                Q(collection__in=[TASKS, SUBTASKS], sequence__gt=tasks_since)
+                | Q(collection=CONTACTS, owner=request.user.pk, sequence__gt=contacts_since)
+            )
+            for collection, object_id in tombstones.order_by('sequence', 'id').values_list('collection', 'object_id'):
+                deleted[collection].append(object_id)
+        return Response({
+            'cursor': self.make_cursor(versions[name].version for name in self.collections),
+            'reset': reset,
+            'tasks': TaskItemSerializer(tasks.order_by('id'), many=True).data,
+            'contacts': ContactsSerializer(contacts.order_by('id'), many=True).data,
+            'deleted': deleted,
+        })
+
+    def make_cursor(self, sequences):
+        """
+        Encode the sequences of the task and contact collections as a sync cursor
+        (e.g. `"42.7"`).
+        """
+        return '.'.join(str(sequence) for sequence in sequences)
+
+    def parse_cursor(self, cursor):
+        """
+        Decode a sync cursor into the sequences of the task and contact collections.
+
+        Returns:
+        - The tuple of sequences encoded in `cursor`, `None` if no cursor was sent, or
+          sequences that force a reset (`(-1, -1)`) for a cursor of the former
+          timestamp format.
+
+        Raises:
+        - `ValidationError` if the cursor is malformed.
+        """
+        if not cursor:
+            return None
+        if cursor.isascii() and cursor.isdigit():
+            return (-1,) * len(self.collections)
+        parts = cursor.split('.')
+        if len(parts) != len(self.collections) or not all(part.isascii() and part.isdigit() for part in parts):
+            raise ValidationError({'since': ['Invalid sync cursor.']})
+        return tuple(int(part) for part in parts)
+
+
+class TaskSearchView(APIView):
+    """
+    API view for full-text search of tasks.
+
+    Searches the titles, descriptions, categories and subtask titles of all tasks
+    through the FTS5 index (see `join.search`) and returns the best matches first.
+
+    GET:
+    - `q`: The search input. All words must occur; the last one may be a prefix.
+    - `page_size` (optional): Number of results per page (default 20, at most 100).
+    - `offset` (optional): Number of results to skip.
+
+    Returns:
+    - JSON response with `next`, `previous` (URLs of the neighbouring pages or `None`)
+      and `results` (the serialized tasks in rank order).
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    page_size = 20
+    max_page_size = 100
+
+    def get(self, request, format=None):
+        try:
+            page_size = min(int(request.query_params.get('page_size', self.page_size)), self.max_page_size)
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            raise ValidationError({'page_size': ['Expected integers for page_size and offset.']})
+        if page_size < 1 or offset < 0:
+            raise ValidationError({'page_size': ['Expected a positive page_size and offset.']})
+
+        # One extra result tells whether there is a next page.
+        ids = search_task_ids(request.query_params.get('q', ''), page_size + 1, offset)
+        tasks = TaskItemSerializer.setup_eager_loading(TaskItem.objects.filter(id__in=ids[:page_size]))
+        rank = {task_id: position for position, task_id in enumerate(ids)}
+        url = request.build_absolute_uri()
+        return Response({
+            'next': replace_query_param(url, 'offset', offset + page_size) if len(ids) > page_size else None,
+            'previous': replace_query_param(url, 'offset', max(offset - page_size, 0)) if offset else None,
+            'results': TaskItemSerializer(sorted(tasks, key=lambda task: rank[task.id]), many=True).data,
+        })
+
+
+class SummaryView(APIView):
+    """
+    API view for the figures of the summary page.
+
+    GET:
+    - Returns the number of tasks per board column, in progress and done, the number
+      of urgent tasks and the upcoming deadlines (see `board_summary`), computed in
+      a single aggregate query.
+
+    The summary is served from the response cache (see `cached_response`) until a
+    task changes or the day changes.
+
+    Returns:
+    - JSON response with the summary.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @cached_response(lambda request: ['tasks', f'day:{localdate()}'])
+    def get(self, request, format=None):
+        return Response(board_summary(localdate()))
+
+
+class ContactAutocompleteView(APIView):
+    """
+    API view for the contact typeahead of the task dialog.
+
+    GET:
+    - `q`: The typed input, matched case-insensitively as a prefix of the full name,
+      first name, last name or email of the requesting user's contacts.
+    - `limit` (optional): Maximum number of matches (default 10, at most 50).
+
+    Returns:
+    - JSON list of the best matches (see `complete_contacts`) with their ID, names,
+      initials, email and color.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    limit = 10
+    max_limit = 50
+
+    def get(self, request, format=None):
+        try:
+            limit = min(int(request.query_params.get('limit', self.limit)), self.max_limit)
+        except ValueError:
+            raise ValidationError({'limit': ['Expected an integer.']})
+        if limit < 1:
+            raise ValidationError({'limit': ['Expected a positive integer.']})
+        return Response(complete_contacts(request.user, request.query_params.get('q', ''), limit))
+
+
 def docs_view(request):
     # Weiterleitung zu /docs/index.html
-    return redirect('/docs/index.html')
\ No newline at end of file
+    return redirect('/docs/index.html')
+
+
+class MetricsView(APIView):
+    """
+    Staff-only API view for the performance counters of this worker process.
+
+    GET:
+    - Returns the rolling latency histograms per endpoint (see `LatencyHistograms`
+      and `InstrumentationMiddleware`), the token cache counters and the response
+      cache counters.
+
+    Returns:
+    - JSON response with `endpoints`, `token_cache` and `response_cache`.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, format=None):
+        return Response({
+            'endpoints': latency_histograms.snapshot(),
+            'token_cache': token_cache.stats(),
+            'response_cache': response_cache_stats.snapshot(),
+        })
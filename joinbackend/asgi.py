@@ -3,6 +3,9 @@ ASGI config for joinbackend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Under ASGI the URLs are resolved with ``joinbackend.asgi_urls``, which serves the
+endpoints that have an async implementation (e.g. login) with their async views.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -12,5 +15,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'joinbackend.settings')
+os.environ.setdefault('JOIN_URLCONF', 'joinbackend.asgi_urls')
 
 application = get_asgi_application()
@@ -0,0 +1,21 @@
+"""
+URL configuration used when the project is served through ASGI (see `asgi.py`).
+
+Routes the same URLs as `joinbackend.urls`, but serves the endpoints that have an
+async-native implementation with their async view. Patterns listed here take
+precedence over the ones included from `joinbackend.urls`. The change stream needs a
+long-lived connection and is therefore only served here.
+"""
+from django.urls import path
+from join.async_views import AsyncContactsView, AsyncLoginView, AsyncTaskView, ChangeStreamView
+from joinbackend.urls import urlpatterns as sync_urlpatterns
+
+
+urlpatterns = [
+    path('join/login/', AsyncLoginView.as_view(), name='login'),
+    path('join/api/tasks/', AsyncTaskView.as_view(), name='task-list'),
+    path('join/api/tasks/<int:id>/', AsyncTaskView.as_view(), name='task-detail'),
+    path('join/api/contacts/', AsyncContactsView.as_view(), name='contact-list'),
+    path('join/api/contacts/<int:id>/', AsyncContactsView.as_view(), name='contact-detail'),
+    path('join/api/changes/', ChangeStreamView.as_view(), name='change-stream'),
+] + sync_urlpatterns
@@ -36,6 +36,7 @@ CORS_ALLOWED_ORIGINS = json.loads(os.getenv('CORS_ALLOWED_ORIGINS', '[]'))
 CORS_ALLOW_METHODS = ['*']
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ['Server-Timing', 'X-Join-Profile']
 
 # Application definition
 
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'join.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,10 +62,13 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'corsheaders.middleware.CorsMiddleware'
+    'corsheaders.middleware.CorsMiddleware',
+    'join.middleware.PrimaryPinningMiddleware',
+    'join.middleware.ProfilingMiddleware',
 ]
 
-ROOT_URLCONF = 'joinbackend.urls'
+# `asgi.py` switches to `joinbackend.asgi_urls` to serve the async views
+ROOT_URLCONF = os.getenv('JOIN_URLCONF', 'joinbackend.urls')
 
 TEMPLATES = [
     {
@@ -87,13 +92,84 @@ WSGI_APPLICATION = 'joinbackend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Connection settings of the SQLite database, selected with `JOIN_DB_PROFILE`.
+# "production" switches to WAL (readers no longer wait for writers), relaxes fsyncs
+# to the end of checkpoints, enlarges the page cache and memory map, waits for
+# locks instead of failing with "database is locked", starts write transactions
+# with `BEGIN IMMEDIATE` and keeps connections open between requests. Under ASGI,
+# set `JOIN_DB_CONN_MAX_AGE=0`, since async requests do not reuse connections.
+JOIN_SQLITE_PROFILES = {
+    'development': {},
+    'production': {
+        'CONN_MAX_AGE': int(os.getenv('JOIN_DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA cache_size=-20000;'
+                'PRAGMA busy_timeout=5000;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+            'timeout': 5,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+}
+JOIN_DB_PROFILE = os.getenv('JOIN_DB_PROFILE', 'development')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        **JOIN_SQLITE_PROFILES[JOIN_DB_PROFILE],
     }
 }
 
+# Read replicas: JSON list of database files, kept in sync with the primary by
+# `manage.py replicate_sqlite` (a stand-in for real replication). Reads are routed
+# to them by `join.routers.PrimaryReplicaRouter`; clients that have written read
+# from the primary for `JOIN_DB_PIN_SECONDS` (the replication lag to cover)
+JOIN_DB_READ_REPLICAS = []
+for index, name in enumerate(json.loads(os.getenv('JOIN_DB_REPLICAS', '[]')), start=1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    JOIN_DB_READ_REPLICAS.append(f'replica{index}')
+JOIN_DB_PIN_SECONDS = int(os.getenv('JOIN_DB_PIN_SECONDS', '5'))
+
+DATABASE_ROUTERS = ['join.routers.PrimaryReplicaRouter']
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Responses of the read endpoints (see `join.caching.cached_response`). Set
+    # `JOIN_RESPONSE_CACHE_DIR` to share the cache between worker processes.
+    'responses': {
+        'BACKEND': (
+            'django.core.cache.backends.filebased.FileBasedCache' if os.getenv('JOIN_RESPONSE_CACHE_DIR')
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('JOIN_RESPONSE_CACHE_DIR', 'join-responses'),
+        'TIMEOUT': int(os.getenv('JOIN_RESPONSE_CACHE_TIMEOUT', '300')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('JOIN_RESPONSE_CACHE_MAX_ENTRIES', '1000')),
+        },
+    },
+}
+
+# Seconds the serialized contact list of an owner is cached (see `join.caching`)
+JOIN_CONTACT_LIST_CACHE_TIMEOUT = int(os.getenv('JOIN_CONTACT_LIST_CACHE_TIMEOUT', '300'))
+
+# Days tombstones of deleted objects are kept for delta syncs by `manage.py prune_tombstones`;
+# clients syncing from an older cursor receive a full resync
+JOIN_TOMBSTONE_RETENTION_DAYS = int(os.getenv('JOIN_TOMBSTONE_RETENTION_DAYS', '30'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -146,7 +222,7 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'join.authentication.CachedTokenAuthentication',
     ),
      'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -154,3 +230,29 @@ REST_FRAMEWORK = {
 }
 
 AUTH_USER_MODEL = 'join.CustomUser'
+
+# Password checks of `join.async_views.AsyncLoginView`: hashing threads and the
+# maximum number of logins in progress before new ones are rejected
+JOIN_LOGIN_HASH_WORKERS = int(os.getenv('JOIN_LOGIN_HASH_WORKERS', '4'))
+JOIN_LOGIN_QUEUE_LIMIT = int(os.getenv('JOIN_LOGIN_QUEUE_LIMIT', '64'))
+
+# Token lookups cached per worker process by `join.authentication.CachedTokenAuthentication`
+JOIN_TOKEN_CACHE = {
+    'MAX_SIZE': int(os.getenv('JOIN_TOKEN_CACHE_MAX_SIZE', '4096')),
+    'TTL': int(os.getenv('JOIN_TOKEN_CACHE_TTL', '60')),
+}
+
+# Request measurements of `join.middleware.InstrumentationMiddleware`: requests slower
+# than `JOIN_SLOW_REQUEST_MS` are logged with their `JOIN_SLOW_REQUEST_QUERIES` slowest
+# statements; the latency histograms keep the latest `JOIN_LATENCY_WINDOW` requests per endpoint
+JOIN_SLOW_REQUEST_MS = int(os.getenv('JOIN_SLOW_REQUEST_MS', '500'))
+JOIN_SLOW_REQUEST_QUERIES = int(os.getenv('JOIN_SLOW_REQUEST_QUERIES', '5'))
+JOIN_LATENCY_WINDOW = int(os.getenv('JOIN_LATENCY_WINDOW', '1000'))
+
+# On-demand profiling of `join.middleware.ProfilingMiddleware`: captures are saved to
+# `JOIN_PROFILE_DIR`, of which the latest `JOIN_PROFILE_KEEP` are kept; inline summaries
+# list the top `JOIN_PROFILE_TOP` functions and allocating lines
+JOIN_PROFILE_DIR = os.getenv('JOIN_PROFILE_DIR', str(BASE_DIR / 'profiles'))
+JOIN_PROFILE_KEEP = int(os.getenv('JOIN_PROFILE_KEEP', '20'))
+JOIN_PROFILE_TOP = int(os.getenv('JOIN_PROFILE_TOP', '25'))
+JOIN_PROFILE_TRACEBACK = int(os.getenv('JOIN_PROFILE_TRACEBACK', '1'))
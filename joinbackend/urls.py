@@ -20,7 +20,7 @@ from django.contrib import admin
 from django.urls import path, re_path
 from django.views.generic import TemplateView
 from django.views.static import serve
-from join.views import ContactsView, LoginView, TaskView, UserCreateView, UserGetView, docs_view
+from join.views import ContactAutocompleteView, ContactsView, LoginView, MetricsView, SummaryView, SyncView, TaskBulkView, TaskSearchView, TaskView, UserCreateView, UserGetView, docs_view
 
 
 
@@ -36,8 +36,14 @@ urlpatterns = [
     path('join/api/users/', UserGetView.as_view(), name='get_users'),
     path('join/api/tasks/', TaskView.as_view(), name='task-list'),  # Für alle Tasks
     path('join/api/tasks/<int:id>/', TaskView.as_view(), name='task-detail'),  # Für einen spezifischen Task
+    path('join/api/tasks/bulk/', TaskBulkView.as_view(), name='task-bulk'),
+    path('join/api/tasks/search/', TaskSearchView.as_view(), name='task-search'),
     path('join/api/contacts/', ContactsView.as_view(), name='contact-list'),
     path('join/api/contacts/<int:id>/', ContactsView.as_view(), name='contact-detail'),
+    path('join/api/contacts/autocomplete/', ContactAutocompleteView.as_view(), name='contact-autocomplete'),
+    path('join/api/sync/', SyncView.as_view(), name='sync'),
+    path('join/api/summary/', SummaryView.as_view(), name='summary'),
+    path('join/api/metrics/', MetricsView.as_view(), name='metrics'),
     path('join/docs/', docs_view)
 ]
 